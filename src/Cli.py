@@ -0,0 +1,35 @@
+import argparse
+import sys
+from cli.CollectCommand import CollectCommand
+from cli.BackfillCommand import BackfillCommand
+from cli.UploadCommand import UploadCommand
+from cli.BenchCommand import BenchCommand
+from cli.StatsCommand import StatsCommand
+from cli.ProbeCommand import ProbeCommand
+from cli.AggregatesCommand import AggregatesCommand
+from cli.ExportCommand import ExportCommand
+from cli.ArchiveCommand import ArchiveCommand
+from cli.LogsCommand import LogsCommand
+from cli.RunsCommand import RunsCommand
+
+COMMANDS = [
+    CollectCommand, BackfillCommand, UploadCommand, BenchCommand,
+    StatsCommand, ProbeCommand, AggregatesCommand, ExportCommand, ArchiveCommand, LogsCommand,
+    RunsCommand,
+]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="Cli.py", description="Attendance control command line tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for command in COMMANDS:
+        command.register(subparsers)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,6 @@
 from services.AttendanceService import AttendanceService
 from config.Logging import Logger
+from services.ProfilerTrigger import ProfilerTrigger
 import signal
 import sys
 
@@ -13,6 +14,7 @@ def main():
     try:
         signal.signal(signal.SIGINT, signal_handler)
         signal.signal(signal.SIGTERM, signal_handler)
+        ProfilerTrigger.from_settings().install()
 
         log.info("Starting Attendance Service...")
 
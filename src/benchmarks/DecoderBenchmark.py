@@ -0,0 +1,127 @@
+import base64
+import json
+import random
+import struct
+import time
+import types
+from collections import namedtuple
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+from models.attendance.AttendanceDecoder import AttendanceDecoder, RECORD_8, RECORD_16, RECORD_40
+from utils.AtomicFile import AtomicFile
+
+FixtureUser = namedtuple("FixtureUser", ["uid", "user_id"])
+
+
+class FixtureConnection:
+    """Stands in for a connected ZK object and serves a captured attendance buffer."""
+    verbose = False
+
+    def __init__(self, fixture: Dict):
+        self.records = fixture["records"]
+        self.users = [FixtureUser(uid, user_id) for uid, user_id in fixture["users"]]
+        self.buffer = base64.b64decode(fixture["buffer"])
+
+    def read_sizes(self) -> bool:
+        return True
+
+    def get_users(self) -> List:
+        return self.users
+
+    def read_with_buffer(self, command, fct=0, ext=0) -> tuple:
+        return self.buffer, len(self.buffer)
+
+
+class DecoderBenchmark:
+    """
+    Compares AttendanceDecoder with pyzk's own `get_attendance` on the same buffer: a fixture captured
+    from a terminal, or a synthetic buffer. Reports both timings and every field that differs.
+    """
+
+    @staticmethod
+    def capture(conn, path: Path) -> Dict:
+        """Saves the raw attendance buffer and user list of a connected device as a fixture."""
+        from zk import const  # type: ignore
+
+        conn.read_sizes()
+        users = conn.get_users()
+        data, _ = conn.read_with_buffer(const.CMD_ATTLOG_RRQ)
+        fixture = {
+            "records": conn.records,
+            "users": [[user.uid, user.user_id] for user in users],
+            "buffer": base64.b64encode(bytes(data)).decode("ascii"),
+        }
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        AtomicFile.write(path, json.dumps(fixture).encode("utf-8"))
+        return fixture
+
+    @staticmethod
+    def load(path: Path) -> Dict:
+        payload = AtomicFile.read_verified(path)
+        if payload is None:
+            raise FileNotFoundError(path)
+        return json.loads(payload)
+
+    @staticmethod
+    def synthetic(records: int, record_size: int = 40, users: int = 500, seed: int = 1) -> Dict:
+        rng = random.Random(seed)
+        start = datetime(2024, 1, 1, 6)
+
+        def encode(moment: datetime) -> int:
+            return (((moment.year % 100) * 12 * 31 + (moment.month - 1) * 31 + moment.day - 1) * 86400
+                    + (moment.hour * 60 + moment.minute) * 60 + moment.second)
+
+        chunks = []
+        for index in range(records):
+            uid = rng.randint(1, users + 20)  # a few punches of users no longer enrolled
+            t = encode(start + timedelta(minutes=index * 3))
+            if record_size == 8:
+                chunks.append(RECORD_8.pack(uid, 1, t, 0))
+            elif record_size == 16:
+                chunks.append(RECORD_16.pack(1000 + uid, t, 1, 0, b'\0\0', 0))
+            else:
+                chunks.append(RECORD_40.pack(uid, str(1000 + uid).encode(), 1, t, 0, b'\0' * 8))
+        body = b''.join(chunks)
+        return {
+            "records": records,
+            "users": [[uid, str(1000 + uid)] for uid in range(1, users + 1)],
+            "buffer": base64.b64encode(struct.pack('<I', len(body)) + body).decode("ascii"),
+        }
+
+    @staticmethod
+    def run(fixture: Dict, reference: bool = True) -> Dict:
+        fast_conn = FixtureConnection(fixture)
+        start = time.perf_counter()
+        fast = AttendanceDecoder.decode(memoryview(fast_conn.buffer)[4:],
+                                        struct.unpack_from('<I', fast_conn.buffer, 0)[0] / fast_conn.records,
+                                        fast_conn.users)
+        result = {"records": len(fast), "fast_ms": (time.perf_counter() - start) * 1000}
+        if reference:
+            slow = DecoderBenchmark._pyzk(fixture, result)
+            result["mismatches"] = DecoderBenchmark.compare(fast, slow) if slow is not None else None
+        return result
+
+    @staticmethod
+    def _pyzk(fixture: Dict, result: Dict) -> Optional[List]:
+        try:
+            from zk import ZK  # type: ignore
+        except ImportError:
+            return None
+        conn = FixtureConnection(fixture)
+        conn._ZK__decode_time = types.MethodType(ZK._ZK__decode_time, conn)
+        start = time.perf_counter()
+        slow = ZK.get_attendance(conn)
+        result["pyzk_ms"] = (time.perf_counter() - start) * 1000
+        return slow
+
+    @staticmethod
+    def compare(fast: List, slow: List) -> List[str]:
+        mismatches = []
+        if len(fast) != len(slow):
+            mismatches.append(f"record count {len(fast)} != {len(slow)}")
+        for index, (a, b) in enumerate(zip(fast, slow)):
+            for field in ("user_id", "timestamp", "status", "punch", "uid"):
+                if getattr(a, field) != getattr(b, field):
+                    mismatches.append(f"#{index} {field}: {getattr(a, field)!r} != {getattr(b, field)!r}")
+        return mismatches
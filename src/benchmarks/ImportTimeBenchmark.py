@@ -0,0 +1,98 @@
+import json
+import re
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+SRC_DIR = Path(__file__).parent.parent
+HISTORY_FILE = SRC_DIR / 'data' / 'benchmarks' / 'import_time.jsonl'
+LINE_PATTERN = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+class ImportTimeBenchmark:
+    """Measures `python -X importtime -c 'import <module>'` and keeps a history to spot regressions."""
+
+    def __init__(self, module: str = "Main", python: Optional[str] = None):
+        self.module = module
+        self.python = python or sys.executable
+
+    def run(self, repeat: int = 5, top: int = 10) -> Dict:
+        best = None
+        for _ in range(max(1, repeat)):
+            sample = self._sample()
+            if best is None or sample['cumulative_us'] < best['cumulative_us']:
+                best = sample
+
+        modules = sorted(best.pop('modules'), key=lambda m: m['self_us'], reverse=True)
+        best.update({
+            'module': self.module,
+            'recorded_at': datetime.now().isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'repeat': repeat,
+            'top_self': modules[:top],
+        })
+        return best
+
+    def _sample(self) -> Dict:
+        start = time.perf_counter()
+        completed = subprocess.run(
+            [self.python, "-X", "importtime", "-c", f"import {self.module}"],
+            cwd=SRC_DIR, capture_output=True, text=True
+        )
+        wall_ms = (time.perf_counter() - start) * 1000
+        if completed.returncode != 0:
+            raise RuntimeError(f"Importing {self.module} failed:\n{completed.stderr.strip().splitlines()[-1]}")
+
+        modules = self._parse(completed.stderr)
+        target = next((m for m in modules if m['name'] == self.module and m['depth'] == 0), None)
+        return {
+            'cumulative_us': target['cumulative_us'] if target else sum(m['self_us'] for m in modules),
+            'process_wall_ms': round(wall_ms, 1),
+            'modules_imported': len(modules),
+            'modules': modules,
+        }
+
+    @staticmethod
+    def _parse(stderr: str) -> List[Dict]:
+        modules = []
+        for line in stderr.splitlines():
+            match = LINE_PATTERN.match(line)
+            if match:
+                self_us, cumulative_us, indent, name = match.groups()
+                modules.append({
+                    'name': name,
+                    'self_us': int(self_us),
+                    'cumulative_us': int(cumulative_us),
+                    'depth': (len(indent) - 1) // 2,
+                })
+        return modules
+
+    @staticmethod
+    def record(result: Dict, history_file: Path = HISTORY_FILE) -> None:
+        history_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(history_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+    @staticmethod
+    def history(history_file: Path = HISTORY_FILE) -> List[Dict]:
+        if not history_file.exists():
+            return []
+        with open(history_file, encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+
+if __name__ == "__main__":
+    benchmark = ImportTimeBenchmark(sys.argv[1] if len(sys.argv) > 1 else "Main")
+    result = benchmark.run()
+    previous = ImportTimeBenchmark.history()
+    ImportTimeBenchmark.record(result)
+
+    print(f"import {result['module']}: {result['cumulative_us'] / 1000:.1f} ms "
+          f"({result['modules_imported']} modules, process {result['process_wall_ms']} ms)")
+    if previous:
+        print(f"previous run: {previous[-1]['cumulative_us'] / 1000:.1f} ms")
+    for entry in result['top_self']:
+        print(f"  {entry['self_us']:>8} us  {entry['name']}")
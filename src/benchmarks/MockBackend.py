@@ -0,0 +1,171 @@
+import json
+import random
+import secrets
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+DEFAULT_PATHS = {"token": "/api/login", "attendance": "/api/attendance", "device": "/api/device"}
+
+
+class MockBackend:
+    """
+    Local stand-in for the attendance API, for upload tests that must not reach production.
+    The token path issues tokens for `email`/`password` (any credentials when they are None) that
+    expire after `token_ttl` seconds; the attendance and device paths accept JSON sent with a valid
+    X-CSRF-TOKEN. Every request waits `latency_ms` plus up to `jitter_ms`, and data requests fail
+    at random with 500 (`error_rate`), 429 with Retry-After (`throttle_rate`) or 401 with the token
+    revoked (`unauthorized_rate`).
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, paths: Optional[Dict[str, str]] = None,
+                 email: Optional[str] = None, password: Optional[str] = None, token_ttl: float = 0,
+                 latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0,
+                 throttle_rate: float = 0, unauthorized_rate: float = 0, seed: Optional[int] = None):
+        self.host = host
+        self.port = port
+        self.paths = {**DEFAULT_PATHS, **(paths or {})}
+        self.email = email
+        self.password = password
+        self.token_ttl = token_ttl
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.unauthorized_rate = unauthorized_rate
+        self.server = None
+        self._random = random.Random(seed)
+        self._tokens: Dict[str, float] = {}
+        self._responses: Counter = Counter()
+        self._bytes_received = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.server.server_address[1] if self.server else self.port}"
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "responses": {f"{path} {status}": total for (path, status), total in sorted(self._responses.items())},
+                "bytes_received": self._bytes_received,
+                "tokens_issued": sum(total for (path, status), total in self._responses.items()
+                                     if path == self.paths["token"] and status == 200),
+            }
+
+    def start(self) -> 'MockBackend':
+        """Serves from a daemon thread; returns once the port is bound."""
+        self._bind()
+        threading.Thread(target=self.server.serve_forever, name="mock-backend", daemon=True).start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._bind()
+        self.server.serve_forever()
+
+    def stop(self) -> None:
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def _bind(self) -> None:
+        from http.server import ThreadingHTTPServer
+        self.server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self.server.daemon_threads = True
+
+    def _roll(self, rate: float) -> bool:
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < rate
+
+    def _delay(self) -> None:
+        if self.latency_ms or self.jitter_ms:
+            with self._lock:
+                jitter = self._random.uniform(0, self.jitter_ms)
+            time.sleep((self.latency_ms + jitter) / 1000)
+
+    def _issue_token(self, body: bytes) -> Optional[str]:
+        try:
+            credentials = json.loads(body or b"{}")
+        except ValueError:
+            return None
+        if self.email is not None and credentials.get("email") != self.email:
+            return None
+        if self.password is not None and credentials.get("password") != self.password:
+            return None
+        token = secrets.token_hex(16)
+        with self._lock:
+            self._tokens[token] = time.monotonic() + self.token_ttl if self.token_ttl else float("inf")
+        return token
+
+    def _token_valid(self, token: Optional[str]) -> bool:
+        with self._lock:
+            expires = self._tokens.get(token)
+            if expires is not None and expires < time.monotonic():
+                del self._tokens[token]
+                expires = None
+            return expires is not None
+
+    def _revoke(self, token: Optional[str]) -> None:
+        with self._lock:
+            self._tokens.pop(token, None)
+
+    def _respond(self, path: str, body: bytes, token: Optional[str]) -> tuple:
+        """Returns (status, JSON body, extra headers) for a POST."""
+        if path == self.paths["token"]:
+            token = self._issue_token(body)
+            if token is None:
+                return 401, {"message": "Invalid credentials"}, {}
+            return 200, {"token": token}, {}
+        if path not in (self.paths["attendance"], self.paths["device"]):
+            return 404, {"message": "Not found"}, {}
+        if not self._token_valid(token):
+            return 401, {"message": "Unauthenticated"}, {}
+        if self._roll(self.unauthorized_rate):
+            self._revoke(token)
+            return 401, {"message": "Token revoked"}, {}
+        if self._roll(self.throttle_rate):
+            return 429, {"message": "Too many requests"}, {"Retry-After": "1"}
+        if self._roll(self.error_rate):
+            return 500, {"message": "Server error"}, {}
+        try:
+            json.loads(body)
+        except ValueError:
+            return 400, {"message": "Invalid JSON"}, {}
+        return 200, {"message": "Stored"}, {}
+
+    def _handler(self):
+        from http.server import BaseHTTPRequestHandler
+
+        backend = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, as requests.Session reuses its connections; without TCP_NODELAY the separate
+            # header and body writes add a delayed-ACK stall to every response
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                backend._delay()
+                status, response, headers = backend._respond(self.path, body, self.headers.get("X-CSRF-TOKEN"))
+                with backend._lock:
+                    backend._responses[(self.path, status)] += 1
+                    backend._bytes_received += len(body)
+
+                payload = json.dumps(response).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,67 @@
+from collections import namedtuple
+from datetime import datetime, timedelta
+from typing import Dict, List
+from models.attendance.AttendanceProcessor import AttendanceProcessor
+from models.device.DeviceDescription import DeviceDescription
+from models.device.DeviceInfo import DeviceInfo
+from utils.RunMetrics import RunMetrics
+from utils.to_JSON import ToJSON
+
+Punch = namedtuple("Punch", ["user_id", "timestamp", "status", "punch", "uid"])
+
+
+class PipelineBenchmark:
+    """Runs the processing stages on synthetic data, without a device or the API."""
+
+    def __init__(self, users: int = 1000, punches_per_user: int = 4):
+        self.users = users
+        self.punches_per_user = punches_per_user
+
+    def build_input(self) -> tuple:
+        start = datetime.combine(datetime.now().date(), datetime.min.time()) + timedelta(hours=6)
+        users_info: Dict = {}
+        attendance: List = []
+        for user in range(1, self.users + 1):
+            user_id = str(user)
+            users_info[user_id] = {'user_id': user_id, 'name': f"User {user}", 'privilege': "User"}
+            for punch in range(self.punches_per_user):
+                timestamp = start + timedelta(minutes=user % 120, hours=punch * 3)
+                attendance.append(Punch(user_id, timestamp, 1, 0, user))
+        attendance.sort(key=lambda p: p.timestamp)
+        return users_info, attendance
+
+    @staticmethod
+    def build_processor() -> AttendanceProcessor:
+        device_info = DeviceInfo.create(
+            device_name="benchmark",
+            description=DeviceDescription.create("BENCH0000", "00:00:00:00:00:00",
+                                                 {'ip': '127.0.0.1', 'gateway': '127.0.0.1'})
+        )
+        return AttendanceProcessor(connector=None, device=None, device_info=device_info)
+
+    def build_payload(self) -> bytes:
+        """A serialised day as the uploader sends it."""
+        users_info, attendance = self.build_input()
+        return ToJSON.serialize(self.build_processor().process_user_attendance(users_info, attendance))
+
+    def run(self, repeat: int = 3) -> List[RunMetrics]:
+        from controllers.AttendanceController import AttendanceController
+
+        users_info, attendance = self.build_input()
+        processor = self.build_processor()
+
+        results = []
+        previous: Dict = {}
+        for _ in range(max(1, repeat)):
+            metrics = RunMetrics(trace_allocations=True).start()
+            with metrics.stage('process'):
+                processed = processor.process_user_attendance(users_info, attendance)
+            with metrics.stage('merge'):
+                merged = AttendanceController._merge_records(previous, processed)
+            with metrics.stage('serialize'):
+                payload = ToJSON.serialize(merged)
+            metrics.increment('records', len(attendance))
+            metrics.increment('bytes', len(payload))
+            results.append(metrics.stop())
+            previous = processed
+        return results
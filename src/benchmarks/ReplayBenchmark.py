@@ -0,0 +1,56 @@
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Union
+from models.attendance.AttendanceProcessor import AttendanceProcessor
+from models.device.Device import Device
+from models.user.UserRepository import UserRepository
+from utils.RunMetrics import RunMetrics
+from utils.to_JSON import ToJSON
+
+
+class ReplayBenchmark:
+    """
+    Runs a recorded device session through download, processing, merge and serialisation, without
+    the terminal, disk writes or the API. `time_scale` replays the recorded device latency (0 skips it).
+    """
+
+    def __init__(self, path: Union[str, Path], time_scale: float = 0.0):
+        self.path = Path(path)
+        self.time_scale = time_scale
+
+    def run(self, repeat: int = 1) -> List[RunMetrics]:
+        from config.ReplayConnector import ReplayConnector
+        from controllers.AttendanceController import AttendanceController
+
+        results = []
+        previous: Dict = {}
+        for _ in range(max(1, repeat)):
+            # A fresh connector replays the session from its first call
+            connector = ReplayConnector(self.path, self.time_scale)
+            metrics = RunMetrics(trace_allocations=True).start()
+            with metrics.stage('download'):
+                users_info = UserRepository(connector).get_users_info()
+                processor = AttendanceProcessor(connector=connector, device=Device())
+                attendance = processor.get_attendance_in_range((datetime.min, datetime.max))
+            if processor.device_info is None:
+                raise ValueError(f"{self.path} holds no device info or attendance download")
+
+            with metrics.stage('process'):
+                processed = {
+                    day: processor.process_user_attendance(users_info, punches, day)
+                    for day, punches in AttendanceProcessor.split_by_day(attendance).items()
+                }
+            with metrics.stage('merge'):
+                merged = {
+                    day: AttendanceController._merge_records(previous.get(day, {}), records)
+                    for day, records in processed.items()
+                }
+            with metrics.stage('serialize'):
+                size = sum(len(ToJSON.serialize(records)) for records in merged.values())
+            metrics.increment('records', len(attendance))
+            metrics.increment('users', len(users_info))
+            metrics.increment('days', len(processed))
+            metrics.increment('bytes', size)
+            results.append(metrics.stop())
+            previous = processed
+        return results
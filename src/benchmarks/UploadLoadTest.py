@@ -0,0 +1,89 @@
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+from benchmarks.MockBackend import MockBackend
+from config.Logging import Logger
+from config.RunLedger import percentile
+
+
+class UploadLoadTest:
+    """
+    Drives APIClient uploads against a MockBackend from `workers` threads, each with its own client
+    and session, and reports sustained payloads per second and the latency distribution of each
+    send_attendance_data call, re-logins and resends included.
+    """
+
+    def __init__(self, backend: MockBackend, payload: bytes, workers: int = 4):
+        self.backend = backend
+        self.payload = payload
+        self.workers = max(1, workers)
+
+    def _client(self):
+        from services.APIClient import APIClient
+
+        client = APIClient()
+        client.base_url = self.backend.url
+        client.token_path = self.backend.paths["token"]
+        client.attendance_path = self.backend.paths["attendance"]
+        client.device_path = self.backend.paths["device"]
+        client.email = self.backend.email or "loadtest@example.com"
+        client.password = self.backend.password or "loadtest"
+        return client
+
+    def run(self, seconds: float = 10.0, requests: Optional[int] = None) -> Dict:
+        """Runs for `seconds`, or until `requests` payloads were sent when given."""
+        latencies: List[float] = []
+        failures = [0]
+        lock = threading.Lock()
+        remaining = [requests]
+        deadline = time.perf_counter() + seconds
+
+        def take() -> bool:
+            with lock:
+                if remaining[0] is None:
+                    return time.perf_counter() < deadline
+                remaining[0] -= 1
+                return remaining[0] >= 0
+
+        def worker() -> None:
+            client = self._client()
+            while take():
+                start = time.perf_counter()
+                sent = client.send_attendance_data(self.payload)
+                elapsed = (time.perf_counter() - start) * 1000
+                with lock:
+                    latencies.append(elapsed)
+                    if not sent:
+                        failures[0] += 1
+
+        # One line per upload would flood the console and attendance_logs.db
+        api_log = Logger.get_logger("api")
+        level = api_log.level
+        api_log.setLevel(logging.CRITICAL)
+        try:
+            started = time.perf_counter()
+            threads = [threading.Thread(target=worker, name=f"upload-{index}") for index in range(self.workers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+        finally:
+            api_log.setLevel(level)
+
+        sent = len(latencies) - failures[0]
+        return {
+            "workers": self.workers,
+            "payload_bytes": len(self.payload),
+            "attempted": len(latencies),
+            "sent": sent,
+            "failed": failures[0],
+            "seconds": elapsed,
+            "payloads_per_second": sent / elapsed if elapsed else 0.0,
+            "p50_ms": percentile(latencies, 0.5),
+            "p95_ms": percentile(latencies, 0.95),
+            "p99_ms": percentile(latencies, 0.99),
+            "max_ms": max(latencies, default=None),
+            "server": self.backend.stats(),
+        }
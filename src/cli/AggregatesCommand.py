@@ -0,0 +1,57 @@
+import json
+from config.FilePathManager import FilePathManager
+from utils.AtomicFile import AtomicFile
+
+
+class AggregatesCommand:
+    name = "aggregates"
+
+    @staticmethod
+    def register(subparsers) -> None:
+        parser = subparsers.add_parser(AggregatesCommand.name, help="Daily and monthly attendance rollups")
+        parser.add_argument("--db", help="Path to the aggregates database (defaults to data/attendance_aggregates.db)")
+        actions = parser.add_subparsers(dest="action", required=True)
+
+        actions.add_parser("rebuild", help="Load every stored day file into the rollup tables")
+
+        month = actions.add_parser("month", help="Monthly totals per user")
+        month.add_argument("--month", required=True, help="YYYY-MM")
+        month.add_argument("--user", help="Restrict to one user id")
+
+        user = actions.add_parser("user", help="Daily rows of one user")
+        user.add_argument("--user", required=True)
+        user.add_argument("--from", dest="start", required=True, help="YYYY-MM-DD")
+        user.add_argument("--to", dest="end", required=True, help="YYYY-MM-DD")
+
+        parser.set_defaults(handler=AggregatesCommand.run)
+
+    @staticmethod
+    def run(args) -> int:
+        from models.attendance.AttendanceAggregateRepository import AttendanceAggregateRepository
+
+        repo = AttendanceAggregateRepository(args.db)
+        try:
+            if args.action == "rebuild":
+                files = sorted(FilePathManager().iter_attendance_files())
+                rows = 0
+                for filename in files:
+                    try:
+                        payload = AtomicFile.read_verified(filename)
+                    except ValueError as e:
+                        print(f"skipped {filename}: {e}")
+                        continue
+                    if payload:
+                        rows += repo.update_day(json.loads(payload))
+                print(f"Loaded {rows} user-days from {len(files)} files")
+            elif args.action == "month":
+                print(f"{'user':<10}{'device':<16}{'days':>6}{'complete':>10}{'hours':>10}{'punches':>9}")
+                for row in repo.get_monthly(args.month, args.user):
+                    print(f"{row['user_id']:<10}{row['serial_number']:<16}{row['days_present']:>6}"
+                          f"{row['days_complete']:>10}{row['worked_seconds'] / 3600:>10.2f}{row['punches']:>9}")
+            elif args.action == "user":
+                for row in repo.get_daily(args.user, args.start, args.end):
+                    print(f"{row['day']}  {row['first_in'] or '-':>8}  {row['last_out'] or '-':>8}  "
+                          f"{row['worked_seconds'] / 3600:>6.2f}h  {row['punches']} punches")
+            return 0
+        finally:
+            repo.close()
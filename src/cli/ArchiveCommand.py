@@ -0,0 +1,41 @@
+from datetime import date
+
+
+class ArchiveCommand:
+    name = "archive"
+
+    @staticmethod
+    def register(subparsers) -> None:
+        parser = subparsers.add_parser(ArchiveCommand.name, help="Local binary punch archive of each device")
+        parser.add_argument("--serial", required=True, help="Device serial number")
+        actions = parser.add_subparsers(dest="action", required=True)
+
+        actions.add_parser("info", help="Number of archived punches and the time span they cover")
+
+        rebuild = actions.add_parser("rebuild", help="Rewrite day files from the archive without the terminal")
+        rebuild.add_argument("--from", dest="start", type=date.fromisoformat, required=True, help="YYYY-MM-DD")
+        rebuild.add_argument("--to", dest="end", type=date.fromisoformat, help="YYYY-MM-DD (defaults to --from)")
+
+        parser.set_defaults(handler=ArchiveCommand.run)
+
+    @staticmethod
+    def run(args) -> int:
+        from services.PunchArchive import PunchArchive
+
+        if args.action == "info":
+            archive = PunchArchive(args.serial)
+            span = archive.span()
+            if not span:
+                print(f"No archived punches for {args.serial}")
+                return 1
+            print(f"{len(archive)} punches from {span[0]} to {span[1]} ({archive.path})")
+            return 0
+
+        from config.zk_connector import ZKConnector
+        from controllers.AttendanceController import AttendanceController
+
+        controller = AttendanceController(ZKConnector())
+        rebuilt = controller.rebuild_from_archive(args.serial, args.start, args.end or args.start)
+        for day, users in rebuilt.items():
+            print(f"{day}  {users} users")
+        return 0 if rebuilt else 1
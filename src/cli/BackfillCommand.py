@@ -0,0 +1,29 @@
+from datetime import date
+from cli.CommandSupport import add_device_arguments, build_controller
+
+
+class BackfillCommand:
+    name = "backfill"
+
+    @staticmethod
+    def register(subparsers) -> None:
+        parser = subparsers.add_parser(BackfillCommand.name, help="Rebuild past day files from the device log")
+        add_device_arguments(parser)
+        parser.add_argument("--from", dest="start", type=date.fromisoformat, required=True, help="YYYY-MM-DD")
+        parser.add_argument("--to", dest="end", type=date.fromisoformat, help="YYYY-MM-DD (defaults to --from)")
+        parser.set_defaults(handler=BackfillCommand.run)
+
+    @staticmethod
+    def run(args) -> int:
+        end = args.end or args.start
+        if end < args.start:
+            print("--to must not be before --from")
+            return 2
+
+        controller = build_controller(args)
+        processed = controller.backfill(args.start, end)
+        for day, total in processed.items():
+            print(f"{day}  {total} users")
+        if controller.last_run_metrics:
+            print(controller.last_run_metrics.summary())
+        return 0 if processed else 1
@@ -0,0 +1,165 @@
+from cli.CommandSupport import add_device_arguments, build_connector
+
+
+class BenchCommand:
+    name = "bench"
+
+    @staticmethod
+    def register(subparsers) -> None:
+        parser = subparsers.add_parser(BenchCommand.name, help="Startup and processing benchmarks")
+        actions = parser.add_subparsers(dest="action", required=True)
+
+        imports = actions.add_parser("import", help="python -X importtime for a module")
+        imports.add_argument("--module", default="Main")
+        imports.add_argument("--repeat", type=int, default=5)
+        imports.add_argument("--no-record", action="store_true", help="Do not append to the history file")
+
+        pipeline = actions.add_parser("pipeline", help="Process, merge and serialise synthetic attendance offline")
+        pipeline.add_argument("--users", type=int, default=1000)
+        pipeline.add_argument("--punches", type=int, default=4, help="Punches per user")
+        pipeline.add_argument("--repeat", type=int, default=3)
+
+        decode = actions.add_parser("decode", help="Fast attendance decoder against pyzk on the same buffer")
+        add_device_arguments(decode)
+        decode.add_argument("--fixture", help="Captured buffer to decode (see --capture)")
+        decode.add_argument("--capture", metavar="PATH", help="Save the device's raw attendance buffer to PATH first")
+        decode.add_argument("--records", type=int, default=50000, help="Synthetic records when no fixture is given")
+        decode.add_argument("--record-size", type=int, choices=(8, 16, 40), default=40)
+
+        replay = actions.add_parser("replay", help="Run a recorded device session through the pipeline offline")
+        replay.add_argument("--session", required=True, help="Session file recorded with --record")
+        replay.add_argument("--time-scale", type=float, default=0.0, help="Replay the recorded device latency")
+        replay.add_argument("--repeat", type=int, default=3)
+
+        upload = actions.add_parser("upload", help="Upload throughput and latency against a local mock backend")
+        BenchCommand._add_backend_arguments(upload)
+        upload.add_argument("--workers", type=int, default=4, help="Concurrent uploaders (default 4)")
+        upload.add_argument("--seconds", type=float, default=10.0, help="Test duration (default 10)")
+        upload.add_argument("--requests", type=int, help="Send this many payloads instead of running for --seconds")
+        upload.add_argument("--payload", help="Day file to upload (default: a synthetic day of --users users)")
+        upload.add_argument("--users", type=int, default=500)
+
+        backend = actions.add_parser("backend", help="Serve the mock backend until interrupted")
+        BenchCommand._add_backend_arguments(backend)
+        backend.add_argument("--port", type=int, default=8080)
+
+        parser.set_defaults(handler=BenchCommand.run)
+
+    @staticmethod
+    def _add_backend_arguments(parser) -> None:
+        parser.add_argument("--latency-ms", type=float, default=0, help="Fixed delay per request")
+        parser.add_argument("--jitter-ms", type=float, default=0, help="Extra random delay per request, up to this")
+        parser.add_argument("--error-rate", type=float, default=0, help="Share of uploads answered with 500")
+        parser.add_argument("--throttle-rate", type=float, default=0, help="Share of uploads answered with 429")
+        parser.add_argument("--unauthorized-rate", type=float, default=0,
+                            help="Share of uploads answered with 401, revoking the token")
+        parser.add_argument("--token-ttl", type=float, default=0, help="Token lifetime in seconds (0 = no expiry)")
+        parser.add_argument("--seed", type=int, help="Seed for reproducible failures")
+
+    @staticmethod
+    def run(args) -> int:
+        if args.action == "import":
+            from benchmarks.ImportTimeBenchmark import ImportTimeBenchmark
+            result = ImportTimeBenchmark(args.module).run(repeat=args.repeat)
+            if not args.no_record:
+                ImportTimeBenchmark.record(result)
+            print(f"import {result['module']}: {result['cumulative_us'] / 1000:.1f} ms "
+                  f"({result['modules_imported']} modules)")
+            for entry in result['top_self']:
+                print(f"  {entry['self_us']:>8} us  {entry['name']}")
+        elif args.action == "pipeline":
+            from benchmarks.PipelineBenchmark import PipelineBenchmark
+            for metrics in PipelineBenchmark(args.users, args.punches).run(repeat=args.repeat):
+                print(metrics.summary())
+        elif args.action == "decode":
+            return BenchCommand._decode(args)
+        elif args.action == "upload":
+            return BenchCommand._upload(args)
+        elif args.action == "backend":
+            return BenchCommand._backend(args)
+        elif args.action == "replay":
+            from benchmarks.ReplayBenchmark import ReplayBenchmark
+            for metrics in ReplayBenchmark(args.session, args.time_scale).run(repeat=args.repeat):
+                print(metrics.summary())
+        return 0
+
+    @staticmethod
+    def _decode(args) -> int:
+        from benchmarks.DecoderBenchmark import DecoderBenchmark
+
+        if args.capture:
+            connector = build_connector(args)
+            conn = connector.connect()
+            if not conn:
+                print("Could not connect to the device")
+                return 1
+            try:
+                with connector.device_locked():
+                    fixture = DecoderBenchmark.capture(conn, args.capture)
+            finally:
+                connector.disconnect()
+            print(f"Captured {fixture['records']} records to {args.capture}")
+        elif args.fixture:
+            fixture = DecoderBenchmark.load(args.fixture)
+        else:
+            fixture = DecoderBenchmark.synthetic(args.records, args.record_size)
+
+        result = DecoderBenchmark.run(fixture)
+        print(f"fast decoder: {result['records']} records in {result['fast_ms']:.1f} ms")
+        if result["mismatches"] is None:
+            print("pyzk is not installed, parity not checked")
+            return 0
+        print(f"pyzk:         {result['pyzk_ms']:.1f} ms")
+        for mismatch in result["mismatches"][:20]:
+            print(f"  {mismatch}")
+        print("parity OK" if not result["mismatches"] else f"{len(result['mismatches'])} mismatches")
+        return 1 if result["mismatches"] else 0
+
+    @staticmethod
+    def _mock_backend(args, port: int = 0):
+        from benchmarks.MockBackend import MockBackend
+        return MockBackend(port=port, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                           error_rate=args.error_rate, throttle_rate=args.throttle_rate,
+                           unauthorized_rate=args.unauthorized_rate, token_ttl=args.token_ttl, seed=args.seed)
+
+    @staticmethod
+    def _upload(args) -> int:
+        from benchmarks.UploadLoadTest import UploadLoadTest
+
+        if args.payload:
+            with open(args.payload, 'rb') as f:
+                payload = f.read()
+        else:
+            from benchmarks.PipelineBenchmark import PipelineBenchmark
+            payload = PipelineBenchmark(args.users).build_payload()
+
+        backend = BenchCommand._mock_backend(args).start()
+        try:
+            result = UploadLoadTest(backend, payload, workers=args.workers).run(args.seconds, args.requests)
+        finally:
+            backend.stop()
+
+        def ms(value):
+            return f"{value:.1f}" if value is not None else "-"
+
+        print(f"{result['sent']}/{result['attempted']} payloads of {result['payload_bytes']} bytes "
+              f"in {result['seconds']:.1f} s with {result['workers']} workers")
+        print(f"throughput:  {result['payloads_per_second']:.1f} payloads/s")
+        print(f"latency ms:  p50 {ms(result['p50_ms'])}  p95 {ms(result['p95_ms'])}  "
+              f"p99 {ms(result['p99_ms'])}  max {ms(result['max_ms'])}")
+        print(f"logins:      {result['server']['tokens_issued']}")
+        for response, total in result["server"]["responses"].items():
+            print(f"  {response}: {total}")
+        return 0
+
+    @staticmethod
+    def _backend(args) -> int:
+        backend = BenchCommand._mock_backend(args, port=args.port)
+        paths = backend.paths
+        print(f"Mock backend on {backend.url}: set URL_BASE={backend.url} TOKEN={paths['token']} "
+              f"ATTENDANCE={paths['attendance']} DEVICE={paths['device']}")
+        try:
+            backend.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return 0
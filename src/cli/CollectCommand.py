@@ -0,0 +1,22 @@
+from cli.CommandSupport import add_device_arguments, build_controller
+
+
+class CollectCommand:
+    name = "collect"
+
+    @staticmethod
+    def register(subparsers) -> None:
+        parser = subparsers.add_parser(CollectCommand.name, help="Collect, save and upload today's attendance once")
+        add_device_arguments(parser)
+        parser.add_argument("--attempts", type=int, default=1, help="Attempts before giving up (default 1)")
+        parser.add_argument("--force", action="store_true", help="Download even if the device reports no new records")
+        parser.set_defaults(handler=CollectCommand.run)
+
+    @staticmethod
+    def run(args) -> int:
+        controller = build_controller(args)
+        records = controller.process_attendance(max_attempts=args.attempts, force=args.force)
+        if controller.last_run_metrics:
+            print(controller.last_run_metrics.summary())
+        print(f"Collected {len(records)} records")
+        return 0 if records else 1
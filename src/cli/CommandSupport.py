@@ -0,0 +1,39 @@
+from datetime import date, timedelta
+from typing import Iterator
+
+
+def add_device_arguments(parser) -> None:
+    """Device overrides, so one process per terminal can be started by an external scheduler."""
+    parser.add_argument("--ip", help="Device IP (defaults to ZK_DEVICE_IP)")
+    parser.add_argument("--port", type=int, help="Device port (defaults to ZK_DEVICE_PORT)")
+    parser.add_argument("--password", help="Device password (defaults to ZK_DEVICE_PASSWORD)")
+    parser.add_argument("--timeout", type=int, help="Device timeout in seconds (defaults to ZK_DEVICE_TIMEOUT)")
+    parser.add_argument("--record", action="store_true",
+                        help="Record the device session to data/sessions/ (defaults to ZK_RECORD_SESSIONS)")
+    parser.add_argument("--replay", metavar="SESSION", help="Serve a recorded session instead of the device")
+    parser.add_argument("--time-scale", type=float, default=1.0,
+                        help="Replay speed: 1 keeps the recorded device latency, 0 removes it")
+
+
+def build_connector(args):
+    from config.zk_connector import ZKConnector
+
+    if args.replay:
+        from config.ReplayConnector import ReplayConnector
+        return ReplayConnector(args.replay, time_scale=args.time_scale)
+    return ZKConnector(ip=args.ip, port=args.port, password=args.password, timeout=args.timeout,
+                       record=args.record or None)
+
+
+def build_controller(args):
+    # Imported here so commands that never talk to a device start without loading the pipeline
+    from controllers.AttendanceController import AttendanceController
+
+    return AttendanceController(build_connector(args))
+
+
+def date_range(start: date, end: date) -> Iterator[date]:
+    day = start
+    while day <= end:
+        yield day
+        day += timedelta(days=1)
@@ -0,0 +1,26 @@
+class ExportCommand:
+    name = "export"
+
+    @staticmethod
+    def register(subparsers) -> None:
+        parser = subparsers.add_parser(ExportCommand.name, help="Export attendance history for analytics")
+        actions = parser.add_subparsers(dest="action", required=True)
+
+        parquet = actions.add_parser("parquet", help="Partitioned Parquet datasets (requires pyarrow)")
+        parquet.add_argument("--out", help="Output directory (defaults to data/exports/parquet)")
+        parquet.add_argument("--full", action="store_true", help="Re-export every day, ignoring the manifest")
+
+        parser.set_defaults(handler=ExportCommand.run)
+
+    @staticmethod
+    def run(args) -> int:
+        from services.ParquetExporter import ParquetExporter
+
+        try:
+            exporter = ParquetExporter(args.out)
+        except ImportError as e:
+            print(e)
+            return 2
+        result = exporter.export(full=args.full)
+        print(f"Exported {result['exported']} days, {result['skipped']} unchanged, to {exporter.output_dir}")
+        return 0
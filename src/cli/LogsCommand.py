@@ -0,0 +1,62 @@
+from datetime import date, datetime, timedelta
+from config.LogRepository import LogRepository
+
+
+class LogsCommand:
+    name = "logs"
+
+    @staticmethod
+    def register(subparsers) -> None:
+        parser = subparsers.add_parser(LogsCommand.name, help="Query and maintain attendance_logs.db")
+        parser.add_argument("--db", help="Path to the log database (defaults to data/attendance_logs.db)")
+        actions = parser.add_subparsers(dest="action", required=True)
+
+        errors = actions.add_parser("errors", help="Errors logged on a given day")
+        errors.add_argument("--day", type=date.fromisoformat, default=date.today(), help="YYYY-MM-DD (default: today)")
+
+        query = actions.add_parser("query", help="Filter log entries")
+        query.add_argument("--level", help="DEBUG, INFO, WARNING or ERROR")
+        query.add_argument("--since", type=datetime.fromisoformat, help="ISO date/time, inclusive")
+        query.add_argument("--until", type=datetime.fromisoformat, help="ISO date/time, exclusive")
+        query.add_argument("--contains", help="Substring of the message")
+        query.add_argument("--limit", type=int, default=100)
+
+        stats = actions.add_parser("stats", help="Entries per level and most frequent errors")
+        stats.add_argument("--days", type=int, default=7, help="Look-back window in days")
+
+        prune = actions.add_parser("prune", help="Delete entries older than the retention window")
+        prune.add_argument("--days", type=int, required=True, help="Retention in days")
+        prune.add_argument("--vacuum", action="store_true", help="Reclaim disk space afterwards")
+
+        parser.set_defaults(handler=LogsCommand.run)
+
+    @staticmethod
+    def run(args) -> int:
+        repo = LogRepository(args.db)
+        try:
+            if args.action == "errors":
+                LogsCommand._print_rows(repo.errors_for_day(args.day))
+            elif args.action == "query":
+                LogsCommand._print_rows(repo.query(
+                    level=args.level, since=args.since, until=args.until,
+                    contains=args.contains, limit=args.limit
+                ))
+            elif args.action == "stats":
+                since = datetime.now() - timedelta(days=args.days)
+                for level, total in sorted(repo.count_by_level(since=since).items()):
+                    print(f"{level:<8} {total}")
+                print()
+                for row in repo.top_errors(since=since):
+                    print(f"{row['total']:>6}  {row['last_seen']}  {row['message']}")
+            elif args.action == "prune":
+                removed = repo.prune(args.days, vacuum=args.vacuum)
+                print(f"Removed {removed} log entries older than {args.days} days")
+            return 0
+        finally:
+            repo.close()
+
+    @staticmethod
+    def _print_rows(rows) -> None:
+        for row in rows:
+            print(f"{row['timestamp']}  {row['status']:<8} {row['message']}")
+        print(f"({len(rows)} entries)")
@@ -0,0 +1,28 @@
+from cli.CommandSupport import add_device_arguments, build_connector
+
+
+class ProbeCommand:
+    name = "probe"
+
+    @staticmethod
+    def register(subparsers) -> None:
+        parser = subparsers.add_parser(ProbeCommand.name, help="Check reachability and record counters of a device")
+        add_device_arguments(parser)
+        parser.add_argument("--force", action="store_true", help="Ignore the cached probe result")
+        parser.set_defaults(handler=ProbeCommand.run)
+
+    @staticmethod
+    def run(args) -> int:
+        from services.DeviceProbe import DeviceProbe
+
+        connector = build_connector(args)
+        result = DeviceProbe(connector).probe(force=args.force)
+        usage = result.records_usage
+        print(f"device:         {result.device}")
+        print(f"reachable:      {result.reachable}{' (cached)' if result.cached else ''}")
+        print(f"records:        {result.records} / {result.records_capacity}"
+              f"{f' ({usage:.0%})' if usage is not None else ''}")
+        print(f"users:          {result.users} / {result.users_capacity}")
+        print(f"needs download: {result.needs_download}")
+        print(f"probe time:     {result.duration_ms} ms")
+        return 0 if result.reachable else 1
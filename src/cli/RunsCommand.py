@@ -0,0 +1,56 @@
+from config.RunLedger import RunLedger
+
+
+class RunsCommand:
+    name = "runs"
+
+    @staticmethod
+    def register(subparsers) -> None:
+        parser = subparsers.add_parser(RunsCommand.name, help="Collection run history and duration trends")
+        parser.add_argument("--db", help="Path to the log database (defaults to data/attendance_logs.db)")
+        parser.add_argument("--device", help="Only runs of this device (ip:port, as shown by `runs list`)")
+        actions = parser.add_subparsers(dest="action", required=True)
+
+        recent = actions.add_parser("list", help="Most recent runs")
+        recent.add_argument("--limit", type=int, default=20)
+
+        report = actions.add_parser("report", help="Weekly p50/p95 duration per device")
+        report.add_argument("--days", type=int, default=56, help="Look-back window in days (default 56)")
+        report.add_argument("--stage", default="total", help="Stage to report, e.g. download, process, upload (default total)")
+
+        prune = actions.add_parser("prune", help="Delete runs older than the retention window")
+        prune.add_argument("--days", type=int, required=True, help="Retention in days")
+        prune.add_argument("--vacuum", action="store_true", help="Reclaim disk space afterwards")
+
+        parser.set_defaults(handler=RunsCommand.run)
+
+    @staticmethod
+    def run(args) -> int:
+        ledger = RunLedger(args.db)
+        try:
+            if args.action == "list":
+                print(f"{'started':<20}{'device':<26}{'outcome':<16}{'ms':>9}{'downloaded':>11}{'kept':>7}"
+                      f"{'users':>7}{'written':>10}{'uploaded':>10}{'retries':>8}")
+                for row in ledger.recent(args.device, args.limit):
+                    print(f"{row['started_at']:<20}{row['device']:<26}{row['outcome']:<16}{row['duration_ms']:>9.0f}"
+                          f"{row['records_downloaded']:>11}{row['records_kept']:>7}{row['users_processed']:>7}"
+                          f"{row['bytes_written']:>10}{row['bytes_uploaded']:>10}{row['retries']:>8}")
+            elif args.action == "report":
+                report = ledger.trend(args.days, args.stage, args.device)
+                if not report:
+                    stages = ", ".join(["total", *ledger.stages()])
+                    print(f"No runs with stage '{args.stage}' in the last {args.days} days (stages: {stages})")
+                    return 0
+                for device, weeks in report.items():
+                    print(f"{device}  ({args.stage})")
+                    print(f"  {'week':<10}{'runs':>6}{'ok':>6}{'failed':>8}{'p50 ms':>10}{'p95 ms':>10}")
+                    for week in weeks:
+                        p50 = f"{week['p50_ms']:.0f}" if week['p50_ms'] is not None else "-"
+                        p95 = f"{week['p95_ms']:.0f}" if week['p95_ms'] is not None else "-"
+                        print(f"  {week['week']:<10}{week['runs']:>6}{week['ok']:>6}{week['failed']:>8}{p50:>10}{p95:>10}")
+            elif args.action == "prune":
+                removed = ledger.prune(args.days, vacuum=args.vacuum)
+                print(f"Removed {removed} runs older than {args.days} days")
+            return 0
+        finally:
+            ledger.close()
@@ -0,0 +1,43 @@
+import json
+from datetime import date, timedelta
+from config.FilePathManager import FilePathManager
+from utils.AtomicFile import AtomicFile
+from cli.CommandSupport import date_range
+
+
+class StatsCommand:
+    name = "stats"
+
+    @staticmethod
+    def register(subparsers) -> None:
+        parser = subparsers.add_parser(StatsCommand.name, help="Users, punches and hours per stored day")
+        parser.add_argument("--days", type=int, default=7, help="Look-back window in days (default 7)")
+        parser.set_defaults(handler=StatsCommand.run)
+
+    @staticmethod
+    def run(args) -> int:
+        paths = FilePathManager()
+        end = date.today()
+        print(f"{'date':<12}{'users':>7}{'punches':>9}{'complete':>10}{'hours':>9}{'bytes':>10}")
+        for day in date_range(end - timedelta(days=args.days - 1), end):
+            users, size = {}, 0
+            for filename in paths.iter_day_files(day):
+                try:
+                    payload = AtomicFile.read_verified(filename)
+                except ValueError:
+                    print(f"{day.isoformat():<12}  corrupted: {filename}")
+                    continue
+                if payload is None:
+                    continue
+                records = json.loads(payload)
+                serial = records.get("serial_number", "")
+                users.update({f"{serial}:{user_id}": user for user_id, user in records.get("users", {}).items()})
+                size += len(payload)
+            if not size:
+                continue
+
+            punches = sum(len(user.get("records", [])) for user in users.values())
+            complete = sum(1 for user in users.values() if user.get("status") == 1)
+            hours = sum(float(user.get("total_hours", 0)) for user in users.values())
+            print(f"{day.isoformat():<12}{len(users):>7}{punches:>9}{complete:>10}{hours:>9.2f}{size:>10}")
+        return 0
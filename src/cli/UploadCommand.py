@@ -0,0 +1,26 @@
+from datetime import date
+from cli.CommandSupport import add_device_arguments, build_controller, date_range
+
+
+class UploadCommand:
+    name = "upload"
+
+    @staticmethod
+    def register(subparsers) -> None:
+        parser = subparsers.add_parser(UploadCommand.name, help="Re-send stored day files to the API")
+        add_device_arguments(parser)
+        parser.add_argument("--from", dest="start", type=date.fromisoformat, default=date.today(),
+                            help="YYYY-MM-DD (default: today)")
+        parser.add_argument("--to", dest="end", type=date.fromisoformat, help="YYYY-MM-DD (defaults to --from)")
+        parser.add_argument("--serial", help="Only re-send the files of this device serial (default: every device)")
+        parser.set_defaults(handler=UploadCommand.run)
+
+    @staticmethod
+    def run(args) -> int:
+        controller = build_controller(args)
+        failures = 0
+        for day in date_range(args.start, args.end or args.start):
+            sent = controller.upload_day(day, args.serial)
+            failures += not sent
+            print(f"{day}  {'sent' if sent else 'failed'}")
+        return 1 if failures else 0
@@ -1,16 +1,14 @@
 import os
 from datetime import date
-from typing import Union, Optional
-from dotenv import load_dotenv # type: ignore
+from typing import Iterator, Union, Optional
+from config.Settings import Settings
 
-load_dotenv()
 
-ZK_DEVICE = {
-    'ip': os.getenv('ZK_DEVICE_IP'),
-    'port': int(os.getenv('ZK_DEVICE_PORT')),
-    'password': os.getenv('ZK_DEVICE_PASSWORD'),
-    'timeout': int(os.getenv('ZK_DEVICE_TIMEOUT'))
-}
+def __getattr__(name):
+    # ZK_DEVICE used to be built from the environment at import time
+    if name == 'ZK_DEVICE':
+        return Settings.get().zk_device
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 class FilePathManager:
     def __init__(self, base_dir: Optional[str] = None):
@@ -24,16 +22,44 @@ class FilePathManager:
         for directory in [self.database_dir, self.output_dir, self.device_dir]:
             os.makedirs(directory, exist_ok=True)
 
-    def get_json_filename(self, identifier: Union[date, str], file_type: str = 'attendance') -> str:
+    @staticmethod
+    def _clean(identifier: str) -> str:
+        return "".join(c if c.isalnum() else "_" for c in str(identifier))
+
+    def get_json_filename(self, identifier: Union[date, str], file_type: str = 'attendance',
+                          device: Optional[str] = None) -> str:
+        """
+        Day files of a device live in `attandance_output/<serial>/`, so collectors of different
+        devices never write the same file. Without `device` the shared legacy path is returned.
+        """
         if not identifier:
             raise ValueError("empty identifier")
         
         if isinstance(identifier, date):
             clean_id = identifier.strftime('%Y%m%d')
             target_dir = self.output_dir
+            if device:
+                target_dir = os.path.join(self.output_dir, self._clean(device))
+                os.makedirs(target_dir, exist_ok=True)
         else:
-            clean_id = "".join(c if c.isalnum() else "_" for c in str(identifier))
+            clean_id = self._clean(identifier)
             target_dir = self.device_dir
 
         filename = f"{file_type}_{clean_id}.json"
-        return os.path.join(target_dir, filename)
\ No newline at end of file
+        return os.path.join(target_dir, filename)
+
+    def iter_day_files(self, day: date) -> Iterator[str]:
+        """Existing files of `day`: the legacy shared file and one per device partition."""
+        filename = f"attendance_{day.strftime('%Y%m%d')}.json"
+        candidates = [os.path.join(self.output_dir, filename)] + [
+            os.path.join(entry.path, filename) for entry in sorted(os.scandir(self.output_dir), key=lambda e: e.name)
+            if entry.is_dir()
+        ]
+        return (path for path in candidates if os.path.exists(path))
+
+    def iter_attendance_files(self) -> Iterator[str]:
+        """Paths of all stored attendance day files."""
+        for root, _, files in os.walk(self.output_dir):
+            for name in files:
+                if name.startswith('attendance_') and name.endswith('.json'):
+                    yield os.path.join(root, name)
\ No newline at end of file
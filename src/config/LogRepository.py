@@ -0,0 +1,84 @@
+import sqlite3
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+from config.database_config import (
+    DEFAULT_DB_FOLDER, DEFAULT_DB_NAME, TIMESTAMP_FORMAT, initialize_schema, prune_logs
+)
+
+
+class LogRepository:
+    """Read-side access to attendance_logs.db for the common lookups."""
+
+    def __init__(self, db_path: Optional[Union[str, Path]] = None):
+        self.db_path = Path(db_path) if db_path else DEFAULT_DB_FOLDER / DEFAULT_DB_NAME
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.row_factory = sqlite3.Row
+        initialize_schema(self.conn)
+
+    def query(self, level: Optional[str] = None,
+              since: Optional[datetime] = None,
+              until: Optional[datetime] = None,
+              contains: Optional[str] = None,
+              limit: int = 100) -> List[Dict]:
+        clauses, params = [], []
+        if level:
+            clauses.append("status = ?")
+            params.append(level.upper())
+        if since:
+            clauses.append("timestamp >= ?")
+            params.append(since.strftime(TIMESTAMP_FORMAT))
+        if until:
+            clauses.append("timestamp < ?")
+            params.append(until.strftime(TIMESTAMP_FORMAT))
+        if contains:
+            clauses.append("message LIKE ?")
+            params.append(f"%{contains}%")
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self.conn.execute(
+            f"SELECT id, timestamp, status, message FROM attendance_logs {where} "
+            f"ORDER BY timestamp DESC, id DESC LIMIT ?",
+            (*params, limit)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def errors_for_day(self, day: date, limit: int = 1000) -> List[Dict]:
+        start = datetime.combine(day, datetime.min.time())
+        return self.query(level="ERROR", since=start, until=start + timedelta(days=1), limit=limit)
+
+    def count_by_level(self, since: Optional[datetime] = None, until: Optional[datetime] = None) -> Dict[str, int]:
+        clauses, params = [], []
+        if since:
+            clauses.append("timestamp >= ?")
+            params.append(since.strftime(TIMESTAMP_FORMAT))
+        if until:
+            clauses.append("timestamp < ?")
+            params.append(until.strftime(TIMESTAMP_FORMAT))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self.conn.execute(
+            f"SELECT status, COUNT(*) AS total FROM attendance_logs {where} GROUP BY status", params
+        ).fetchall()
+        return {row["status"]: row["total"] for row in rows}
+
+    def top_errors(self, since: Optional[datetime] = None, limit: int = 10) -> List[Dict]:
+        params = ["ERROR"]
+        where = "WHERE status = ?"
+        if since:
+            where += " AND timestamp >= ?"
+            params.append(since.strftime(TIMESTAMP_FORMAT))
+        rows = self.conn.execute(
+            f"SELECT message, COUNT(*) AS total, MAX(timestamp) AS last_seen FROM attendance_logs {where} "
+            f"GROUP BY message ORDER BY total DESC LIMIT ?",
+            (*params, limit)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def prune(self, retention_days: int, vacuum: bool = False) -> int:
+        removed = prune_logs(self.conn, retention_days)
+        if vacuum:
+            self.conn.execute("VACUUM")
+        return removed
+
+    def close(self) -> None:
+        self.conn.close()
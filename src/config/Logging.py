@@ -1,18 +1,60 @@
 import logging
+import os
+from typing import Optional
 from config.database_config import DatabaseLogs
+from config.Settings import Settings
+
+ROOT_LOGGER_NAME = "AttendanceLogger"
 
 class InfoErrorFilter(logging.Filter):
     """Filter to record INFO and ERROR only."""
     def filter(self, record):
         return record.levelno in (logging.INFO, logging.ERROR)
 
+class SampledDebugFilter(logging.Filter):
+    """Lets through one of every `rate` DEBUG records per call site; other levels always pass."""
+    def __init__(self, rate: int):
+        super().__init__()
+        self.rate = max(1, rate)
+        self._counters = {}
+
+    def filter(self, record):
+        if record.levelno != logging.DEBUG or self.rate == 1:
+            return True
+        site = (record.pathname, record.lineno)
+        count = self._counters.get(site, 0)
+        self._counters[site] = count + 1
+        return count % self.rate == 0
+
 class Logger:
     _logger = None  # Class variable to store the logger and avoid duplicates
+    _components = {}
+
     @staticmethod
-    def get_logger():
+    def _level_from_env(name: str, default: Optional[int]) -> Optional[int]:
+        value = os.getenv(name)
+        if not value:
+            return default
+        level = logging.getLevelName(value.strip().upper())
+        return level if isinstance(level, int) else default
+
+    @staticmethod
+    def _sample_rate_from_env() -> int:
+        try:
+            return int(os.getenv('LOG_DEBUG_SAMPLE_RATE', '1'))
+        except ValueError:
+            return 1
+
+    @staticmethod
+    def get_logger(component: Optional[str] = None):
+        """
+        Returns the shared logger, or a child of it for `component`.
+        LOG_LEVEL sets the base level and LOG_LEVEL_<COMPONENT> overrides it per component.
+        """
         if Logger._logger is None:
-            logger = logging.getLogger("AttendanceLogger")
-            logger.setLevel(logging.DEBUG)
+            Settings.load_environment()
+            logger = logging.getLogger(ROOT_LOGGER_NAME)
+            logger.setLevel(Logger._level_from_env('LOG_LEVEL', logging.DEBUG))
 
             if not logger.hasHandlers():
                 full_formatter = logging.Formatter(
@@ -24,7 +66,8 @@ class Logger:
 
                 console_handler = logging.StreamHandler()
                 console_handler.setLevel(logging.DEBUG)
-                console_handler.setFormatter(console_formatter) 
+                console_handler.setFormatter(console_formatter)
+                console_handler.addFilter(SampledDebugFilter(Logger._sample_rate_from_env()))
                 logger.addHandler(console_handler)
 
                 sqlite_handler = DatabaseLogs()
@@ -34,4 +77,13 @@ class Logger:
 
             Logger._logger = logger  # Guardar instancia en la variable de clase
 
-        return Logger._logger
+        if not component:
+            return Logger._logger
+
+        if component not in Logger._components:
+            child = Logger._logger.getChild(component)
+            level = Logger._level_from_env(f"LOG_LEVEL_{component.upper()}", None)
+            if level is not None:
+                child.setLevel(level)
+            Logger._components[component] = child
+        return Logger._components[component]
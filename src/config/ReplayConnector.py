@@ -0,0 +1,110 @@
+import builtins
+import gzip
+import json
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Dict, Union
+from config.zk_connector import ZKConnector
+from config.SessionRecorder import SESSION_VERSION, decode
+
+
+class ReplayError(Exception):
+    """A recorded device error that has no builtin equivalent, or a call the session never saw."""
+
+
+class ReplaySession:
+    """
+    Recorded responses grouped by call name and served in their original order; once a name runs
+    out its last response is repeated, so a session can drive more runs than were recorded.
+    """
+
+    def __init__(self, path: Union[str, Path], time_scale: float = 1.0):
+        with open(path, 'rb') as f:
+            payload = gzip.decompress(f.read())
+        try:
+            session = decode(json.loads(payload))
+        except ValueError:
+            # Version 1 sessions were pickles, which are never loaded: record the device again
+            raise ValueError(f"Unsupported session format in {path}, record it again") from None
+        if session.get("version") != SESSION_VERSION:
+            raise ValueError(f"Unsupported session version {session.get('version')} in {path}")
+        self.path = Path(path)
+        self.device = session["device"]
+        self.recorded_at = session["recorded_at"]
+        self.time_scale = time_scale
+        self._responses: Dict[str, deque] = defaultdict(deque)
+        self._last: Dict[str, Dict] = {}
+        for event in session["events"]:
+            self._responses[event["name"]].append(event)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._responses or name in self._last
+
+    def respond(self, name: str):
+        queue = self._responses.get(name)
+        if queue:
+            event = self._last[name] = queue.popleft()
+        elif name in self._last:
+            event = self._last[name]
+        else:
+            raise ReplayError(f"No recorded response for {name} in {self.path}")
+
+        if self.time_scale > 0:
+            time.sleep(event["duration"] * self.time_scale)
+        if "error" in event:
+            module, error_type, message = event["error"]
+            error = getattr(builtins, error_type, None) if module == 'builtins' else None
+            if isinstance(error, type) and issubclass(error, Exception):
+                raise error(message)
+            raise ReplayError(f"{error_type}: {message}")
+        return event["result"]
+
+
+class ReplayConnection:
+    """Stands in for a pyzk connection; every method and counter comes from the session."""
+
+    def __init__(self, session: ReplaySession):
+        self._session = session
+
+    def __getattr__(self, name: str):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if f"attr:{name}" in self._session:
+            return self._session.respond(f"attr:{name}")
+        if name not in self._session:
+            raise AttributeError(f"{name} was not recorded in {self._session.path}")
+        return lambda *args, **kwargs: self._session.respond(name)
+
+
+class ReplayZK:
+    def __init__(self, session: ReplaySession):
+        self.session = session
+
+    def connect(self):
+        if "connect" in self.session and not self.session.respond("connect"):
+            return None
+        return ReplayConnection(self.session)
+
+
+class ReplayConnector(ZKConnector):
+    """
+    ZKConnector that serves a recorded session instead of a terminal, with the original timing
+    scaled by `time_scale` (1.0 as recorded, 0 for no delays). Locking and disconnects behave as usual.
+    """
+
+    def __init__(self, path: Union[str, Path], time_scale: float = 1.0):
+        super().__init__()
+        self.session = ReplaySession(path, time_scale)
+        self._zk = ReplayZK(self.session)
+        self.recorder = None
+
+    @property
+    def device_key(self) -> str:
+        # Separate breaker and probe state from the live device
+        return f"replay:{self.session.device}"
+
+    def is_reachable(self) -> bool:
+        if "is_reachable" in self.session:
+            return bool(self.session.respond("is_reachable"))
+        return True
@@ -0,0 +1,184 @@
+import sqlite3
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+from config.Settings import Settings
+from config.database_config import DEFAULT_DB_FOLDER, DEFAULT_DB_NAME, TIMESTAMP_FORMAT
+from utils.RunMetrics import RunMetrics
+
+# Counters with their own column; everything else stays queryable in run_counters
+RUN_COLUMNS = ("records_downloaded", "records_kept", "users_processed", "bytes_written", "bytes_uploaded")
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Linear interpolation between the closest ranks, as numpy.percentile does by default."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class RunLedger:
+    """
+    One row per collection run in the `runs` table of attendance_logs.db, with its stage durations
+    in `run_stages` and remaining counters in `run_counters`, for p50/p95 trends per device.
+    Runs older than LOG_RETENTION_DAYS are pruned at most once an hour, like the log table.
+    """
+    PRUNE_INTERVAL_SECONDS = 3600
+
+    def __init__(self, db_path: Optional[Union[str, Path]] = None, retention_days: Optional[int] = None):
+        self.db_path = Path(db_path) if db_path else DEFAULT_DB_FOLDER / DEFAULT_DB_NAME
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.retention_days = retention_days if retention_days is not None else Settings.get().log_retention_days
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.row_factory = sqlite3.Row
+        self._last_prune = 0.0
+        self._initialize_db()
+
+    def _initialize_db(self) -> None:
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS runs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    device TEXT NOT NULL,
+                    serial_number TEXT,
+                    outcome TEXT NOT NULL,
+                    started_at TEXT NOT NULL,
+                    finished_at TEXT NOT NULL,
+                    duration_ms REAL NOT NULL,
+                    records_downloaded INTEGER NOT NULL DEFAULT 0,
+                    records_kept INTEGER NOT NULL DEFAULT 0,
+                    users_processed INTEGER NOT NULL DEFAULT 0,
+                    bytes_written INTEGER NOT NULL DEFAULT 0,
+                    bytes_uploaded INTEGER NOT NULL DEFAULT 0,
+                    retries INTEGER NOT NULL DEFAULT 0,
+                    peak_allocated_bytes INTEGER
+                )
+            """)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS run_stages (
+                    run_id INTEGER NOT NULL REFERENCES runs (id),
+                    stage TEXT NOT NULL,
+                    duration_ms REAL NOT NULL,
+                    PRIMARY KEY (run_id, stage)
+                )
+            """)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS run_counters (
+                    run_id INTEGER NOT NULL REFERENCES runs (id),
+                    name TEXT NOT NULL,
+                    value INTEGER NOT NULL,
+                    PRIMARY KEY (run_id, name)
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_device_started ON runs (device, started_at)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_started ON runs (started_at)")
+
+    def record(self, device: str, serial_number: Optional[str], outcome: str, metrics: RunMetrics,
+               retries: int = 0) -> int:
+        """Stores a stopped RunMetrics; returns the new run id."""
+        counters = metrics.counters
+        started_at = datetime.fromtimestamp(metrics.started_at)
+        finished_at = datetime.fromtimestamp(metrics.finished_at or metrics.started_at)
+        with self.conn:
+            cursor = self.conn.execute(
+                f"""
+                INSERT INTO runs (device, serial_number, outcome, started_at, finished_at, duration_ms,
+                                  {', '.join(RUN_COLUMNS)}, retries, peak_allocated_bytes)
+                VALUES (?, ?, ?, ?, ?, ?, {', '.join('?' for _ in RUN_COLUMNS)}, ?, ?)
+                """,
+                (device, serial_number, outcome, started_at.strftime(TIMESTAMP_FORMAT),
+                 finished_at.strftime(TIMESTAMP_FORMAT), metrics.stages.get('total', 0.0) * 1000,
+                 *(counters.get(name, 0) for name in RUN_COLUMNS), retries, metrics.peak_allocated_bytes)
+            )
+            run_id = cursor.lastrowid
+            self.conn.executemany(
+                "INSERT INTO run_stages (run_id, stage, duration_ms) VALUES (?, ?, ?)",
+                [(run_id, stage, seconds * 1000) for stage, seconds in metrics.stages.items() if stage != 'total']
+            )
+            self.conn.executemany(
+                "INSERT INTO run_counters (run_id, name, value) VALUES (?, ?, ?)",
+                [(run_id, name, value) for name, value in counters.items()
+                 if name not in RUN_COLUMNS and name != 'retries']
+            )
+        self._prune_if_due()
+        return run_id
+
+    def prune(self, retention_days: int, vacuum: bool = False) -> int:
+        """Deletes runs started before the retention window with their stages and counters; returns the runs removed."""
+        cutoff = (datetime.now() - timedelta(days=retention_days)).strftime(TIMESTAMP_FORMAT)
+        old_runs = "SELECT id FROM runs WHERE started_at < ?"
+        with self.conn:
+            self.conn.execute(f"DELETE FROM run_stages WHERE run_id IN ({old_runs})", (cutoff,))
+            self.conn.execute(f"DELETE FROM run_counters WHERE run_id IN ({old_runs})", (cutoff,))
+            removed = self.conn.execute("DELETE FROM runs WHERE started_at < ?", (cutoff,)).rowcount
+        if vacuum:
+            self.conn.execute("VACUUM")
+        return removed
+
+    def _prune_if_due(self) -> None:
+        now = time.monotonic()
+        if self.retention_days <= 0 or (self._last_prune and now - self._last_prune < self.PRUNE_INTERVAL_SECONDS):
+            return
+        self._last_prune = now
+        self.prune(self.retention_days)
+
+    def recent(self, device: Optional[str] = None, limit: int = 20) -> List[Dict]:
+        where, params = ("WHERE device = ?", [device]) if device else ("", [])
+        rows = self.conn.execute(
+            f"SELECT * FROM runs {where} ORDER BY started_at DESC, id DESC LIMIT ?", (*params, limit)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def durations(self, since: datetime, stage: str = "total", device: Optional[str] = None) -> List[Dict]:
+        """`device`, `started_at`, `outcome` and `duration_ms` of `stage` for every run since `since`."""
+        clauses, params = ["r.started_at >= ?"], [since.strftime(TIMESTAMP_FORMAT)]
+        if device:
+            clauses.append("r.device = ?")
+            params.append(device)
+        if stage == "total":
+            query = "SELECT r.device, r.started_at, r.outcome, r.duration_ms FROM runs r"
+        else:
+            query = ("SELECT r.device, r.started_at, r.outcome, s.duration_ms FROM runs r "
+                     "JOIN run_stages s ON s.run_id = r.id AND s.stage = ?")
+            params.insert(0, stage)
+        rows = self.conn.execute(f"{query} WHERE {' AND '.join(clauses)} ORDER BY r.started_at", params).fetchall()
+        return [dict(row) for row in rows]
+
+    def trend(self, days: int = 56, stage: str = "total", device: Optional[str] = None) -> Dict[str, List[Dict]]:
+        """
+        Weekly run count, failures and p50/p95 of `stage` per device, oldest week first. Percentiles
+        only cover `ok` runs: skipped and failed runs end early and would pull them down.
+        """
+        since = datetime.now() - timedelta(days=days)
+        weeks: Dict[str, Dict[str, List]] = defaultdict(lambda: defaultdict(list))
+        for row in self.durations(since, stage, device):
+            started = datetime.strptime(row["started_at"], TIMESTAMP_FORMAT)
+            year, week, _ = started.isocalendar()
+            weeks[row["device"]][f"{year}-W{week:02d}"].append(row)
+
+        report = {}
+        for name, by_week in sorted(weeks.items()):
+            report[name] = []
+            for week, rows in sorted(by_week.items()):
+                durations = [row["duration_ms"] for row in rows if row["outcome"] == "ok"]
+                report[name].append({
+                    "week": week,
+                    "runs": len(rows),
+                    "ok": len(durations),
+                    "failed": sum(1 for row in rows if row["outcome"] == "failed"),
+                    "p50_ms": percentile(durations, 0.5),
+                    "p95_ms": percentile(durations, 0.95),
+                })
+        return report
+
+    def stages(self) -> List[str]:
+        return [row["stage"] for row in self.conn.execute("SELECT DISTINCT stage FROM run_stages ORDER BY stage")]
+
+    def close(self) -> None:
+        self.conn.close()
@@ -0,0 +1,153 @@
+import base64
+import gzip
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+from config.Logging import Logger
+from utils.AtomicFile import AtomicFile
+from utils.FileNameSanitizer import FileNameSanitizer
+
+SESSIONS_DIR = Path(__file__).parent.parent / 'data' / 'sessions'
+SESSION_VERSION = 2
+PLAIN_TYPES = (str, bytes, bytearray, int, float, bool, type(None), datetime)
+
+
+def plain(value: Any) -> Any:
+    """Copies pyzk results into builtins and SimpleNamespace, so a session replays without pyzk."""
+    if isinstance(value, PLAIN_TYPES):
+        return value
+    if isinstance(value, (list, tuple)):
+        return type(value)(plain(item) for item in value)
+    if isinstance(value, dict):
+        return {key: plain(item) for key, item in value.items()}
+    if hasattr(value, '__dict__'):
+        return SimpleNamespace(**{key: plain(item) for key, item in vars(value).items()})
+    return value
+
+
+def encode(value: Any) -> Any:
+    """JSON-safe form of a `plain` value; bytes, datetimes, tuples and objects become tagged dicts."""
+    if isinstance(value, (bytes, bytearray)):
+        return {"__bytes__": base64.b64encode(value).decode("ascii")}
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, tuple):
+        return {"__tuple__": [encode(item) for item in value]}
+    if isinstance(value, list):
+        return [encode(item) for item in value]
+    if isinstance(value, SimpleNamespace):
+        return {"__object__": {key: encode(item) for key, item in vars(value).items()}}
+    if isinstance(value, dict):
+        if all(isinstance(key, str) and not key.startswith("__") for key in value):
+            return {key: encode(item) for key, item in value.items()}
+        return {"__dict__": [[encode(key), encode(item)] for key, item in value.items()]}
+    return value
+
+
+def decode(value: Any) -> Any:
+    """Inverse of `encode`."""
+    if isinstance(value, list):
+        return [decode(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    if "__bytes__" in value:
+        return base64.b64decode(value["__bytes__"])
+    if "__datetime__" in value:
+        return datetime.fromisoformat(value["__datetime__"])
+    if "__tuple__" in value:
+        return tuple(decode(item) for item in value["__tuple__"])
+    if "__object__" in value:
+        return SimpleNamespace(**{key: decode(item) for key, item in value["__object__"].items()})
+    if "__dict__" in value:
+        return {decode(key): decode(item) for key, item in value["__dict__"]}
+    return {key: decode(item) for key, item in value.items()}
+
+
+class SessionRecorder:
+    """
+    Records every call made on a pyzk connection (name, result or raised error, duration) and writes
+    them as gzip-compressed JSON under data/sessions/. Replay them with `ReplayConnector`.
+    `next_session` closes the current file, so a long-lived connector writes one file per collection run.
+    """
+
+    def __init__(self, device: str, path: Optional[Path] = None):
+        self.device = device
+        self.path = Path(path) if path else self._new_path()
+        self.events: List[Dict] = []
+        self.log = Logger.get_logger()
+        self._saved = 0
+
+    def _new_path(self) -> Path:
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        path = SESSIONS_DIR / f"{FileNameSanitizer.sanitize(self.device)}_{stamp}.zks"
+        counter = 1
+        while path.exists():
+            path = SESSIONS_DIR / f"{FileNameSanitizer.sanitize(self.device)}_{stamp}_{counter}.zks"
+            counter += 1
+        return path
+
+    def next_session(self) -> None:
+        """Saves the calls recorded so far and starts an empty session in a new file."""
+        self.save()
+        if self.events:
+            self.path = self._new_path()
+            self.events = []
+            self._saved = 0
+
+    def record(self, name: str, start: float, result: Any = None, error: Optional[BaseException] = None) -> None:
+        event = {"name": name, "duration": time.perf_counter() - start}
+        if error is not None:
+            event["error"] = (type(error).__module__, type(error).__name__, str(error))
+        else:
+            event["result"] = plain(result)
+        self.events.append(event)
+
+    def wrap(self, conn) -> 'RecordingConnection':
+        return RecordingConnection(conn, self)
+
+    def save(self) -> None:
+        if len(self.events) == self._saved:
+            return
+        try:
+            session = {
+                "version": SESSION_VERSION,
+                "device": self.device,
+                "recorded_at": datetime.now().isoformat(timespec='seconds'),
+                "events": self.events,
+            }
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            AtomicFile.write(self.path, gzip.compress(json.dumps(encode(session)).encode("utf-8")))
+            self._saved = len(self.events)
+            self.log.debug(f"Session with {self._saved} device calls recorded to {self.path}")
+        except Exception as e:
+            self.log.error(f"Error saving device session {self.path}: {e}")
+
+
+class RecordingConnection:
+    """Transparent proxy around a pyzk connection that reports each call to a SessionRecorder."""
+
+    def __init__(self, conn, recorder: SessionRecorder):
+        self._conn = conn
+        self._recorder = recorder
+
+    def __getattr__(self, name: str):
+        start = time.perf_counter()
+        value = getattr(self._conn, name)
+        if not callable(value):
+            # Counters such as `records` and `users` are plain attributes filled by read_sizes()
+            self._recorder.record(f"attr:{name}", start, value)
+            return value
+
+        def call(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = value(*args, **kwargs)
+            except Exception as e:
+                self._recorder.record(name, start, error=e)
+                raise
+            self._recorder.record(name, start, result)
+            return result
+        return call
@@ -0,0 +1,155 @@
+import os
+from pathlib import Path
+from dataclasses import dataclass
+from typing import ClassVar, Dict, Optional
+
+DEFAULT_NTP_SERVER = "pool.ntp.org"
+DEFAULT_TIMEZONE = "America/Bogota"
+DEFAULT_NTP_VERSION = 3
+DEFAULT_NTP_TIMEOUT = 5
+DEFAULT_LOG_RETENTION_DAYS = 90
+DEFAULT_RETRY_BASE_DELAY = 5
+DEFAULT_RETRY_MAX_DELAY = 600
+DEFAULT_RETRY_MAX_ATTEMPTS = 6
+DEFAULT_BREAKER_FAILURE_THRESHOLD = 3
+DEFAULT_BREAKER_COOLDOWN = 300
+DEFAULT_PROBE_CACHE_TTL = 60
+DEFAULT_DEVICE_PRUNE_MIN_RECORDS = 5000
+DEFAULT_PUNCH_DEBOUNCE_SECONDS = 60
+DEFAULT_PROFILE_SECONDS = 30
+DEFAULT_SHIFT_CONFIG = Path(__file__).parent.parent / 'data' / 'shifts.json'
+
+
+def _int_env(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Environment configuration, read once on first use instead of at module import."""
+
+    # Device
+    zk_device_ip: Optional[str]
+    zk_device_port: int
+    zk_device_password: str
+    zk_device_timeout: int
+    fast_attendance_decoder: bool
+    zk_record_sessions: bool
+
+    # Time
+    execution_time: Optional[str]
+    ntp_server: str
+    timezone: str
+    ntp_version: int
+    ntp_timeout: int
+
+    # API
+    url_base: Optional[str]
+    token_path: Optional[str]
+    attendance_path: Optional[str]
+    device_path: Optional[str]
+    login_email: Optional[str]
+    login_password: Optional[str]
+
+    # Retries
+    retry_base_delay: int
+    retry_max_delay: int
+    retry_max_attempts: int
+    breaker_failure_threshold: int
+    breaker_cooldown: int
+
+    # Device probe
+    probe_before_collect: bool
+    probe_cache_ttl: int
+
+    # Device retention
+    device_prune_enabled: bool
+    device_prune_min_records: int
+
+    # Shifts
+    shift_config: str
+    punch_debounce_seconds: int
+
+    # Logs and metrics
+    log_retention_days: int
+    run_trace_allocations: bool
+
+    # Profiling
+    profiler_signal: bool
+    profiler_admin_port: int
+    profile_mode: str
+    profile_seconds: int
+
+    _instance: ClassVar[Optional['Settings']] = None
+    _environment_loaded: ClassVar[bool] = False
+
+    @classmethod
+    def load_environment(cls) -> None:
+        """Loads .env into os.environ exactly once per process."""
+        if not cls._environment_loaded:
+            from dotenv import load_dotenv  # type: ignore
+            load_dotenv()
+            cls._environment_loaded = True
+
+    @classmethod
+    def get(cls) -> 'Settings':
+        if cls._instance is None:
+            cls._instance = cls.from_env()
+        return cls._instance
+
+    @classmethod
+    def reload(cls) -> 'Settings':
+        cls._instance = None
+        return cls.get()
+
+    @classmethod
+    def from_env(cls) -> 'Settings':
+        cls.load_environment()
+        return cls(
+            zk_device_ip=os.getenv('ZK_DEVICE_IP'),
+            zk_device_port=_int_env('ZK_DEVICE_PORT', 4370),
+            zk_device_password=os.getenv('ZK_DEVICE_PASSWORD', '0'),
+            zk_device_timeout=_int_env('ZK_DEVICE_TIMEOUT', 5),
+            fast_attendance_decoder=os.getenv('FAST_ATTENDANCE_DECODER', '0') == '1',
+            zk_record_sessions=os.getenv('ZK_RECORD_SESSIONS', '0') == '1',
+            execution_time=os.getenv('EXECUTION_TIME'),
+            ntp_server=os.getenv('NTP_SERVER', DEFAULT_NTP_SERVER),
+            timezone=os.getenv('TIMEZONE', DEFAULT_TIMEZONE),
+            ntp_version=_int_env('NTP_VERSION', DEFAULT_NTP_VERSION),
+            ntp_timeout=_int_env('NTP_TIMEOUT', DEFAULT_NTP_TIMEOUT),
+            url_base=os.getenv('URL_BASE'),
+            token_path=os.getenv('TOKEN'),
+            attendance_path=os.getenv('ATTENDANCE'),
+            device_path=os.getenv('DEVICE'),
+            login_email=os.getenv('LOGIN_EMAIL'),
+            login_password=os.getenv('LOGIN_PASSWORD'),
+            retry_base_delay=_int_env('RETRY_BASE_DELAY', DEFAULT_RETRY_BASE_DELAY),
+            retry_max_delay=_int_env('RETRY_MAX_DELAY', DEFAULT_RETRY_MAX_DELAY),
+            retry_max_attempts=_int_env('RETRY_MAX_ATTEMPTS', DEFAULT_RETRY_MAX_ATTEMPTS),
+            breaker_failure_threshold=_int_env('BREAKER_FAILURE_THRESHOLD', DEFAULT_BREAKER_FAILURE_THRESHOLD),
+            breaker_cooldown=_int_env('BREAKER_COOLDOWN', DEFAULT_BREAKER_COOLDOWN),
+            probe_before_collect=os.getenv('PROBE_BEFORE_COLLECT', '1') == '1',
+            probe_cache_ttl=_int_env('PROBE_CACHE_TTL', DEFAULT_PROBE_CACHE_TTL),
+            device_prune_enabled=os.getenv('DEVICE_PRUNE_ENABLED', '0') == '1',
+            device_prune_min_records=_int_env('DEVICE_PRUNE_MIN_RECORDS', DEFAULT_DEVICE_PRUNE_MIN_RECORDS),
+            shift_config=os.getenv('SHIFT_CONFIG', str(DEFAULT_SHIFT_CONFIG)),
+            punch_debounce_seconds=_int_env('PUNCH_DEBOUNCE_SECONDS', DEFAULT_PUNCH_DEBOUNCE_SECONDS),
+            log_retention_days=_int_env('LOG_RETENTION_DAYS', DEFAULT_LOG_RETENTION_DAYS),
+            run_trace_allocations=os.getenv('RUN_TRACE_ALLOCATIONS', '0') == '1',
+            profiler_signal=os.getenv('PROFILER_SIGNAL', '0') == '1',
+            profiler_admin_port=_int_env('PROFILER_ADMIN_PORT', 0),
+            profile_mode=os.getenv('PROFILE_MODE', 'sample'),
+            profile_seconds=_int_env('PROFILE_SECONDS', DEFAULT_PROFILE_SECONDS),
+        )
+
+    @property
+    def zk_device(self) -> Dict:
+        return {
+            'ip': self.zk_device_ip,
+            'port': self.zk_device_port,
+            'password': self.zk_device_password,
+            'timeout': self.zk_device_timeout
+        }
@@ -1,50 +1,107 @@
 import logging
 import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
 from pathlib import Path
+from config.Settings import Settings
+
+DEFAULT_DB_FOLDER = Path(__file__).parent.parent / "data"
+DEFAULT_DB_NAME = "attendance_logs.db"
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
 
 class DatabaseLogs(logging.Handler):
-    def __init__(self, db_folder="data", db_name="attendance_logs.db"):
+    PRUNE_INTERVAL_SECONDS = 3600
+
+    def __init__(self, db_folder="data", db_name=DEFAULT_DB_NAME, retention_days=None):
         super().__init__()
 
         self.db_folder = Path(__file__).parent.parent / db_folder
-        self.db_folder.mkdir(parents=True, exist_ok=True)
         self.db_path = self.db_folder / db_name
+        self.retention_days = retention_days if retention_days is not None else Settings.get().log_retention_days
+        self._conn = None
+        self._conn_lock = threading.Lock()
+        self._last_prune = 0.0
 
-        self._initialize_db()
-
-    def _initialize_db(self):
+    def _initialize_db(self, conn: sqlite3.Connection):
         """Create the table in the database if it does not exist."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS attendance_logs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp TEXT NOT NULL,
-                    status TEXT NOT NULL,
-                    message TEXT NOT NULL,
-                    logs TEXT NOT NULL,
-                    created_at TEXT NOT NULL
-                )
-            """)
-            conn.commit()
+        initialize_schema(conn)
+
+    def _connection(self) -> sqlite3.Connection:
+        # The database is opened on the first record, so importing or configuring logging stays cheap
+        with self._conn_lock:
+            if self._conn is None:
+                self.db_folder.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(self.db_path, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                self._initialize_db(conn)
+                self._conn = conn
+            return self._conn
+
+    def _prune_if_due(self) -> None:
+        now = time.monotonic()
+        if self.retention_days <= 0 or (self._last_prune and now - self._last_prune < self.PRUNE_INTERVAL_SECONDS):
+            return
+        self._last_prune = now
+        prune_logs(self._connection(), self.retention_days)
 
     def emit(self, record):
         """Saves the log in the database."""
-        if self.formatter:
-            log_time = self.formatter.formatTime(record, self.formatter.datefmt)
-            log_message = self.format(record)
-        else:
-            log_time = record.created
-            log_message = record.msg
-
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO attendance_logs (timestamp, status, message, logs, created_at) 
-                VALUES (?, ?, ?, ?, ?)
-            """, (log_time, record.levelname, record.msg, log_message, log_time))
-            conn.commit()
+        try:
+            if self.formatter:
+                log_time = self.formatter.formatTime(record, TIMESTAMP_FORMAT)
+            else:
+                log_time = datetime.fromtimestamp(record.created).strftime(TIMESTAMP_FORMAT)
+
+            with self._connection() as conn:
+                conn.execute("""
+                    INSERT INTO attendance_logs (timestamp, status, message, created_at)
+                    VALUES (?, ?, ?, ?)
+                """, (log_time, record.levelname, record.getMessage(), log_time))
+            self._prune_if_due()
+        except Exception:
+            self.handleError(record)
 
     def close(self):
         """Correctly closes the handler."""
+        with self._conn_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
         super().close()
+
+
+def initialize_schema(conn: sqlite3.Connection) -> None:
+    """Creates the log table and its indexes, migrating the old layout that stored every message twice."""
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(attendance_logs)")]
+    if 'logs' in columns:
+        conn.execute("ALTER TABLE attendance_logs RENAME TO attendance_logs_old")
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS attendance_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT NOT NULL,
+            status TEXT NOT NULL,
+            message TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        )
+    """)
+
+    if 'logs' in columns:
+        conn.execute("""
+            INSERT INTO attendance_logs (id, timestamp, status, message, created_at)
+            SELECT id, timestamp, status, message, created_at FROM attendance_logs_old
+        """)
+        conn.execute("DROP TABLE attendance_logs_old")
+
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_attendance_logs_timestamp ON attendance_logs (timestamp)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_attendance_logs_status_timestamp ON attendance_logs (status, timestamp)")
+    conn.commit()
+
+
+def prune_logs(conn: sqlite3.Connection, retention_days: int) -> int:
+    """Deletes log rows older than the retention window; returns the number of rows removed."""
+    cutoff = (datetime.now() - timedelta(days=retention_days)).strftime(TIMESTAMP_FORMAT)
+    with conn:
+        cursor = conn.execute("DELETE FROM attendance_logs WHERE timestamp < ?", (cutoff,))
+    return cursor.rowcount
@@ -1,30 +1,17 @@
-import ntplib
 from datetime import datetime
-import pytz
 from typing import Tuple, Optional
-import os
 from config.Logging import Logger
+from config.Settings import Settings
 
 class TimeSync:
     def __init__(self):
-        DEFAULT_NTP_SERVER = "pool.ntp.org"
-        DEFAULT_TIMEZONE = "America/Bogota"
-        DEFAULT_NTP_VERSION = 3
-        DEFAULT_TIMEOUT = 5
+        settings = Settings.get()
 
         self.logger = Logger().get_logger()
-        self.ntp_server = os.getenv('NTP_SERVER', DEFAULT_NTP_SERVER)
-        self.timezone = os.getenv('TIMEZONE', DEFAULT_TIMEZONE)
-        
-        try:
-            self.ntp_version = int(os.getenv('NTP_VERSION', DEFAULT_NTP_VERSION))
-        except (TypeError, ValueError):
-            self.ntp_version = DEFAULT_NTP_VERSION
-            
-        try:
-            self.timeout = int(os.getenv('NTP_TIMEOUT', DEFAULT_TIMEOUT))
-        except (TypeError, ValueError):
-            self.timeout = DEFAULT_TIMEOUT
+        self.ntp_server = settings.ntp_server
+        self.timezone = settings.timezone
+        self.ntp_version = settings.ntp_version
+        self.timeout = settings.ntp_timeout
 
     def get_date_time(self) -> Tuple[Optional[str], Optional[str]]:
 
@@ -37,6 +24,8 @@ class TimeSync:
         return self._format_date_time(local_time)
 
     def _get_localized_time(self) -> datetime:
+        import ntplib
+        import pytz
         client = ntplib.NTPClient()
         response = client.request(
             self.ntp_server, 
@@ -50,6 +39,7 @@ class TimeSync:
         return pytz.utc.localize(utc_time).astimezone(local_tz)
     
     def _get_local_time(self) -> datetime:
+        import pytz
         local_tz = pytz.timezone(self.timezone)
         return datetime.now(local_tz)
 
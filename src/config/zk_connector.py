@@ -1,42 +1,122 @@
-from zk import ZK
+import socket
+import time
 import traceback
-from dotenv import load_dotenv
+from contextlib import contextmanager
+from typing import Optional
 from config.Logging import Logger
-import os
+from config.Settings import Settings
 
 class ZKConnector:
-    def __init__(self):
-        load_dotenv()
-        self.zk = ZK(
-            os.getenv('ZK_DEVICE_IP'),
-            port=int(os.getenv('ZK_DEVICE_PORT', '4370')),
-            timeout=int(os.getenv('ZK_DEVICE_TIMEOUT', '5')),
-            password=os.getenv('ZK_DEVICE_PASSWORD', '0')
-        )
+    def __init__(self, ip: Optional[str] = None, port: Optional[int] = None,
+                 password: Optional[str] = None, timeout: Optional[int] = None,
+                 record: Optional[bool] = None):
+        settings = Settings.get()
+        self.ip = ip or settings.zk_device_ip
+        self.port = port or settings.zk_device_port
+        self.password = password if password is not None else settings.zk_device_password
+        self.timeout = timeout or settings.zk_device_timeout
+        self._zk = None
         self.log = Logger.get_logger()
         self.conn = None
+        self._locked = False
+        # Cumulative time the terminal spent disabled (rejecting punches) through this connector
+        self.lock_seconds = 0.0
+        self.lock_count = 0
+        self.recorder = None
+        if record if record is not None else settings.zk_record_sessions:
+            from config.SessionRecorder import SessionRecorder
+            self.recorder = SessionRecorder(self.device_key)
+
+    @property
+    def zk(self):
+        # pyzk is only imported once a device connection is actually needed
+        if self._zk is None:
+            from zk import ZK
+            self._zk = ZK(
+                self.ip,
+                port=self.port,
+                timeout=self.timeout,
+                password=self.password
+            )
+        return self._zk
+
+    @property
+    def device_key(self) -> str:
+        return f"{self.ip}:{self.port}"
+
+    def is_reachable(self) -> bool:
+        """Plain TCP check of the device port, much cheaper than a protocol connect."""
+        start = time.perf_counter()
+        try:
+            with socket.create_connection((self.ip, self.port), timeout=self.timeout):
+                reachable = True
+        except OSError:
+            reachable = False
+        if self.recorder:
+            self.recorder.record("is_reachable", start, reachable)
+        return reachable
 
     def connect(self):
+        start = time.perf_counter()
         try:
             if not self.conn:
                 self.conn = self.zk.connect()
+                if self.recorder:
+                    self.recorder.record("connect", start, bool(self.conn))
+                    if self.conn:
+                        self.conn = self.recorder.wrap(self.conn)
                 if self.conn:
                     self.log.debug("Successfully connected to device")
-                    self.conn.disable_device()
                 else:
                    self.log.error("Connection failed") 
             return self.conn
         except Exception as e:
-            self.log.error(f"Error connecting to device: {e}")
-            self.log.error(f"Error type: {type(e)}")
-            self.log.error(traceback.format_exc())
+            if self.recorder:
+                self.recorder.record("connect", start, error=e)
+            self.log.warning(f"Error connecting to device {self.device_key}: {type(e).__name__}: {e}")
+            self.log.debug(traceback.format_exc())
             return None
 
+    @contextmanager
+    def device_locked(self):
+        """
+        Disables the terminal only for the duration of the block, which should contain nothing
+        but the raw buffer reads; processing belongs after it, once punches are accepted again.
+        """
+        conn = self.connect()
+        if not conn:
+            raise ConnectionError("Connection failed")
+
+        start = time.perf_counter()
+        conn.disable_device()
+        self._locked = True
+        try:
+            yield conn
+        finally:
+            try:
+                conn.enable_device()
+                self._locked = False
+            finally:
+                elapsed = time.perf_counter() - start
+                self.lock_seconds += elapsed
+                self.lock_count += 1
+                self.log.debug("Device locked for %.3f s", elapsed)
+
+    def start_session(self) -> None:
+        """With session recording on, the calls from here on go to a new session file."""
+        if self.recorder:
+            self.recorder.next_session()
+
     def disconnect(self):
         try:
             if self.conn:
-                self.conn.enable_device()
+                if self._locked:
+                    self.conn.enable_device()
+                    self._locked = False
                 self.conn.disconnect()
                 self.conn = None
         except Exception as e:
-            self.log.error(f"Error disconnecting: {e}")
\ No newline at end of file
+            self.log.error(f"Error disconnecting: {e}")
+        finally:
+            if self.recorder:
+                self.recorder.save()
\ No newline at end of file
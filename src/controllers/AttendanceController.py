@@ -1,30 +1,66 @@
 
-import json
+import logging
 import time
-import traceback
-from typing import Dict, List, Optional
-from datetime import datetime
+from bisect import bisect_left, bisect_right
+from dataclasses import replace
+from typing import Dict, Iterable, List, Optional, Set
+from datetime import date, datetime, timedelta
 from models.user.UserRepository import UserRepository
 from models.attendance.AttendanceProcessor import AttendanceProcessor
 from config.FilePathManager import FilePathManager
+from config.RunLedger import RunLedger
 from controllers.DeviceController import DeviceController
 from controllers.FileHandler import AttendanceFileHandler, DeviceFileManager
+from controllers.DayState import DayState
 from utils.to_JSON import ToJSON 
 from models.device.Device import Device
+from models.device.DeviceInfo import DeviceInfo
 from models.attendance.AttendanceProcessor import AttendanceProcessor
 from config.Logging import Logger
 from services.APIClient import APIClient
+from models.attendance.AttendanceAggregateRepository import AttendanceAggregateRepository
+from models.attendance.ShiftEngine import ShiftEngine
+from models.attendance.PunchDebouncer import PunchDebouncer
+from services.RetryPolicy import RetryPolicy
+from services.CircuitBreaker import CircuitBreaker
+from services.DeviceProbe import DeviceProbe
+from services.DeviceRetention import DeviceRetention, UploadWatermark
+from services.SeenPunches import SeenPunches
+from services.RunFingerprints import RunFingerprints
+from services.PunchArchive import PunchArchive
+from utils.RunMetrics import RunMetrics
+from utils.AtomicFile import AtomicFile
+from utils.FileLock import FileLock
+from config.Settings import Settings
 
 class AttendanceController:
-    def __init__(self, connector, device_controller: Optional[DeviceController] = None):
+    _merge_log = None
+
+    def __init__(self, connector, device_controller: Optional[DeviceController] = None,
+                 day_state: Optional[DayState] = None):
 
         self.connector = connector
         self.device_controller = device_controller or DeviceController(connector)
         self.view = ToJSON()
         self.device_info = None
-        self.log = Logger().get_logger()
+        self.log = Logger.get_logger("controller")
         self.device_file_manager = DeviceFileManager()
         self.api_client = APIClient()
+        self.last_run_metrics: Optional[RunMetrics] = None
+        self.retry_policy = RetryPolicy.from_settings()
+        self.circuit_breaker = CircuitBreaker()
+        self.device_probe = DeviceProbe(connector) if hasattr(connector, "is_reachable") else None
+        self.probe_before_collect = Settings.get().probe_before_collect
+        self.upload_watermark = UploadWatermark()
+        self.aggregates: Optional[AttendanceAggregateRepository] = None
+        self.run_ledger: Optional[RunLedger] = None
+        self.shift_engine = ShiftEngine.from_file(Settings.get().shift_config)
+        self.punch_debouncer = PunchDebouncer.from_settings()
+        self.seen_punches: Optional[SeenPunches] = None
+        self.day_state = day_state
+        self.run_fingerprints = RunFingerprints()
+        self.device_retention = DeviceRetention(connector, self.upload_watermark, shift_engine=self.shift_engine)
+        self.records_on_device: Optional[int] = None
 
     def _ensure_device_info(self) -> None:
         if not self.device_info:
@@ -36,13 +72,16 @@ class AttendanceController:
                 self._send_device_info()
             else:
                 self.log.error("Failed to save device information")
-                raise ValueError("Could not get device info")
+                raise ConnectionError("Could not get device info")
 
     def _send_device_info(self) -> None:
         try:
-            device_file = self.device_file_manager.get_device_filepath(self.device_info.device_name)
-            with open(device_file, 'r') as f:
-                device_data = json.load(f)
+            device_data = self.device_controller.device_payload
+            if device_data is None:
+                device_file = self.device_file_manager.get_device_filepath(self.device_info.description.serial_number)
+                device_data = AtomicFile.read_verified(device_file)
+                if device_data is None:
+                    raise FileNotFoundError(f"Device file not found: {device_file}")
 
             if self.api_client.send_device_data(device_data):
                 self.log.info("Device data sent successfully")
@@ -52,23 +91,33 @@ class AttendanceController:
         except Exception as e:
             self.log.error(f"Error sending device data to API: {str(e)}")
 
-    def _get_attendance_data(self, conn) -> tuple:
-        user_repo = UserRepository(self.connector)
-        users_info = user_repo.get_users_info()
-        
-        if not self.device_info:
-            self.log.debug("Getting device info in controller...")
-            self.device_info = self.device_controller.get_device_info()
+    def _get_attendance_data(self, conn, date_range: Optional[tuple] = None) -> tuple:
+        """Users and punches from the device; any failed download raises ConnectionError."""
+        try:
+            user_repo = UserRepository(self.connector)
+            users_info = user_repo.get_users_info(raise_errors=True)
+
             if not self.device_info:
-                raise ValueError("Could not get device info")
-        
-        processor = AttendanceProcessor(
-            connector=self.connector,
-            device=Device(),
-            device_info=self.device_info 
-        )
-        filtered_attendance = processor.get_daily_attendance()
-        
+                self.log.debug("Getting device info in controller...")
+                self.device_info = self.device_controller.get_device_info()
+                if not self.device_info:
+                    raise ValueError("Could not get device info")
+
+            processor = AttendanceProcessor(
+                connector=self.connector,
+                device=Device(),
+                device_info=self.device_info
+            )
+            if date_range:
+                filtered_attendance = processor.get_attendance_in_range(date_range, raise_errors=True)
+            else:
+                filtered_attendance = processor.get_daily_attendance(raise_errors=True)
+            self.records_on_device = processor.records_read
+        except ConnectionError:
+            raise
+        except Exception as e:
+            raise ConnectionError(f"Download failed: {e}") from e
+
         return users_info, filtered_attendance
 
     def _close_connection(self) -> None:
@@ -77,10 +126,42 @@ class AttendanceController:
         except Exception as e:
             self.log.error(f"Error closing connection: {e}")
 
-    def process_attendance(self) -> List:
-        retry_interval = 60
+    def process_attendance(self, day: Optional[date] = None, max_attempts: Optional[int] = None,
+                           force: bool = False) -> List:
+        """
+        Collects, stores and uploads the attendance of `day` (today by default).
+        Failed attempts are retried with jittered exponential backoff until the retry budget
+        (`max_attempts`, or RETRY_MAX_ATTEMPTS) is spent; a run that spends it on device errors counts
+        as one failure towards the circuit breaker. Devices with an open circuit are skipped,
+        and so are devices whose record count has not changed since the last collection, unless `force`.
+        """
+        device_key = getattr(self.connector, "device_key", "device")
+        probe = getattr(self.connector, "is_reachable", lambda: True)
+        self._start_session()
+        metrics = RunMetrics().start()
+        if not self.circuit_breaker.allow(device_key, probe):
+            self.log.warning(f"Skipping {device_key}: circuit open after repeated failures")
+            self._record_run(device_key, "circuit_open", metrics.stop(), 0)
+            return []
 
+        probe_result = None
+        if self.device_probe and self.probe_before_collect and not force and day is None:
+            with metrics.stage('probe'):
+                probe_result = self.device_probe.probe(force=True)
+            if probe_result.reachable and not probe_result.needs_download:
+                self.log.info(f"Skipping {device_key}: no new records since last collection "
+                              f"({probe_result.records} on device, probe {probe_result.duration_ms} ms)")
+                self._record_run(device_key, "no_new_records", metrics.stop(), 0)
+                return []
+
+        retry_policy = self.retry_policy if max_attempts is None else replace(self.retry_policy, max_attempts=max_attempts)
+        attempts = 0
         while True:
+            attempts += 1
+            # One ledger row per run: stages add up over every attempt and backoff, counters describe the last attempt
+            metrics.counters.clear()
+            device_failed = False
+            outcome = "failed"
             try:
                 self.log.debug("Starting attendance processing...")
                 self._ensure_device_info()
@@ -91,82 +172,435 @@ class AttendanceController:
                     raise ConnectionError("Connection failed")
 
                 self.log.debug("Getting attendance data...")
-                users_info, filtered_attendance = self._get_attendance_data(conn)
-                
-                if not filtered_attendance:
-                    self.log.warning("No attendance records found. Retrying in 60 seconds...")
-                    time.sleep(retry_interval)
-                    continue 
-
-                self.log.debug("Processing records...") 
-                file_handler = AttendanceFileHandler(
-                    FilePathManager().get_json_filename(datetime.now().date())
-                )
-
-                processor = AttendanceProcessor(conn, device=Device(), device_info=self.device_info)
-                attendance_records = processor.process_user_attendance(users_info, filtered_attendance)
-                
-                self.log.debug(f"Found {len(attendance_records)} records")
-                existing_records = file_handler.read_existing_records()
-                merged_records = self._merge_records(existing_records, attendance_records)
-                
-                self.log.info("Saving records...")
-                file_handler.save_records(merged_records)
+                days = self._days_to_process(day)
+                date_range = self._collection_range(days[0], days[-1]) if day or self.shift_engine else None
+                lock_before = getattr(self.connector, "lock_seconds", 0.0)
+                downloaded_at = datetime.now()
+                with metrics.stage('download'):
+                    users_info, filtered_attendance = self._get_attendance_data(conn, date_range)
+                metrics.add_duration('device_lock', getattr(self.connector, "lock_seconds", 0.0) - lock_before)
+                metrics.increment('records_downloaded', len(filtered_attendance))
+                downloaded_attendance = filtered_attendance
+                if downloaded_attendance and not users_info:
+                    # A failed user download would drop every punch as "user not found"
+                    raise ConnectionError(f"Could not read users for {len(downloaded_attendance)} punches")
+                self.circuit_breaker.record_success(device_key)
+                serial_number = self.device_info.description.serial_number
 
-                self._send_attendance(file_handler.filename)
+                if not force and self.run_fingerprints.input_unchanged(serial_number, date_range, downloaded_attendance,
+                                                                      users_info):
+                    self.log.info(f"Skipping {device_key}: download identical to the last successful run "
+                                  f"({len(downloaded_attendance)} punches)")
+                    self._record_run(device_key, "input_unchanged", metrics.stop(), attempts)
+                    return []
+
+                self._archive_punches(serial_number, users_info, downloaded_attendance, metrics)
+                filtered_attendance = self._debounce(downloaded_attendance, metrics)
+                metrics.increment('records_kept', len(filtered_attendance))
+
+                unseen = self._seen().unseen(filtered_attendance)
+                if filtered_attendance and not force and not unseen:
+                    self.log.info(f"Skipping {device_key}: all {len(filtered_attendance)} punches were already uploaded")
+                    if probe_result and self.device_probe:
+                        self.device_probe.mark_collected(probe_result.records, probe_result.users)
+                    self._record_run(device_key, "already_seen", metrics.stop(), attempts)
+                    return []
                 
-                self.log.info(f"Total records: {len(filtered_attendance)}")
-                return filtered_attendance 
+                if filtered_attendance:
+                    # Users without unseen punches keep their stored summaries
+                    dirty_users = None if force else {att.user_id for att in unseen}
+                    stored_days = {}
+                    for target_day in days:
+                        stored_days[target_day] = self._process_day(conn, users_info, filtered_attendance, target_day,
+                                                                    metrics, downloaded_at, dirty_users)
+                    
+                    metrics.increment('retries', attempts - 1)
+                    self.flush(metrics)
+                    if self.day_state is not None:
+                        self.day_state.evict_before(days[0])
+                    # Punches dropped by processing (e.g. unknown users) must be offered again next run
+                    stored = self._stored_punches(filtered_attendance, stored_days)
+                    self._mark_seen(stored, metrics)
+                    known = sum(1 for att in filtered_attendance if att.user_id in users_info)
+                    if not metrics.counters.get('uploads_failed') and len(stored) == known:
+                        # Only a download whose every punch reached a day file may short-circuit the next run
+                        self.run_fingerprints.remember_input(serial_number, date_range, downloaded_attendance, users_info)
+                        if probe_result and self.device_probe:
+                            self.device_probe.mark_collected(probe_result.records, probe_result.users)
+                    # Without a probe, the download that just ran tells whether the buffer is worth pruning
+                    records_on_device = probe_result.records if probe_result else self.records_on_device
+                    if self.device_retention.maybe_prune(serial_number, records_on_device):
+                        self._seen().discard_through(self.upload_watermark.get(serial_number)["covered_until"])
+                    outcome = "upload_failed" if metrics.counters.get('uploads_failed') else "ok"
+                    self._record_run(device_key, outcome, metrics.stop(), attempts)
+                    self.log.info(f"Total records: {len(filtered_attendance)}")
+                    self.log.info(f"Run metrics: {metrics.summary()}")
+                    return filtered_attendance 
+
+                # The device answered with nothing to collect; retrying would not change that
+                self.log.warning("No attendance records found")
+                self._record_run(device_key, "empty", metrics.stop(), attempts)
+                return []
 
             except ConnectionError as e:
+                device_failed = True
                 self.log.error(f"Connection error: {e}")
-                self.log.error(traceback.format_exc())
             except Exception as e:
                 self.log.error(f"Error processing attendance: {str(e)}")
 
-            self.log.warning(f"Retrying in {retry_interval} seconds...")
-            time.sleep(retry_interval) 
+            if retry_policy.exhausted(attempts):
+                self.log.error(f"Giving up after {attempts} attempts")
+                if device_failed:
+                    self.circuit_breaker.record_failure(device_key)
+                self._record_run(device_key, outcome, metrics.stop(), attempts)
+                return []
+
+            delay = retry_policy.delay(attempts)
+            self.log.warning(f"Retrying in {delay:.0f} seconds...")
+            with metrics.stage('backoff'):
+                time.sleep(delay)
+
+    def backfill(self, start: date, end: date) -> Dict[date, int]:
+        """
+        Downloads the device log once and rebuilds the day files between `start` and `end`, inclusive.
+        Returns the number of users stored for each rebuilt day.
+        """
+        self._start_session()
+        metrics = RunMetrics().start()
+        self._ensure_device_info()
+
+        conn = self.connector.connect()
+        if not conn:
+            raise ConnectionError("Connection failed")
+
+        lock_before = getattr(self.connector, "lock_seconds", 0.0)
+        downloaded_at = datetime.now()
+        with metrics.stage('download'):
+            users_info, attendance = self._get_attendance_data(conn, self._collection_range(start, end))
+        metrics.add_duration('device_lock', getattr(self.connector, "lock_seconds", 0.0) - lock_before)
+        metrics.increment('records_downloaded', len(attendance))
+        self._archive_punches(self.device_info.description.serial_number, users_info, attendance, metrics)
+        attendance = self._debounce(attendance, metrics)
+
+        processed = {}
+        stored_days = {}
+        if self.shift_engine:
+            # Shift windows decide which punches belong to each day: sort the download once and give
+            # every day the slice its windows can reach
+            attendance = sorted(attendance, key=lambda att: att.timestamp)
+            timestamps = [att.timestamp for att in attendance]
+            day = start
+            while day <= end:
+                window_start, window_end = self.shift_engine.collection_range(day, day)
+                day_attendance = attendance[bisect_left(timestamps, window_start):bisect_right(timestamps, window_end)]
+                stored_days[day] = self._process_day(conn, users_info, day_attendance, day, metrics, downloaded_at)
+                processed[day] = len(stored_days[day].get("users", {}))
+                day += timedelta(days=1)
+        else:
+            for day, day_attendance in AttendanceProcessor.split_by_day(attendance).items():
+                stored_days[day] = self._process_day(conn, users_info, day_attendance, day, metrics, downloaded_at)
+                processed[day] = len(stored_days[day].get("users", {}))
+
+        self.flush(metrics)
+        self._mark_seen(self._stored_punches(attendance, stored_days), metrics)
+        self.last_run_metrics = metrics.stop()
+        self.log.info(f"Backfilled {len(processed)} days: {metrics.summary()}")
+        return processed
+
+    def _start_session(self) -> None:
+        # A recording connector writes one session file per run instead of one growing file
+        start_session = getattr(self.connector, "start_session", None)
+        if start_session:
+            start_session()
+
+    def _record_run(self, device_key: str, outcome: str, metrics: RunMetrics, attempts: int) -> None:
+        self.last_run_metrics = metrics
+        try:
+            if self.run_ledger is None:
+                self.run_ledger = RunLedger()
+            serial_number = self.device_info.description.serial_number if self.device_info else None
+            self.run_ledger.record(device_key, serial_number, outcome, metrics, retries=max(attempts - 1, 0))
+        except Exception as e:
+            self.log.error(f"Error recording run in the ledger: {e}")
+
+    def _archive_punches(self, serial_number: str, users_info: Dict, attendance: List, metrics: RunMetrics) -> None:
+        try:
+            with metrics.stage('archive'):
+                archive = PunchArchive(serial_number)
+                metrics.increment('punches_archived', archive.append(attendance))
+                archive.save_users(users_info)
+        except Exception as e:
+            self.log.error(f"Error archiving punches: {e}")
+
+    def _debounce(self, attendance: List, metrics: RunMetrics) -> List:
+        with metrics.stage('debounce'):
+            kept = self.punch_debouncer.filter(attendance)
+        metrics.increment('punches_debounced', len(attendance) - len(kept))
+        return kept
 
-    def _send_attendance(self, filename: str) -> None:
+    def _seen(self) -> SeenPunches:
+        serial_number = self.device_info.description.serial_number
+        if self.seen_punches is None or self.seen_punches.device != serial_number:
+            self.seen_punches = SeenPunches(serial_number)
+        return self.seen_punches
+
+    def flush(self, metrics: Optional[RunMetrics] = None) -> None:
+        """Writes the day files held in memory by `day_state`; a no-op without it."""
+        if self.day_state is None:
+            return
+        start = time.perf_counter()
+        written = self.day_state.flush(self._merge_records)
+        if metrics:
+            metrics.add_duration('save', time.perf_counter() - start)
+            metrics.increment('bytes_written', written)
+
+    def _mark_seen(self, attendance: List, metrics: RunMetrics) -> None:
+        # Punches are only remembered once every day they touch reached the backend
+        if metrics.counters.get('uploads_failed'):
+            return
         try:
-                    with open(filename, 'r') as f:
-                        attendance_data = json.load(f)
+            metrics.increment('punches_new', self._seen().add(attendance))
+        except Exception as e:
+            self.log.error(f"Error saving seen punches: {e}")
+
+    @staticmethod
+    def _stored_punches(attendance: List, records_by_day: Dict[date, Dict]) -> List:
+        """The punches of `attendance` that appear in the given day records."""
+        keys = set()
+        for day, records in records_by_day.items():
+            for user_id, user in (records or {}).get("users", {}).items():
+                for record in user.get("records", []):
+                    punch_day = day + timedelta(days=record.get("day_offset", 0))
+                    keys.add((str(user_id), f"{punch_day.isoformat()} {record['hour']}"))
+        return [
+            att for att in attendance
+            if (str(att.user_id), att.timestamp.strftime("%Y-%m-%d %H:%M:%S")) in keys
+        ]
+
+    def _days_to_process(self, day: Optional[date]) -> List[date]:
+        target = day or datetime.now().date()
+        if self.shift_engine and self.shift_engine.has_overnight_shifts:
+            # Yesterday's night shifts end today, so their day is refreshed in the same run
+            return [target - timedelta(days=1), target]
+        return [target]
+
+    def _collection_range(self, start: date, end: date) -> tuple:
+        if self.shift_engine:
+            return self.shift_engine.collection_range(start, end)
+        return AttendanceProcessor._get_date_range(start, end)
+
+    def rebuild_from_archive(self, serial_number: str, start: date, end: date) -> Dict[date, int]:
+        """
+        Rewrites the day files between `start` and `end` from the local punch archive, without
+        contacting the terminal or the API. Returns the number of users stored for each rebuilt day.
+        """
+        archive = PunchArchive(serial_number)
+        users_info = archive.load_users()
+        device_info = self.device_info or DeviceInfo.from_dict({"serial_number": serial_number})
+        processor = AttendanceProcessor(None, device=Device(), device_info=device_info,
+                                        shift_engine=self.shift_engine)
+        paths = FilePathManager()
+
+        rebuilt = {}
+        day = start
+        while day <= end:
+            attendance = self.punch_debouncer.filter(archive.records(*self._collection_range(day, day)))
+            records = processor.process_user_attendance(users_info, attendance, day)
+            if records.get("users"):
+                file_handler = AttendanceFileHandler(paths.get_json_filename(day, device=serial_number))
+                with FileLock(file_handler.filename):
+                    file_handler.save_records(records)
+                rebuilt[day] = len(records["users"])
+            day += timedelta(days=1)
+        return rebuilt
 
-                    if self.api_client.send_attendance_data(attendance_data):
-                        self.log.info("Attendance data sent successfully")
-                    else:
-                        self.log.error("Failed to send attendance data")
+    def upload_day(self, day: date, serial_number: Optional[str] = None) -> bool:
+        """Re-sends the stored files of `day` as they are on disk, for one device or for all of them."""
+        paths = FilePathManager()
+        if serial_number:
+            filenames = [paths.get_json_filename(day, device=serial_number)]
+        else:
+            filenames = list(paths.iter_day_files(day))
+        if not filenames:
+            self.log.error(f"No attendance files for {day}")
+            return False
+
+        sent = True
+        for filename in filenames:
+            try:
+                payload = AtomicFile.read_verified(filename)
+            except ValueError as e:
+                # A corrupted partition must not stop the other devices' files from being sent
+                self.log.error(f"Corrupted attendance file for {day}: {filename}: {e}")
+                sent = False
+                continue
+            if payload is None:
+                self.log.error(f"No attendance file for {day}: {filename}")
+                sent = False
+                continue
+            sent = self.api_client.send_attendance_data(payload) and sent
+        return sent
+
+    def _process_day(self, conn, users_info: Dict, attendance: List, day: date, metrics: RunMetrics,
+                     downloaded_at: datetime, dirty_users: Optional[Set] = None) -> Dict:
+        """
+        Processes, stores and uploads one day. With `dirty_users`, only those users (and users missing
+        from the stored day) are recomputed; everyone else keeps the stored summary.
+        """
+        self.log.debug("Processing records...") 
+        serial_number = self.device_info.description.serial_number
+        file_handler = AttendanceFileHandler(
+            FilePathManager().get_json_filename(day, device=serial_number)
+        )
+
+        processor = AttendanceProcessor(conn, device=Device(), device_info=self.device_info,
+                                        shift_engine=self.shift_engine)
+        if self.day_state is not None:
+            # Resident state: the day file is only read once and written behind by flush()
+            existing_records = self.day_state.records(file_handler, serial_number, day)
+            attendance_records = self._process_users(processor, users_info, attendance, day,
+                                                     existing_records, dirty_users, metrics)
+            with metrics.stage('merge'):
+                merged_records = self._merge_records(existing_records, attendance_records)
+                fingerprint = RunFingerprints.output_fingerprint(merged_records)
+            unchanged = self.run_fingerprints.output_unchanged(serial_number, day, fingerprint)
+            if not unchanged:
+                with metrics.stage('serialize'):
+                    payload = ToJSON.serialize(merged_records)
+                self.day_state.update(file_handler, serial_number, day, merged_records, payload)
+        else:
+            # The lock covers the read-modify-write of this device's day file only
+            with FileLock(file_handler.filename) as lock:
+                metrics.add_duration('file_lock', lock.waited)
+                existing_records = file_handler.read_existing_records()
+                attendance_records = self._process_users(processor, users_info, attendance, day,
+                                                         existing_records, dirty_users, metrics)
+                with metrics.stage('merge'):
+                    merged_records = self._merge_records(existing_records, attendance_records)
+                    fingerprint = RunFingerprints.output_fingerprint(merged_records)
+                unchanged = self.run_fingerprints.output_unchanged(serial_number, day, fingerprint)
+
+                if not unchanged:
+                    self.log.info("Saving records...")
+                    with metrics.stage('save'):
+                        payload = file_handler.save_records(merged_records)
+                    metrics.increment('bytes_written', len(payload))
+
+        if unchanged:
+            # Same content as the last upload apart from the run id: nothing to write or send
+            self.log.info(f"Attendance of {day} unchanged since the last upload, skipping save and upload")
+            metrics.increment('days_unchanged')
+            sent = True
+        else:
+            with metrics.stage('aggregate'):
+                # Reused users kept their stored summaries, so their aggregate rows are already current
+                recomputed = None if dirty_users is None else attendance_records.get("users", {}).keys()
+                self._update_aggregates(merged_records, recomputed)
+
+            with metrics.stage('upload'):
+                sent = self._send_attendance(payload)
+            if sent:
+                metrics.increment('bytes_uploaded', len(payload))
+                self.run_fingerprints.remember_output(serial_number, day, fingerprint)
+
+        if not sent:
+            metrics.increment('uploads_failed')
+        else:
+            # Everything the device held for this day up to the download is now acknowledged
+            day_start, day_end = AttendanceProcessor._get_date_range(day, day)
+            self.upload_watermark.acknowledge(serial_number, day_start, min(downloaded_at, day_end))
+        return merged_records
+
+    def _process_users(self, processor: AttendanceProcessor, users_info: Dict, attendance: List, day: date,
+                       existing_records: Dict, dirty_users: Optional[Set], metrics: RunMetrics) -> Dict:
+        if dirty_users is not None:
+            stored = existing_records.get("users", {})
+            users = {att.user_id for att in attendance}
+            recompute = {user_id for user_id in users if user_id in dirty_users or str(user_id) not in stored}
+            attendance = [att for att in attendance if att.user_id in recompute]
+            metrics.increment('users_reused', len(users) - len(recompute))
+
+        with metrics.stage('process'):
+            attendance_records = processor.process_user_attendance(users_info, attendance, day)
+        metrics.increment('users_processed', len(attendance_records.get('users', {})))
+        self.log.debug(f"Recomputed {len(attendance_records.get('users', {}))} users for {day}")
+        return attendance_records
+
+    def _update_aggregates(self, records: Dict, user_ids: Optional[Iterable[str]] = None) -> None:
+        try:
+            if self.aggregates is None:
+                self.aggregates = AttendanceAggregateRepository()
+            self.aggregates.update_day(records, user_ids)
+        except Exception as e:
+            self.log.error(f"Error updating attendance aggregates: {e}")
+
+    def _send_attendance(self, payload: bytes) -> bool:
+        try:
+            if self.api_client.send_attendance_data(payload):
+                self.log.info("Attendance data sent successfully")
+                return True
+            self.log.error("Failed to send attendance data")
 
         except Exception as e:
             self.log.error(f"Error sending attendance data to API: {str(e)}")
+        return False
 
 
-    @staticmethod
-    def _merge_records(existing: Dict, new: Dict) -> Dict:
-        log_merge = Logger().get_logger()
-        log_merge.debug(f"Merging records...")
-        log_merge.debug(f"Existing records: {len(existing)} users")
-        log_merge.debug(f"New records: {len(new)} users")
-        merged = existing.copy()
+    @classmethod
+    def _merge_records(cls, existing: Dict, new: Dict) -> Dict:
+        if cls._merge_log is None:
+            cls._merge_log = Logger.get_logger("merge")
+        log_merge = cls._merge_log
+        debug = log_merge.isEnabledFor(logging.DEBUG)
+        log_merge.debug("Merging records...")
+        existing_users = existing.get("users", {})
+        new_users = new.get("users", {})
+        log_merge.debug("Existing records: %d users", len(existing_users))
+        log_merge.debug("New records: %d users", len(new_users))
+
+        # Header fields (id, serial_number, date) come from the latest run
+        merged = {**existing, **{key: value for key, value in new.items() if key != "users"}}
+        merged_users = dict(existing_users)
         
-        for user_id, new_records in new.items():
-            if user_id not in merged:
-                merged[user_id] = new_records
-                log_merge.debug(f"Added new user {user_id} with {len(new_records)} records")
+        for user_id, new_user in new_users.items():
+            user_id = str(user_id)
+            new_records = new_user.get("records", [])
+            if user_id not in merged_users:
+                merged_users[user_id] = new_user
+                if debug:
+                    log_merge.debug("Added new user %s with %d records", user_id, len(new_records))
                 continue
 
-            existing_set = {
-                json.dumps(record, sort_keys=True) 
-                for record in merged[user_id]
-            }
-            
-            unique_records = [
-                record for record in new_records 
-                if json.dumps(record, sort_keys=True) not in existing_set
+            # Types follow a punch's position in the day (the old CHECKOUT becomes INTERMEDIATE),
+            # so stored records are matched on their time only
+            new_keys = {cls._record_key(record) for record in new_records}
+            missing = [
+                record for record in merged_users[user_id].get("records", [])
+                if cls._record_key(record) not in new_keys
             ]
-            
-            if unique_records:
-                merged[user_id].extend(unique_records)
 
-        log_merge.error(f"Final merged records: {len(merged)} users")
-        return merged
\ No newline at end of file
+            records = new_records
+            if missing:
+                records = sorted(missing + new_records, key=cls._record_key)
+                # Unscheduled punches keep the type the shift engine gave them and take no position
+                scheduled = sum(1 for record in records if not record.get("unscheduled"))
+                position = 0
+                for index, record in enumerate(records):
+                    if not record.get("unscheduled"):
+                        records[index] = {
+                            **record, "type": AttendanceProcessor._determine_attendance_type(position, scheduled)
+                        }
+                        position += 1
+                if debug:
+                    log_merge.debug("Kept %d stored records for user %s", len(missing), user_id)
+
+            # The new summary is computed from the device's full day, so it replaces the stored one
+            merged_users[user_id] = {**new_user, "records": records}
+
+        merged["users"] = merged_users
+        log_merge.info("Final merged records: %d users", len(merged_users))
+        return merged
+
+    @staticmethod
+    def _record_key(record: Dict) -> tuple:
+        return record.get("day_offset", 0), record["hour"]
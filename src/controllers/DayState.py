@@ -0,0 +1,71 @@
+import os
+from datetime import date
+from typing import Callable, Dict, Optional, Tuple
+from config.Logging import Logger
+from controllers.FileHandler import AttendanceFileHandler
+from utils.FileLock import FileLock
+from utils.to_JSON import ToJSON
+
+
+class DayState:
+    """
+    Merged records of the recent days of each device, kept in memory by the long-running service.
+    Day files are read once and written behind: `update` only marks a day dirty and `flush` writes it.
+    A day file changed by another process (a CLI run) is reloaded, or merged into on flush.
+    """
+
+    def __init__(self):
+        self.log = Logger.get_logger("files")
+        self._entries: Dict[Tuple[str, date], Dict] = {}
+
+    @staticmethod
+    def _stamp(filename) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(filename)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def records(self, file_handler: AttendanceFileHandler, serial_number: str, day: date) -> Dict:
+        key = (serial_number, day)
+        entry = self._entries.get(key)
+        if entry is None or (not entry["dirty"] and entry["stamp"] != self._stamp(file_handler.filename)):
+            entry = {
+                "handler": file_handler,
+                "records": file_handler.read_existing_records(),
+                "stamp": self._stamp(file_handler.filename),
+                "payload": None,
+                "dirty": False,
+            }
+            self._entries[key] = entry
+            self.log.debug(f"Loaded day state {serial_number} {day}")
+        return entry["records"]
+
+    def update(self, file_handler: AttendanceFileHandler, serial_number: str, day: date,
+               records: Dict, payload: bytes) -> None:
+        entry = self._entries.setdefault((serial_number, day), {"stamp": None})
+        entry.update({"handler": file_handler, "records": records, "payload": payload, "dirty": True})
+
+    def flush(self, merge: Callable[[Dict, Dict], Dict]) -> int:
+        """Writes every dirty day; returns the bytes written."""
+        written = 0
+        for (serial_number, day), entry in self._entries.items():
+            if not entry["dirty"]:
+                continue
+            file_handler = entry["handler"]
+            with FileLock(file_handler.filename):
+                if self._stamp(file_handler.filename) != entry["stamp"]:
+                    self.log.info(f"Day file {file_handler.filename} changed on disk, merging before flush")
+                    entry["records"] = merge(file_handler.read_existing_records(), entry["records"])
+                    entry["payload"] = ToJSON.serialize(entry["records"])
+                ToJSON.write_bytes(entry["payload"], file_handler.filename)
+                entry["stamp"] = self._stamp(file_handler.filename)
+            written += len(entry["payload"])
+            entry["payload"] = None
+            entry["dirty"] = False
+        return written
+
+    def evict_before(self, day: date) -> None:
+        """Drops clean days older than `day`, so only the days still being collected stay resident."""
+        for key in [key for key, entry in self._entries.items() if key[1] < day and not entry["dirty"]]:
+            del self._entries[key]
@@ -10,10 +10,16 @@ class DeviceController:
         self.connector = connector
         self.file_manager = file_manager or DeviceFileManager()
         self._device_info: Optional[DeviceInfo] = None
+        self._device_payload: Optional[bytes] = None
         
     @property
     def device_info(self) -> Optional[DeviceInfo]:
         return self._device_info
+
+    @property
+    def device_payload(self) -> Optional[bytes]:
+        """Serialised device info exactly as it was last written to disk."""
+        return self._device_payload
         
     def fetch_device_info(self) -> Optional[DeviceInfo]:
 
@@ -29,7 +35,7 @@ class DeviceController:
             if not device_info:
                 raise ValueError("No device info returned")
             
-            self.file_manager.save_device_info(device_info)
+            self._device_payload = self.file_manager.save_device_info(device_info)
             self._device_info = device_info
 
             return device_info
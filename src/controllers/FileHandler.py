@@ -1,3 +1,4 @@
+import logging
 import traceback
 from pathlib import Path
 from utils.to_JSON import ToJSON
@@ -6,6 +7,8 @@ from typing import Dict
 from datetime import datetime
 from models.device.DeviceInfo import DeviceInfo
 from utils.FileNameSanitizer import FileNameSanitizer
+from utils.AtomicFile import AtomicFile
+from utils.FileLock import FileLock
 from config.Logging import Logger
     
 class DeviceFileManager:
@@ -20,16 +23,17 @@ class DeviceFileManager:
         self.base_dir.mkdir(parents=True, exist_ok=True)
         self.device_dir.mkdir(exist_ok=True)
         
-    def get_device_filepath(self, device_name: str) -> Path:
-        sanitized_name = FileNameSanitizer.sanitize(device_name)
+    def get_device_filepath(self, serial_number: str) -> Path:
+        """Keyed by serial: several terminals may share a device name."""
+        sanitized_serial = FileNameSanitizer.sanitize(serial_number)
         current_date = datetime.now().strftime('%Y%m%d')
-        filename = f"device_{sanitized_name}_{current_date}.json"
+        filename = f"device_{sanitized_serial}_{current_date}.json"
         return self.device_dir / filename 
         
-    def save_device_info(self, device_info: 'DeviceInfo') -> None:
+    def save_device_info(self, device_info: 'DeviceInfo') -> bytes:
         try:
             self.ensure_directory()
-            filepath = self.get_device_filepath(device_info.device_name)
+            filepath = self.get_device_filepath(device_info.description.serial_number)
             
             json_output = {
                 'device_name': device_info.device_name,
@@ -46,8 +50,10 @@ class DeviceFileManager:
             
             filepath.parent.mkdir(parents=True, exist_ok=True)
             
-            ToJSON().save_json_output(json_output, str(filepath))
+            with FileLock(filepath):
+                payload = ToJSON.save_json_output(json_output, str(filepath))
             self.log.debug(f"Device info saved to: {filepath}")
+            return payload
             
         except Exception as e:
             self.log.error(f"Error saving device info: {e}")
@@ -55,7 +61,7 @@ class DeviceFileManager:
 
 class AttendanceFileHandler:
     def __init__(self, filename: str):
-            self.log = Logger.get_logger()
+            self.log = Logger.get_logger("files")
             self.base_dir = Path(__file__).parent.parent / 'data'
             self.base_dir = self.base_dir / 'attandance_output'
             self.ensure_directory()
@@ -66,25 +72,33 @@ class AttendanceFileHandler:
 
     def read_existing_records(self) -> Dict:
         try:
-            with open(self.filename, "r") as file:
-                return json.load(file)
-        except (FileNotFoundError, json.JSONDecodeError):
+            payload = AtomicFile.read_verified(self.filename)
+            if payload is None:
+                return {}
+            return json.loads(payload)
+        except (ValueError, UnicodeDecodeError) as e:
+            # json.JSONDecodeError is a ValueError; keep the damaged file instead of overwriting it
+            quarantined = AtomicFile.quarantine(self.filename)
+            self.log.error(f"Corrupted records file {self.filename} moved to {quarantined}: {e}")
             return {}
 
-    def save_records(self, records: Dict) -> None:
+    def save_records(self, records: Dict) -> bytes:
+        """Serialises the records once and returns the bytes written, so callers can upload them as-is."""
         try:
             self.ensure_directory()
             
-            self.log.debug(f"Preparing to save records...")
-            self.log.debug(f"Records structure: {type(records)}")
-            self.log.debug(f"Number of users in records: {len(records)}")
-            if records:
-                sample_user = next(iter(records))
-                self.log.debug(f"Sample user records: {len(records[sample_user])}")
+            if self.log.isEnabledFor(logging.DEBUG):
+                self.log.debug("Preparing to save records...")
+                self.log.debug("Records structure: %s", type(records))
+                self.log.debug("Number of users in records: %d", len(records))
+                if records:
+                    sample_user = next(iter(records))
+                    self.log.debug("Sample user records: %d", len(records[sample_user]))
             
-            with open(self.filename, "w") as file:
-                json.dump(records, file, indent=4)
+            payload = ToJSON.serialize(records)
+            ToJSON.write_bytes(payload, self.filename)
             self.log.debug(f"Records saved successfully to: {self.filename}")
+            return payload
             
         except Exception as e:
             self.log.error(f"Error saving records: {e}")
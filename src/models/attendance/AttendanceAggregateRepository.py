@@ -0,0 +1,159 @@
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+from models.attendance.enums.AttendanceStatus import AttendanceStatus
+
+DEFAULT_DB_PATH = Path(__file__).parent.parent.parent / 'data' / 'attendance_aggregates.db'
+
+
+class AttendanceAggregateRepository:
+    """
+    Per-user daily and monthly rollups, maintained as day payloads are saved so reports
+    are indexed lookups instead of re-parsing every JSON day file.
+    """
+
+    def __init__(self, db_path: Optional[Union[str, Path]] = None):
+        self.db_path = Path(db_path) if db_path else DEFAULT_DB_PATH
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.row_factory = sqlite3.Row
+        self._initialize_db()
+
+    def _initialize_db(self) -> None:
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS daily_attendance (
+                    serial_number TEXT NOT NULL,
+                    user_id TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    user_name TEXT,
+                    first_in TEXT,
+                    last_out TEXT,
+                    worked_seconds INTEGER NOT NULL,
+                    punches INTEGER NOT NULL,
+                    status INTEGER NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    PRIMARY KEY (serial_number, user_id, day)
+                )
+            """)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS monthly_attendance (
+                    serial_number TEXT NOT NULL,
+                    user_id TEXT NOT NULL,
+                    month TEXT NOT NULL,
+                    days_present INTEGER NOT NULL,
+                    days_complete INTEGER NOT NULL,
+                    days_incomplete INTEGER NOT NULL,
+                    worked_seconds INTEGER NOT NULL,
+                    punches INTEGER NOT NULL,
+                    first_day TEXT,
+                    last_day TEXT,
+                    updated_at TEXT NOT NULL,
+                    PRIMARY KEY (serial_number, user_id, month)
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_daily_user_day ON daily_attendance (user_id, day)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_daily_day ON daily_attendance (day)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_monthly_month ON monthly_attendance (month, user_id)")
+
+    def update_day(self, payload: Dict, user_ids: Optional[Iterable[str]] = None) -> int:
+        """
+        Upserts the daily rows of a saved day payload and refreshes the monthly rows of those users.
+        `user_ids` restricts the update to users whose summaries changed.
+        """
+        serial = payload.get("serial_number")
+        day = payload.get("date")
+        users = payload.get("users", {})
+        if not serial or not day:
+            return 0
+
+        selected = users.keys() if user_ids is None else [str(u) for u in user_ids if str(u) in users]
+        now = datetime.now().isoformat(timespec='seconds')
+        rows = [self._daily_row(serial, day, users[user_id], now) for user_id in selected]
+        if not rows:
+            return 0
+
+        month = day[:7]
+        with self.conn:
+            self.conn.executemany("""
+                INSERT INTO daily_attendance (serial_number, user_id, day, user_name, first_in, last_out,
+                                              worked_seconds, punches, status, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (serial_number, user_id, day) DO UPDATE SET
+                    user_name = excluded.user_name, first_in = excluded.first_in, last_out = excluded.last_out,
+                    worked_seconds = excluded.worked_seconds, punches = excluded.punches,
+                    status = excluded.status, updated_at = excluded.updated_at
+            """, rows)
+            self.conn.executemany("""
+                INSERT INTO monthly_attendance (serial_number, user_id, month, days_present, days_complete,
+                                                days_incomplete, worked_seconds, punches, first_day, last_day,
+                                                updated_at)
+                SELECT serial_number, user_id, ?, COUNT(*),
+                       SUM(status = ?), SUM(status != ?),
+                       SUM(worked_seconds), SUM(punches), MIN(day), MAX(day), ?
+                FROM daily_attendance
+                WHERE serial_number = ? AND user_id = ? AND day >= ? AND day < ?
+                GROUP BY serial_number, user_id
+                ON CONFLICT (serial_number, user_id, month) DO UPDATE SET
+                    days_present = excluded.days_present, days_complete = excluded.days_complete,
+                    days_incomplete = excluded.days_incomplete, worked_seconds = excluded.worked_seconds,
+                    punches = excluded.punches, first_day = excluded.first_day, last_day = excluded.last_day,
+                    updated_at = excluded.updated_at
+            """, [
+                (month, int(AttendanceStatus.COMPLETE), int(AttendanceStatus.COMPLETE), now,
+                 serial, row[1], f"{month}-01", f"{month}-32")
+                for row in rows
+            ])
+        return len(rows)
+
+    @staticmethod
+    def _daily_row(serial: str, day: str, user: Dict, now: str) -> tuple:
+        # day_offset marks night-shift punches that fall on the following calendar day
+        punches = sorted(
+            (record.get("day_offset", 0), record["hour"]) for record in user.get("records", [])
+        )
+        hours = [hour for _, hour in punches]
+        worked_seconds = user.get("worked_seconds")
+        if worked_seconds is None:
+            # Same rule as AttendanceTimeCalculator: last punch minus first punch, exact to the second
+            worked_seconds = (
+                AttendanceAggregateRepository._seconds(*punches[-1]) - AttendanceAggregateRepository._seconds(*punches[0])
+                if len(punches) > 1 else 0
+            )
+        return (
+            serial, str(user.get("user_id")), day, user.get("user_name"),
+            hours[0] if hours else None, hours[-1] if len(hours) > 1 else None,
+            int(worked_seconds), len(hours), int(user.get("status", AttendanceStatus.INCOMPLETE)), now
+        )
+
+    @staticmethod
+    def _seconds(day_offset: int, hour: str) -> int:
+        h, m, sec = hour.split(":")
+        return day_offset * 86400 + int(h) * 3600 + int(m) * 60 + int(sec)
+
+    def get_daily(self, user_id: str, start: str, end: str, serial_number: Optional[str] = None) -> List[Dict]:
+        """Daily rows for a user between two YYYY-MM-DD dates, inclusive."""
+        query = "SELECT * FROM daily_attendance WHERE user_id = ? AND day BETWEEN ? AND ?"
+        params = [str(user_id), start, end]
+        if serial_number:
+            query += " AND serial_number = ?"
+            params.append(serial_number)
+        return [dict(row) for row in self.conn.execute(query + " ORDER BY day", params)]
+
+    def get_monthly(self, month: str, user_id: Optional[str] = None) -> List[Dict]:
+        query = "SELECT * FROM monthly_attendance WHERE month = ?"
+        params = [month]
+        if user_id:
+            query += " AND user_id = ?"
+            params.append(str(user_id))
+        return [dict(row) for row in self.conn.execute(query + " ORDER BY user_id, serial_number", params)]
+
+    def get_year(self, user_id: str, year: int) -> List[Dict]:
+        return [dict(row) for row in self.conn.execute(
+            "SELECT * FROM monthly_attendance WHERE user_id = ? AND month BETWEEN ? AND ? ORDER BY month",
+            (str(user_id), f"{year}-01", f"{year}-12")
+        )]
+
+    def close(self) -> None:
+        self.conn.close()
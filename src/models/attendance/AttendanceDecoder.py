@@ -0,0 +1,107 @@
+import struct
+from collections import namedtuple
+from datetime import datetime
+from typing import Dict, List
+
+DecodedAttendance = namedtuple('DecodedAttendance', 'user_id timestamp status punch uid')
+
+# Record layouts of CMD_ATTLOG_RRQ, as handled by pyzk's ZK.get_attendance
+RECORD_8 = struct.Struct('<HBIB')
+RECORD_16 = struct.Struct('<IIBB2sI')
+RECORD_40 = struct.Struct('<H24sBIB8s')
+
+
+class AttendanceDecoder:
+    """
+    Bulk decoder for the raw attendance buffer. It gives the same user_id, timestamp, status, punch
+    and uid as pyzk's `get_attendance`, without its per-record buffer slicing and user scans.
+    """
+
+    @staticmethod
+    def read_attendance(conn) -> List[DecodedAttendance]:
+        """Drop-in replacement for `conn.get_attendance()` on a connected pyzk ZK object."""
+        from zk import const  # type: ignore
+
+        conn.read_sizes()
+        if conn.records == 0:
+            return []
+        users = conn.get_users()
+        data, size = conn.read_with_buffer(const.CMD_ATTLOG_RRQ)
+        if size < 4:
+            return []
+        total_size = struct.unpack_from('<I', data, 0)[0]
+        return AttendanceDecoder.decode(memoryview(data)[4:], total_size / conn.records, users)
+
+    @staticmethod
+    def decode(buffer, record_size: float, users: List) -> List[DecodedAttendance]:
+        if record_size == 8:
+            by_uid = {}
+            for user in users:
+                by_uid.setdefault(user.uid, user.user_id)
+            return AttendanceDecoder._decode_records(buffer, RECORD_8, lambda uid, status, t, punch: (
+                by_uid.get(uid, str(uid)), t, status, punch, uid
+            ))
+        if record_size == 16:
+            by_user_id = {}
+            for user in users:
+                by_user_id.setdefault(user.user_id, user.uid)
+            return AttendanceDecoder._decode_records(buffer, RECORD_16, lambda user_id, t, status, punch, _r, _w: (
+                str(user_id), t, status, punch, by_user_id.get(str(user_id), str(user_id))
+            ))
+        return AttendanceDecoder._decode_records(buffer, RECORD_40, lambda uid, user_id, status, t, punch, _s: (
+            user_id.split(b'\x00')[0].decode(errors='ignore'), t, status, punch, uid
+        ))
+
+    @staticmethod
+    def _decode_records(buffer, record: struct.Struct, fields) -> List[DecodedAttendance]:
+        usable = len(buffer) - len(buffer) % record.size
+        dates: Dict[int, tuple] = {}
+        decoded = []
+        for values in record.iter_unpack(buffer[:usable]):
+            user_id, t, status, punch, uid = fields(*values)
+            days, seconds = divmod(t, 86400)
+            date = dates.get(days)
+            if date is None:
+                months, day = divmod(days, 31)
+                years, month = divmod(months, 12)
+                date = dates[days] = (years + 2000, month + 1, day + 1)
+            hours, seconds = divmod(seconds, 3600)
+            minutes, seconds = divmod(seconds, 60)
+            decoded.append(DecodedAttendance(user_id, datetime(*date, hours, minutes, seconds), status, punch, uid))
+        return decoded
+
+    @staticmethod
+    def decode_columns(buffer, record_size: float) -> Dict:
+        """
+        Columnar NumPy decode (uid, user_id, status, punch, timestamp as datetime64[s]) of the raw
+        records, without building Python objects. user_id is the value stored in the record.
+        """
+        try:
+            import numpy as np
+        except ImportError as e:
+            raise ImportError("decode_columns requires numpy: pip install numpy") from e
+
+        if record_size == 8:
+            dtype = np.dtype([('uid', '<u2'), ('status', 'u1'), ('time', '<u4'), ('punch', 'u1')])
+        elif record_size == 16:
+            dtype = np.dtype([('user_id', '<u4'), ('time', '<u4'), ('status', 'u1'), ('punch', 'u1'),
+                              ('reserved', 'V2'), ('workcode', '<u4')])
+        else:
+            dtype = np.dtype([('uid', '<u2'), ('user_id', 'S24'), ('status', 'u1'), ('time', '<u4'),
+                              ('punch', 'u1'), ('space', 'V8')])
+        records = np.frombuffer(buffer, dtype=dtype, count=len(buffer) // dtype.itemsize)
+
+        t = records['time'].astype(np.int64)
+        days, seconds = np.divmod(t, 86400)
+        months, day = np.divmod(days, 31)
+        years, month = np.divmod(months, 12)
+        month_start = (years + 30).astype('datetime64[Y]') + month.astype('timedelta64[M]')
+        days_in_month = ((month_start + 1).astype('datetime64[D]') - month_start.astype('datetime64[D]')).astype(np.int64)
+        if np.any(day >= days_in_month):
+            # datetime() rejects these in the pyzk path as well
+            raise ValueError("attendance buffer holds an invalid date")
+        timestamp = (month_start.astype('datetime64[D]') + day.astype('timedelta64[D]')).astype('datetime64[s]')
+
+        columns = {name: records[name] for name in ('uid', 'user_id', 'status', 'punch') if name in dtype.names}
+        columns['timestamp'] = timestamp + seconds.astype('timedelta64[s]')
+        return columns
@@ -1,6 +1,8 @@
+import logging
 import traceback
 from collections import defaultdict
-from datetime import datetime, time
+from contextlib import nullcontext
+from datetime import date as date_type, datetime, time
 from typing import List, Dict, DefaultDict
 from config.time_sync import TimeSync
 from models.attendance.ProcessedAttendance import ProcessedAttendance
@@ -8,62 +10,90 @@ from models.attendance.AttendanceTimeCalculator import AttendanceTimeCalculator
 from models.attendance.enums.AttendanceStatus import AttendanceStatus
 from models.attendance.enums.AttendanceType import AttendanceType
 from models.attendance.AttendanceRecord import AttendanceRecord
+from models.attendance.ShiftEngine import ShiftEngine
+from models.attendance.AttendanceDecoder import AttendanceDecoder
 from models.device.Device import Device
 from typing import Optional
 from models.device.DeviceInfo import DeviceInfo
 from config.Logging import Logger
+from config.Settings import Settings
 
 
 class AttendanceProcessor:
-    def __init__(self, connector, device: Device, device_info: Optional[DeviceInfo]=None):
+    def __init__(self, connector, device: Device, device_info: Optional[DeviceInfo]=None,
+                 shift_engine: Optional[ShiftEngine] = None):
         self.connector = connector
         self.device = device
         self.device_info = device_info
-        self.log = Logger.get_logger()
+        self.shift_engine = shift_engine
+        self.records_read: Optional[int] = None  # punches on the device at the last download, before filtering
+        self.log = Logger.get_logger("processor")
 
-    def get_daily_attendance(self) -> List:
+    def get_daily_attendance(self, day: Optional[date_type] = None, raise_errors: bool = False) -> List:
+        date_range = self._get_date_range(day, day) if day else self._get_current_date_range()
+        return self.get_attendance_in_range(date_range, raise_errors)
+
+    def get_attendance_in_range(self, date_range: tuple, raise_errors: bool = False) -> List:
+        """Punches within `date_range`; an empty list when the download fails, unless `raise_errors`."""
         try:
             conn = self.connector.connect()
             if not conn:
                 raise ConnectionError("Connection failed")
             
             if not self.device_info:
-                self.logger.debug("Getting device info...")
+                self.log.debug("Getting device info...")
                 self.device_info = self.device.get_device_info(conn)
                 if not self.device_info:
                     raise ValueError("Could not get device info")
             
-            attendance = conn.get_attendance()
-            date_range = self._get_current_date_range()
+            locked = getattr(self.connector, "device_locked", None)
+            with (locked() if locked else nullcontext(conn)):
+                attendance = self._read_attendance(conn)
+            self.records_read = len(attendance)
             return self._filter_attendance(attendance, date_range)
             
         except Exception as e:
             self.log.error(f"Error getting attendance: {e}")
+            if raise_errors:
+                raise
             return []
         finally:
             if self.connector:
                 self.connector.disconnect()
 
-    def process_user_attendance(self, users_info: Dict, attendance_list: List) -> Dict:
-        try:
-            self.log.debug(f"\nProcessing attendance for {len(attendance_list)} records")
-            attendance_by_user = self.organize_by_user(attendance_list)
-            self.log.debug(f"Organized into {len(attendance_by_user)} users")
+    def _read_attendance(self, conn) -> List:
+        if Settings.get().fast_attendance_decoder:
+            try:
+                return AttendanceDecoder.read_attendance(conn)
+            except Exception as e:
+                self.log.warning(f"Fast attendance decoder failed, using pyzk: {e}")
+        return conn.get_attendance()
 
+    def process_user_attendance(self, users_info: Dict, attendance_list: List,
+                                day: Optional[date_type] = None) -> Dict:
+        try:
+            self.log.debug("\nProcessing attendance for %d records", len(attendance_list))
             if not self.device_info:
                 raise ValueError("device_info is not available")
             
             processed_data = {
                 "id": str(int(datetime.now().timestamp())),
                 "serial_number": self.device_info.description.serial_number,
-                "date": datetime.now().strftime("%Y-%m-%d"),
+                "date": (day or datetime.now().date()).strftime("%Y-%m-%d"),
                 "users": {}
             }
+
+            if self.shift_engine:
+                return self._process_shifts(users_info, attendance_list, day or datetime.now().date(), processed_data)
+
+            attendance_by_user = self.organize_by_user(attendance_list)
+            self.log.debug("Organized into %d users", len(attendance_by_user))
             
+            debug = self.log.isEnabledFor(logging.DEBUG)
             for user_id, dates in attendance_by_user.items():
-                self.log.debug(f"\nProcessing user_id: {user_id}")
+                if debug:
+                    self.log.debug("\nProcessing user_id: %s", user_id)
                 if user_id in users_info:
-                    self.log.debug(f"User found in users_info")
                     user_records = self._process_single_user(
                         dates=dates,
                         user_id=str(user_id),
@@ -71,13 +101,14 @@ class AttendanceProcessor:
                     )
                     if user_records and isinstance(user_records, dict) and user_records.get('records'):
                         processed_data["users"][user_id] = user_records
-                        self.log.debug(f"Added records for user {user_id}")
+                        if debug:
+                            self.log.debug("Added records for user %s", user_id)
                     else:
-                        self.log.error(f"No valid records found for user {user_id}")
+                        self.log.error("No valid records found for user %s", user_id)
                 else:
-                    self.log.error(f"User {user_id} not found in users_info")
+                    self.log.error("User %s not found in users_info", user_id)
             
-            self.log.debug(f"Final processed data contains {len(processed_data['users'])} users")
+            self.log.debug("Final processed data contains %d users", len(processed_data['users']))
             return processed_data
             
         except Exception as e:
@@ -86,9 +117,32 @@ class AttendanceProcessor:
             return {}
         
 
+    def _process_shifts(self, users_info: Dict, attendance_list: List, day: date_type, processed_data: Dict) -> Dict:
+        """
+        Shift-based processing: `attendance_list` may span several calendar days and each
+        user's shift starting on `day` takes the punches that fall inside its window.
+        """
+        times_by_user = defaultdict(list)
+        for attendance in attendance_list:
+            times_by_user[attendance.user_id].append(attendance.timestamp)
+
+        for user_id, times in times_by_user.items():
+            if user_id not in users_info:
+                self.log.error("User %s not found in users_info", user_id)
+                continue
+            times.sort()
+            user_records = self.shift_engine.evaluate(
+                times, day, str(user_id), users_info[user_id].get('name', '')
+            )
+            if user_records:
+                processed_data["users"][user_id] = user_records
+
+        self.log.debug("Final processed data contains %d users", len(processed_data['users']))
+        return processed_data
+
     def _process_single_user(self, dates: Dict, user_id: str, user_info: Dict) -> List[Dict]:
         try:
-            self.log.debug(f"\nProcessing user {user_id} with {len(dates)} dates")
+            self.log.debug("\nProcessing user %s with %d dates", user_id, len(dates))
             name = user_info.get('name', '') 
 
             if not dates:
@@ -110,7 +164,7 @@ class AttendanceProcessor:
                     "total_hours": f"{total_hours:.2f}",
                     "status": status.value
                 }
-                self.log.debug(f"Successfully processed record for date {date}")
+                self.log.debug("Successfully processed record for date %s", date)
                 return processed_record
                 
             except StopIteration:
@@ -136,12 +190,23 @@ class AttendanceProcessor:
     def _get_current_date_range(self) -> tuple:
         time_sync = TimeSync()
         ntp_date, _ = time_sync.get_date_time()
-        current_date = datetime.strptime(ntp_date, "%Y-%m-%d")
+        current_date = datetime.strptime(ntp_date, "%Y-%m-%d").date()
+        return self._get_date_range(current_date, current_date)
+
+    @staticmethod
+    def _get_date_range(start: date_type, end: date_type) -> tuple:
         return (
-            datetime.combine(current_date, time.min),
-            datetime.combine(current_date, time.max)
+            datetime.combine(start, time.min),
+            datetime.combine(end, time.max)
         )
 
+    @staticmethod
+    def split_by_day(attendance_list: List) -> Dict[date_type, List]:
+        by_day = defaultdict(list)
+        for attendance in attendance_list:
+            by_day[attendance.timestamp.date()].append(attendance)
+        return dict(sorted(by_day.items()))
+
     @staticmethod
     def _filter_attendance(attendance: List, date_range: tuple) -> List:
         start_datetime, end_datetime = date_range
@@ -7,4 +7,19 @@ class AttendanceTimeCalculator:
         if len(times) < 2:
             return 0.0
         total_seconds = (times[-1] - times[0]).total_seconds()
-        return total_seconds / 3600
\ No newline at end of file
+        return total_seconds / 3600
+
+    @staticmethod
+    def calculate_worked_seconds(times: List[datetime]) -> float:
+        if len(times) < 2:
+            return 0.0
+        return (times[-1] - times[0]).total_seconds()
+
+    @staticmethod
+    def calculate_break_seconds(times: List[datetime]) -> float:
+        """Pairs the punches between check-in and check-out as (break out, break in); an unpaired one is ignored."""
+        middle = times[1:-1]
+        return sum(
+            (middle[i + 1] - middle[i]).total_seconds()
+            for i in range(0, len(middle) - 1, 2)
+        )
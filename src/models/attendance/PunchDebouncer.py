@@ -0,0 +1,36 @@
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import List, Optional
+from config.Settings import Settings
+
+
+@dataclass
+class PunchDebouncer:
+    """
+    Collapses repeated scans of the same user: a punch within `window_seconds` of that user's
+    last kept punch is dropped. A window of 0 only removes exact duplicates.
+    """
+    window_seconds: int = 60
+
+    @classmethod
+    def from_settings(cls, settings: Optional[Settings] = None) -> 'PunchDebouncer':
+        settings = settings or Settings.get()
+        return cls(window_seconds=settings.punch_debounce_seconds)
+
+    def filter(self, attendance_list: List) -> List:
+        """Single pass over punches in timestamp order; unsorted input is sorted first."""
+        if any(attendance_list[i].timestamp < attendance_list[i - 1].timestamp
+               for i in range(1, len(attendance_list))):
+            attendance_list = sorted(attendance_list, key=lambda attendance: attendance.timestamp)
+
+        window = timedelta(seconds=max(0, self.window_seconds))
+        last_kept = {}
+        kept = []
+        for attendance in attendance_list:
+            previous = last_kept.get(attendance.user_id)
+            if previous is not None and attendance.timestamp - previous <= window:
+                continue
+            last_kept[attendance.user_id] = attendance.timestamp
+            kept.append(attendance)
+
+        return kept
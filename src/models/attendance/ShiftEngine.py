@@ -0,0 +1,129 @@
+import json
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+from models.attendance.AttendanceRecord import AttendanceRecord
+from models.attendance.AttendanceTimeCalculator import AttendanceTimeCalculator
+from models.attendance.ShiftTemplate import ShiftTemplate
+from models.attendance.enums.AttendanceStatus import AttendanceStatus
+from models.attendance.enums.AttendanceType import AttendanceType
+
+
+class ShiftEngine:
+    """
+    Evaluates a user's punches against a shift template. The shift that begins on a day owns every
+    punch inside its window, so night shifts keep their after-midnight punches. Punches outside the
+    windows of every shift (a day worker at 04:00) stay on their calendar day, flagged `unscheduled`
+    and left out of the worked time. Each user's punches are sorted once and each shift is sliced
+    out with two binary searches.
+    """
+
+    def __init__(self, templates: Dict[str, ShiftTemplate], default: str,
+                 assignments: Optional[Dict[str, str]] = None):
+        if default not in templates:
+            raise ValueError(f"Default shift '{default}' is not defined")
+        self.templates = templates
+        self.default = default
+        self.assignments = {str(user): shift for user, shift in (assignments or {}).items()}
+
+    @classmethod
+    def from_file(cls, path: Union[str, Path]) -> Optional['ShiftEngine']:
+        """Loads a shift configuration; returns None when the file does not exist."""
+        path = Path(path)
+        if not path.exists():
+            return None
+        with open(path, encoding='utf-8') as f:
+            config = json.load(f)
+        templates = {
+            name: ShiftTemplate.from_dict(name, data)
+            for name, data in config.get('templates', {}).items()
+        }
+        return cls(templates, config.get('default', next(iter(templates), '')), config.get('assignments'))
+
+    @property
+    def has_overnight_shifts(self) -> bool:
+        return any(template.crosses_midnight for template in self.templates.values())
+
+    def template_for(self, user_id: str) -> ShiftTemplate:
+        return self.templates.get(self.assignments.get(str(user_id), self.default), self.templates[self.default])
+
+    def collection_range(self, start: date, end: date) -> tuple:
+        """
+        Download range covering the windows of every shift that begins between `start` and `end`,
+        and the calendar days themselves for unscheduled punches.
+        """
+        windows = [t.window(start) for t in self.templates.values()] + [t.window(end) for t in self.templates.values()]
+        windows.append((datetime.combine(start, time.min), datetime.combine(end, time.max)))
+        return min(w[0] for w in windows), max(w[1] for w in windows)
+
+    def evaluate(self, times: List[datetime], day: date, user_id: str, user_name: str) -> Dict:
+        """`times` must be sorted. Returns {} if the user has no punch in the shift window or on `day`."""
+        template = self.template_for(user_id)
+        window_start, window_end = template.window(day)
+        shift = times[bisect_left(times, window_start):bisect_right(times, window_end)]
+        unscheduled = self._unscheduled(times, day, template)
+        if not shift and not unscheduled:
+            return {}
+
+        worked_seconds = break_seconds = late_seconds = early_seconds = 0
+        if shift:
+            scheduled_start, scheduled_end = template.bounds(day)
+            worked_seconds = AttendanceTimeCalculator.calculate_worked_seconds(shift)
+            break_seconds = AttendanceTimeCalculator.calculate_break_seconds(shift) if template.pair_breaks else 0
+            worked_seconds -= break_seconds
+
+            late_seconds = (shift[0] - scheduled_start - timedelta(minutes=template.grace_minutes)).total_seconds()
+            early_seconds = (scheduled_end - timedelta(minutes=template.early_leave_grace_minutes) - shift[-1]).total_seconds()
+
+        records = self._records(shift, day)
+        if unscheduled:
+            records = sorted(records + [
+                {**AttendanceRecord(hour=timestamp.strftime("%H:%M:%S"), type=AttendanceType.INTERMEDIATE).__dict__,
+                 "unscheduled": True}
+                for timestamp in unscheduled
+            ], key=lambda record: (record.get("day_offset", 0), record["hour"]))
+
+        user = {
+            "user_id": str(user_id),
+            "user_name": user_name,
+            "records": records,
+            "total_hours": f"{worked_seconds / 3600:.2f}",
+            "status": (AttendanceStatus.COMPLETE if len(shift) >= 2 else AttendanceStatus.INCOMPLETE).value,
+            "shift": template.name,
+            "worked_seconds": int(worked_seconds),
+            "break_seconds": int(break_seconds),
+            "late_minutes": max(0, int(late_seconds // 60)),
+            "early_leave_minutes": max(0, int(early_seconds // 60)) if len(shift) >= 2 else 0,
+        }
+        if unscheduled:
+            user["unscheduled_punches"] = len(unscheduled)
+        return user
+
+    @staticmethod
+    def _unscheduled(times: List[datetime], day: date, template: ShiftTemplate) -> List[datetime]:
+        """Punches on calendar day `day` that fall in none of the windows of the shifts around it."""
+        start = datetime.combine(day, time.min)
+        calendar_day = times[bisect_left(times, start):bisect_left(times, start + timedelta(days=1))]
+        windows = [template.window(day + timedelta(days=offset)) for offset in (-1, 0, 1)]
+        return [timestamp for timestamp in calendar_day
+                if not any(window_start <= timestamp <= window_end for window_start, window_end in windows)]
+
+    @staticmethod
+    def _records(shift: List[datetime], day: date) -> List[Dict]:
+        last = len(shift) - 1
+        records = []
+        for index, timestamp in enumerate(shift):
+            if index == 0:
+                attendance_type = AttendanceType.CHECKIN
+            elif index == last:
+                attendance_type = AttendanceType.CHECKOUT
+            else:
+                attendance_type = AttendanceType.INTERMEDIATE
+            record = AttendanceRecord(hour=timestamp.strftime("%H:%M:%S"), type=attendance_type).__dict__
+            offset = (timestamp.date() - day).days
+            if offset:
+                # Punch on another calendar day than the shift start (night shifts)
+                record = {**record, "day_offset": offset}
+            records.append(record)
+        return records
@@ -0,0 +1,44 @@
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Dict
+
+
+@dataclass(frozen=True)
+class ShiftTemplate:
+    name: str
+    start: time
+    end: time
+    grace_minutes: int = 0
+    early_leave_grace_minutes: int = 0
+    window_before_minutes: int = 120
+    window_after_minutes: int = 240
+    pair_breaks: bool = True
+
+    @property
+    def crosses_midnight(self) -> bool:
+        return self.end <= self.start
+
+    def bounds(self, day: date) -> tuple:
+        """Scheduled start and end of the shift that begins on `day`."""
+        start = datetime.combine(day, self.start)
+        end = datetime.combine(day + timedelta(days=1) if self.crosses_midnight else day, self.end)
+        return start, end
+
+    def window(self, day: date) -> tuple:
+        """Punches inside this span belong to the shift that begins on `day`."""
+        start, end = self.bounds(day)
+        return (start - timedelta(minutes=self.window_before_minutes),
+                end + timedelta(minutes=self.window_after_minutes))
+
+    @classmethod
+    def from_dict(cls, name: str, data: Dict) -> 'ShiftTemplate':
+        return cls(
+            name=name,
+            start=time.fromisoformat(data['start']),
+            end=time.fromisoformat(data['end']),
+            grace_minutes=int(data.get('grace_minutes', 0)),
+            early_leave_grace_minutes=int(data.get('early_leave_grace_minutes', 0)),
+            window_before_minutes=int(data.get('window_before_minutes', 120)),
+            window_after_minutes=int(data.get('window_after_minutes', 240)),
+            pair_breaks=bool(data.get('pair_breaks', True))
+        )
@@ -1,13 +1,15 @@
 from enum import Enum
-from zk import const
+
+# Same value as zk.const.USER_ADMIN; kept local so importing the model does not load pyzk
+USER_ADMIN = 14
 
 class UserPrivilege(Enum):
-    ADMIN = const.USER_ADMIN
+    ADMIN = USER_ADMIN
     USER = "User"
     
     @classmethod
     def from_device_privilege(cls, privilege: int) -> 'UserPrivilege':
-        return cls.ADMIN if privilege == const.USER_ADMIN else cls.USER
+        return cls.ADMIN if privilege == USER_ADMIN else cls.USER
         
     def __str__(self) -> str:
         return self.value
\ No newline at end of file
@@ -1,3 +1,4 @@
+from contextlib import nullcontext
 from typing import Dict, List
 from models.user.UserInfo import UserInfo
 from models.user.UserPrivilege import UserPrivilege
@@ -8,22 +9,30 @@ class UserRepository:
         self.connector = connector
         self.log = Logger.get_logger()
     
-    def get_users_info(self) -> Dict[int, Dict]:
+    def get_users_info(self, raise_errors: bool = False) -> Dict[int, Dict]:
+        """Users by user_id; an empty dict when the download fails, unless `raise_errors`."""
         try:
             conn = self.connector.connect()
             if not conn:
                 raise ConnectionError("Connection failed")
                 
-            users = conn.get_users() 
+            with self._device_locked(conn):
+                users = conn.get_users() 
             return self._process_users(users)
             
         except Exception as e:
             self._handle_error(f"Error getting users info: {str(e)}")
+            if raise_errors:
+                raise
             return {}
         finally:
             if self.connector:
                 self.connector.disconnect()
             
+    def _device_locked(self, conn):
+        locked = getattr(self.connector, "device_locked", None)
+        return locked() if locked else nullcontext(conn)
+
     def _fetch_users(self) -> List:
         return self.connector.get_users()
     
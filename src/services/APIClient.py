@@ -1,28 +1,35 @@
-import requests
-from typing import Dict, Optional
-import json
-from datetime import datetime
+from typing import Dict, Optional, Union
 from config.Logging import Logger
-import os
+from config.Settings import Settings
 
 class APIClient:
     def __init__(self):
-        self.log = Logger.get_logger()
-        self.session = requests.Session()
+        settings = Settings.get()
+        self.log = Logger.get_logger("api")
+        self._session = None
         self.token: Optional[str] = None
-        self.base_url = os.getenv('URL_BASE')
+        self.base_url = settings.url_base
 
         #Paths
-        self.token_path = os.getenv('TOKEN')
-        self.attendance_path = os.getenv('ATTENDANCE')
-        self.device_path = os.getenv('DEVICE')
+        self.token_path = settings.token_path
+        self.attendance_path = settings.attendance_path
+        self.device_path = settings.device_path
 
         #Credentials
-        self.email = os.getenv('LOGIN_EMAIL')
-        self.password = os.getenv('LOGIN_PASSWORD')
+        self.email = settings.login_email
+        self.password = settings.login_password
+
+    @property
+    def session(self):
+        # requests is imported on the first upload, not when the controller is built
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+        return self._session
 
 
     def login(self, email:str, password: str) -> bool:
+        import requests
         try:
             response = self.session.post(
                 f"{self.base_url}{self.token_path}", 
@@ -61,41 +68,46 @@ class APIClient:
         return self.login(self.email, self.password)
     
 
-    def send_attendance_data(self, attendance_data: Dict) -> bool:
-        if not self._ensure_authenticated():
-            return False  
-         
-        try:
-            response = self.session.post(
-                f"{self.base_url}{self.attendance_path}",
-                json=attendance_data
-            )
-            response.raise_for_status()
+    def send_attendance_data(self, attendance_data: Union[Dict, bytes]) -> bool:
+        return self._post(self.attendance_path, attendance_data)
 
-            self.log.info(f"Data sent successfully. Status code: {response.status_code}")
-            return True
-        
-        except requests.exceptions.RequestException as e:
-            self.log.error(f"Error sending data: {str(e)}")
+
+    def send_device_data(self, device_data: Union[Dict, bytes]) -> bool:
+        return self._post(self.device_path, device_data)
+
+
+    def _post(self, path: str, payload: Union[Dict, bytes]) -> bool:
+        """Posts a payload; bytes are sent verbatim so an already serialised file is not encoded twice."""
+        import requests
+        if not self.ensure_athenticated():
             return False
-        
 
-    def send_device_data(self, device_data: Dict) -> bool:
-        if not self._ensure_authenticated():
-            return False  
-         
         try:
-            response = self.session.post(
-                f"{self.base_url}{self.device_path}",
-                json=device_data
-            )
+            response = self._send(path, payload)
+            if response.status_code == 401:
+                # Expired or revoked token: log in again once and resend
+                self.log.warning("Token rejected, logging in again")
+                self.token = None
+                if not self.ensure_athenticated():
+                    return False
+                response = self._send(path, payload)
             response.raise_for_status()
 
             self.log.info(f"Data sent successfully. Status code: {response.status_code}")
             return True
-        
+
         except requests.exceptions.RequestException as e:
             self.log.error(f"Error sending data: {str(e)}")
             return False
-        
-        
\ No newline at end of file
+
+    def _send(self, path: str, payload: Union[Dict, bytes]):
+        if isinstance(payload, (bytes, bytearray)):
+            return self.session.post(
+                f"{self.base_url}{path}",
+                data=payload,
+                headers={'Content-Type': 'application/json; charset=utf-8'}
+            )
+        return self.session.post(
+            f"{self.base_url}{path}",
+            json=payload
+        )
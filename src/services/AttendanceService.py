@@ -1,20 +1,20 @@
 import time
-import os
 from typing import Optional
-from dotenv import load_dotenv # type: ignore
 from config.zk_connector import ZKConnector
 from config.time_sync import TimeSync
 from controllers.AttendanceController import AttendanceController
+from controllers.DayState import DayState
 from config.Logging import Logger
+from config.Settings import Settings
 
 
 class AttendanceService:
     def __init__(self):
-        load_dotenv()
-        self.execution_time = os.getenv('EXECUTION_TIME')
+        self.execution_time = Settings.get().execution_time
         self.time_sync = TimeSync()
         self.connector = ZKConnector()
-        self.controller = AttendanceController(self.connector)
+        # The service outlives its runs, so today's records stay in memory between them
+        self.controller = AttendanceController(self.connector, day_state=DayState())
         self.logger = Logger().get_logger()
         
         self.logger.debug(f"Loaded EXECUTION_TIME: {self.execution_time}")
@@ -37,6 +37,12 @@ class AttendanceService:
         return should_run
 
     def run(self) -> None:
+        try:
+            self._run()
+        finally:
+            self.controller.flush()
+
+    def _run(self) -> None:
         self.logger.debug(f"Service started. Scheduled execution time: {self.execution_time}")
         last_execution_time = None
 
@@ -0,0 +1,91 @@
+import json
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+from config.Logging import Logger
+from config.Settings import Settings
+from utils.AtomicFile import AtomicFile
+from utils.FileLock import FileLock
+
+STATE_FILE = Path(__file__).parent.parent / 'data' / 'circuit_breaker.json'
+
+
+class CircuitBreaker:
+    """
+    Per-device breaker. After `failure_threshold` consecutive failed runs (runs that spent their
+    retry budget on device errors, one `record_failure` each) the device is skipped until a health
+    probe succeeds; probes are spaced by a cooldown that doubles up to `max_cooldown`.
+    State is kept on disk so one-shot CLI runs share it with the daemon.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+
+    def __init__(self, failure_threshold: Optional[int] = None, cooldown: Optional[float] = None,
+                 max_cooldown: float = 3600.0, state_file: Path = STATE_FILE):
+        settings = Settings.get()
+        self.failure_threshold = failure_threshold or settings.breaker_failure_threshold
+        self.cooldown = cooldown or settings.breaker_cooldown
+        self.max_cooldown = max(max_cooldown, self.cooldown)
+        self.state_file = Path(state_file)
+        self.log = Logger.get_logger()
+        self._states: Dict[str, Dict] = self._load()
+
+    def allow(self, device: str, probe: Callable[[], bool]) -> bool:
+        """True if `device` should be contacted now; open breakers run `probe` once their cooldown is over."""
+        state = self._states.get(device)
+        if not state or state["state"] == self.CLOSED:
+            return True
+
+        now = time.time()
+        if now < state["next_probe_at"]:
+            return False
+
+        if probe():
+            self.log.info(f"Device {device} answered the health probe, closing circuit")
+            self.record_success(device)
+            return True
+
+        state["probe_failures"] += 1
+        wait = min(self.max_cooldown, self.cooldown * 2 ** state["probe_failures"])
+        state["next_probe_at"] = now + wait
+        self._save(device)
+        self.log.warning(f"Device {device} still unreachable, next probe in {wait:.0f}s")
+        return False
+
+    def record_success(self, device: str) -> None:
+        if device in self._states:
+            del self._states[device]
+            self._save(device)
+
+    def record_failure(self, device: str) -> None:
+        state = self._states.setdefault(device, {
+            "state": self.CLOSED, "failures": 0, "probe_failures": 0, "opened_at": None, "next_probe_at": 0
+        })
+        state["failures"] += 1
+        if state["state"] == self.CLOSED and state["failures"] >= self.failure_threshold:
+            now = time.time()
+            state.update({"state": self.OPEN, "opened_at": now, "next_probe_at": now + self.cooldown})
+            self.log.error(f"Device {device} failed {state['failures']} times in a row, skipping it "
+                           f"until a health probe succeeds")
+        self._save(device)
+
+    def is_open(self, device: str) -> bool:
+        return self._states.get(device, {}).get("state") == self.OPEN
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            payload = AtomicFile.read_verified(self.state_file)
+            return json.loads(payload) if payload else {}
+        except ValueError:
+            return {}
+
+    def _save(self, device: str) -> None:
+        # Only this device's entry is written back; other processes own the rest of the file
+        with FileLock(self.state_file):
+            states = self._load()
+            if device in self._states:
+                states[device] = self._states[device]
+            else:
+                states.pop(device, None)
+            self.state_file.parent.mkdir(parents=True, exist_ok=True)
+            AtomicFile.write(self.state_file, json.dumps(states, indent=4).encode('utf-8'))
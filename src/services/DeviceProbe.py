@@ -0,0 +1,123 @@
+import json
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Optional
+from config.Logging import Logger
+from config.Settings import Settings
+from utils.AtomicFile import AtomicFile
+from utils.FileLock import FileLock
+
+CACHE_FILE = Path(__file__).parent.parent / 'data' / 'probe_cache.json'
+
+
+@dataclass
+class ProbeResult:
+    device: str
+    reachable: bool
+    probed_at: float
+    duration_ms: float
+    records: Optional[int] = None
+    users: Optional[int] = None
+    records_capacity: Optional[int] = None
+    users_capacity: Optional[int] = None
+    needs_download: bool = True
+    cached: bool = False
+
+    @property
+    def records_usage(self) -> Optional[float]:
+        if not self.records or not self.records_capacity:
+            return None
+        return self.records / self.records_capacity
+
+
+class DeviceProbe:
+    """
+    Decides whether a terminal has anything new before a full download: a TCP reachability check,
+    then `read_sizes` for the record counters. Results are cached per device for `ttl` seconds,
+    together with the record and user counts of the last successful collection. A cached count may predate
+    new punches, so only a fresh probe can report that there is nothing to download: collection runs
+    always probe fresh and the cache only serves `Cli.py probe`.
+    """
+
+    def __init__(self, connector, ttl: Optional[int] = None, cache_file: Path = CACHE_FILE):
+        self.connector = connector
+        self.ttl = ttl if ttl is not None else Settings.get().probe_cache_ttl
+        self.cache_file = Path(cache_file)
+        self.log = Logger.get_logger()
+        self.device = getattr(connector, "device_key", "device")
+
+    def probe(self, force: bool = False) -> ProbeResult:
+        entry = self._load().get(self.device, {})
+        last = entry.get("probe")
+        if not force and last and time.time() - last["probed_at"] < self.ttl:
+            result = ProbeResult(**{**last, "cached": True})
+            result.needs_download = result.reachable
+            return result
+
+        start = time.perf_counter()
+        result = ProbeResult(device=self.device, reachable=False, probed_at=time.time(), duration_ms=0.0)
+        if self.connector.is_reachable():
+            result.reachable = True
+            self._read_sizes(result)
+        result.duration_ms = round((time.perf_counter() - start) * 1000, 1)
+        result.needs_download = self._needs_download(result, entry)
+
+        entry["probe"] = {k: v for k, v in asdict(result).items() if k not in ("cached", "needs_download")}
+        self._store(entry)
+
+        usage = result.records_usage
+        if usage is not None and usage > 0.9:
+            self.log.warning(f"Device {self.device} attendance storage at {usage:.0%} of capacity")
+        return result
+
+    def mark_collected(self, records: Optional[int], users: Optional[int] = None) -> None:
+        """Remembers the device record and user counts that the stored files now reflect."""
+        if records is None:
+            return
+        entry = self._load().get(self.device, {})
+        entry["collected_records"] = records
+        entry["collected_users"] = users
+        entry["collected_at"] = time.time()
+        # The cached probe was taken before the download and says nothing about later punches
+        entry.pop("probe", None)
+        self._store(entry)
+
+    def _read_sizes(self, result: ProbeResult) -> None:
+        try:
+            conn = self.connector.connect()
+            if not conn:
+                return
+            conn.read_sizes()
+            result.records = conn.records
+            result.users = conn.users
+            result.records_capacity = getattr(conn, "rec_cap", None)
+            result.users_capacity = getattr(conn, "users_cap", None)
+        except Exception as e:
+            self.log.warning(f"Probe of {self.device} could not read sizes: {e}")
+        finally:
+            self.connector.disconnect()
+
+    @staticmethod
+    def _needs_download(result: ProbeResult, entry: Dict) -> bool:
+        if not result.reachable:
+            return False
+        if result.records is None:
+            # Counters unavailable: fall back to a full download
+            return True
+        # Enrolling a user makes punches dropped as unknown by the last collection processable
+        return result.records != entry.get("collected_records") or result.users != entry.get("collected_users")
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            payload = AtomicFile.read_verified(self.cache_file)
+            return json.loads(payload) if payload else {}
+        except ValueError:
+            return {}
+
+    def _store(self, entry: Dict) -> None:
+        with FileLock(self.cache_file):
+            cache = self._load()
+            cache[self.device] = entry
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            AtomicFile.write(self.cache_file, json.dumps(cache, indent=4).encode('utf-8'))
@@ -0,0 +1,163 @@
+import json
+from datetime import datetime, time, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+from config.Logging import Logger
+from config.Settings import Settings
+from utils.AtomicFile import AtomicFile
+from utils.FileLock import FileLock
+from utils.FileNameSanitizer import FileNameSanitizer
+from utils.to_JSON import ToJSON
+
+DATA_DIR = Path(__file__).parent.parent / 'data'
+WATERMARK_FILE = DATA_DIR / 'upload_watermarks.json'
+ARCHIVE_DIR = DATA_DIR / 'device_archive'
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class UploadWatermark:
+    """
+    Per-device time span whose punches the backend has acknowledged. The span only grows
+    when a new upload is contiguous with it, so a day that was never uploaded keeps it from advancing.
+    """
+
+    def __init__(self, state_file: Path = WATERMARK_FILE):
+        self.state_file = Path(state_file)
+        self.log = Logger.get_logger()
+
+    def get(self, device: str) -> Optional[Dict[str, datetime]]:
+        entry = self._load().get(device)
+        if not entry:
+            return None
+        return {key: datetime.strptime(value, TIMESTAMP_FORMAT) for key, value in entry.items()}
+
+    def acknowledge(self, device: str, start: datetime, end: datetime) -> None:
+        # Collectors of other devices update the same file
+        with FileLock(self.state_file):
+            self._acknowledge(device, start, end)
+
+    def _acknowledge(self, device: str, start: datetime, end: datetime) -> None:
+        state = self._load()
+        entry = state.get(device)
+        if entry is None:
+            covered_from, covered_until = start, end
+        else:
+            covered_from = datetime.strptime(entry["covered_from"], TIMESTAMP_FORMAT)
+            covered_until = datetime.strptime(entry["covered_until"], TIMESTAMP_FORMAT)
+            if start <= covered_until + timedelta(seconds=1) and end > covered_until:
+                covered_until = end
+            if end >= covered_from - timedelta(seconds=1) and start < covered_from:
+                covered_from = start
+            if start > covered_until + timedelta(seconds=1):
+                self.log.debug(f"Upload {start}..{end} for {device} is not contiguous with {covered_until}")
+
+        state[device] = {
+            "covered_from": covered_from.strftime(TIMESTAMP_FORMAT),
+            "covered_until": covered_until.strftime(TIMESTAMP_FORMAT),
+        }
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        AtomicFile.write(self.state_file, json.dumps(state, indent=4).encode('utf-8'))
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            payload = AtomicFile.read_verified(self.state_file)
+            return json.loads(payload) if payload else {}
+        except ValueError:
+            return {}
+
+
+class DeviceRetention:
+    """
+    Opt-in (DEVICE_PRUNE_ENABLED=1) clearing of the terminal's attendance buffer. It only runs when
+    the buffer holds at least DEVICE_PRUNE_MIN_RECORDS punches and every one of them lies inside the
+    acknowledged upload span and before the earliest day that is still open: a day's summary is computed
+    from all of its punches on the device, so a day must be over (with shifts, its last shift window
+    closed) before its punches are cleared. The buffer is archived locally and the archive is verified before
+    `clear_attendance`. The read, check and clear happen while the device is disabled, so no punch
+    can arrive in between.
+    """
+
+    def __init__(self, connector, watermark: Optional[UploadWatermark] = None, archive_dir: Path = ARCHIVE_DIR,
+                 shift_engine=None):
+        settings = Settings.get()
+        self.connector = connector
+        self.shift_engine = shift_engine
+        self.enabled = settings.device_prune_enabled
+        self.min_records = settings.device_prune_min_records
+        self.watermark = watermark or UploadWatermark()
+        self.archive_dir = Path(archive_dir)
+        self.log = Logger.get_logger()
+
+    def maybe_prune(self, device: str, records_on_device: Optional[int] = None) -> bool:
+        if not self.enabled:
+            return False
+        if records_on_device is not None and records_on_device < self.min_records:
+            return False
+
+        covered = self.watermark.get(device)
+        if not covered:
+            self.log.debug(f"No acknowledged uploads for {device}, not pruning")
+            return False
+
+        try:
+            with self.connector.device_locked() as conn:
+                attendance = conn.get_attendance()
+                if len(attendance) < self.min_records:
+                    return False
+
+                open_since = self._open_since(datetime.now())
+                outside = [
+                    att for att in attendance
+                    if not (covered["covered_from"] <= att.timestamp <= covered["covered_until"]
+                            and att.timestamp < open_since)
+                ]
+                if outside:
+                    self.log.info(f"Not pruning {device}: {len(outside)} records belong to open days "
+                                  f"or are not acknowledged yet")
+                    return False
+
+                archive = self._archive(device, attendance)
+                conn.clear_attendance()
+
+            self.log.info(f"Cleared {len(attendance)} records from {device}, archived to {archive}")
+            return True
+        except Exception as e:
+            self.log.error(f"Error pruning attendance on {device}: {e}")
+            return False
+        finally:
+            self.connector.disconnect()
+
+    def _open_since(self, now: datetime) -> datetime:
+        """Start of the download range of the earliest day that can still receive punches."""
+        today = now.date()
+        if not self.shift_engine:
+            return datetime.combine(today, time.min)
+        # Night shifts keep a day open past midnight, until its last window closes
+        day = today - timedelta(days=2)
+        while day < today:
+            start, end = self.shift_engine.collection_range(day, day)
+            if end >= now:
+                return start
+            day += timedelta(days=1)
+        return self.shift_engine.collection_range(today, today)[0]
+
+    def _archive(self, device: str, attendance: List) -> Path:
+        timestamps = [att.timestamp for att in attendance]
+        directory = self.archive_dir / FileNameSanitizer.sanitize(device)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"attendance_{min(timestamps):%Y%m%d%H%M%S}_{max(timestamps):%Y%m%d%H%M%S}.json"
+
+        payload = ToJSON.serialize([
+            {
+                "uid": att.uid,
+                "user_id": str(att.user_id),
+                "timestamp": att.timestamp.strftime(TIMESTAMP_FORMAT),
+                "status": att.status,
+                "punch": att.punch,
+            }
+            for att in attendance
+        ])
+        AtomicFile.write(path, payload)
+        if AtomicFile.read_verified(path) != payload:
+            raise IOError(f"Archive verification failed for {path}")
+        return path
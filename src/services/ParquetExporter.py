@@ -0,0 +1,135 @@
+import json
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+from config.FilePathManager import FilePathManager
+from config.Logging import Logger
+from utils.AtomicFile import AtomicFile
+from utils.FileNameSanitizer import FileNameSanitizer
+
+EXPORT_DIR = Path(__file__).parent.parent / 'data' / 'exports' / 'parquet'
+MANIFEST_NAME = '_manifest.json'
+
+
+class ParquetExporter:
+    """
+    Exports the JSON day files as two hive-partitioned Parquet datasets,
+    `punches/` and `daily/`, laid out as device=<serial>/month=YYYY-MM/part-YYYYMMDD.parquet.
+    One file per day means re-exporting a changed day only rewrites that file; a manifest of
+    source checksums lets unchanged days be skipped. Requires the optional `pyarrow` package.
+    """
+
+    def __init__(self, output_dir: Optional[Path] = None, paths: Optional[FilePathManager] = None):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet export requires pyarrow: pip install pyarrow") from e
+        self.pa = pa
+        self.pq = pq
+        self.output_dir = Path(output_dir) if output_dir else EXPORT_DIR
+        self.paths = paths or FilePathManager()
+        self.log = Logger.get_logger()
+        self.punch_schema = pa.schema([
+            ("serial_number", pa.string()),
+            ("user_id", pa.string()),
+            ("user_name", pa.string()),
+            ("date", pa.date32()),
+            ("timestamp", pa.timestamp("s")),
+            ("type", pa.int8()),
+        ])
+        self.daily_schema = pa.schema([
+            ("serial_number", pa.string()),
+            ("user_id", pa.string()),
+            ("user_name", pa.string()),
+            ("date", pa.date32()),
+            ("first_in", pa.timestamp("s")),
+            ("last_out", pa.timestamp("s")),
+            ("worked_seconds", pa.int64()),
+            ("punches", pa.int32()),
+            ("status", pa.int8()),
+        ])
+
+    def export(self, full: bool = False) -> Dict[str, int]:
+        manifest = {} if full else self._load_manifest()
+        exported = skipped = 0
+        for filename in sorted(self.paths.iter_attendance_files()):
+            try:
+                payload = AtomicFile.read_verified(filename)
+            except ValueError as e:
+                self.log.error(f"Skipping corrupted day file {filename}: {e}")
+                continue
+            if payload is None:
+                continue
+
+            checksum = AtomicFile.checksum(payload)
+            if manifest.get(filename) == checksum:
+                skipped += 1
+                continue
+
+            self.export_day(json.loads(payload))
+            manifest[filename] = checksum
+            exported += 1
+
+        self._save_manifest(manifest)
+        return {"exported": exported, "skipped": skipped}
+
+    def export_day(self, payload: Dict) -> None:
+        serial = payload.get("serial_number") or "unknown"
+        day = date.fromisoformat(payload["date"])
+        punches, daily = self._rows(serial, day, payload.get("users", {}))
+
+        partition = Path(f"device={FileNameSanitizer.sanitize(serial)}") / f"month={day:%Y-%m}"
+        part_name = f"part-{day:%Y%m%d}.parquet"
+        self._write(self.output_dir / "punches" / partition / part_name, punches, self.punch_schema)
+        self._write(self.output_dir / "daily" / partition / part_name, daily, self.daily_schema)
+
+    @staticmethod
+    def _rows(serial: str, day: date, users: Dict) -> tuple:
+        punches: List[Dict] = []
+        daily: List[Dict] = []
+        for user in users.values():
+            user_id = str(user.get("user_id"))
+            name = user.get("user_name")
+            stamps = []
+            for record in user.get("records", []):
+                timestamp = datetime.combine(
+                    day + timedelta(days=record.get("day_offset", 0)),
+                    datetime.strptime(record["hour"], "%H:%M:%S").time()
+                )
+                stamps.append(timestamp)
+                punches.append({
+                    "serial_number": serial, "user_id": user_id, "user_name": name,
+                    "date": day, "timestamp": timestamp, "type": int(record["type"]),
+                })
+            stamps.sort()
+            worked = user.get("worked_seconds")
+            if worked is None:
+                worked = int((stamps[-1] - stamps[0]).total_seconds()) if len(stamps) > 1 else 0
+            daily.append({
+                "serial_number": serial, "user_id": user_id, "user_name": name, "date": day,
+                "first_in": stamps[0] if stamps else None,
+                "last_out": stamps[-1] if len(stamps) > 1 else None,
+                "worked_seconds": int(worked), "punches": len(stamps), "status": int(user.get("status", 0)),
+            })
+        return punches, daily
+
+    def _write(self, path: Path, rows: List[Dict], schema) -> None:
+        table = self.pa.Table.from_pylist(rows, schema=schema)
+        sink = self.pa.BufferOutputStream()
+        self.pq.write_table(table, sink, compression="zstd")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # No checksum sidecar: dataset readers would try to open it as a data file
+        AtomicFile.write(path, sink.getvalue().to_pybytes(), checksum=False)
+
+    def _load_manifest(self) -> Dict[str, str]:
+        try:
+            payload = AtomicFile.read_verified(self.output_dir / MANIFEST_NAME)
+            return json.loads(payload) if payload else {}
+        except ValueError:
+            return {}
+
+    def _save_manifest(self, manifest: Dict[str, str]) -> None:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        AtomicFile.write(self.output_dir / MANIFEST_NAME, json.dumps(manifest, indent=4).encode('utf-8'),
+                         checksum=False)
@@ -0,0 +1,154 @@
+import json
+import signal
+import threading
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+from config.Logging import Logger
+from config.Settings import Settings
+
+PROFILE_SIGNAL = getattr(signal, 'SIGUSR1', None)  # not available on Windows
+
+
+class ProfilerTrigger:
+    """
+    Opt-in profiling of the running service, without a restart:
+      - `kill -USR1 <pid>` starts a session of PROFILE_SECONDS in PROFILE_MODE, or stops the running one early.
+      - PROFILER_ADMIN_PORT serves on 127.0.0.1 only: `GET /profile` (status),
+        `POST /profile/start?mode=sample&seconds=30` and `POST /profile/stop`.
+    cProfile only sees the thread it runs on, so those sessions are started and stopped from the
+    SIGUSR1 handler on the main thread; without SIGUSR1 (Windows) only sampling is available.
+    """
+
+    def __init__(self, mode: str = "sample", seconds: int = 30, signals: bool = False, admin_port: int = 0):
+        self.mode = mode
+        self.seconds = seconds
+        self.signals = signals and PROFILE_SIGNAL is not None
+        self.admin_port = admin_port
+        self.log = Logger.get_logger()
+        self._profiler = None
+        self._timer: Optional[threading.Timer] = None
+        self._pending: Optional[tuple] = None
+        self._handler_installed = False
+        self.server = None
+
+    @classmethod
+    def from_settings(cls) -> 'ProfilerTrigger':
+        settings = Settings.get()
+        return cls(settings.profile_mode, settings.profile_seconds,
+                   settings.profiler_signal, settings.profiler_admin_port)
+
+    @property
+    def profiler(self):
+        if self._profiler is None:
+            from utils.Profiler import Profiler
+            self._profiler = Profiler()
+        return self._profiler
+
+    def install(self) -> None:
+        """Must be called from the main thread, like any signal handler."""
+        if (self.signals or self.admin_port) and PROFILE_SIGNAL is not None:
+            # Also needed by the admin endpoint, which hands cProfile sessions to the main thread
+            signal.signal(PROFILE_SIGNAL, self._on_signal)
+            self._handler_installed = True
+        if self.admin_port:
+            self._serve()
+        if self.signals:
+            self.log.info(f"Profiler armed: send SIGUSR1 for {self.seconds} s of {self.mode} profiling")
+
+    def status(self) -> Dict:
+        profiler = self.profiler
+        return {
+            "active": profiler.active,
+            "mode": profiler.mode,
+            "started_at": profiler.started_at.isoformat(timespec='seconds') if profiler.active else None,
+            "output_dir": str(profiler.output_dir),
+        }
+
+    def start(self, mode: Optional[str] = None, seconds: Optional[float] = None) -> bool:
+        mode = mode or self.mode
+        seconds = seconds or self.seconds
+        if mode == "cprofile" and threading.current_thread() is not threading.main_thread():
+            if not self._handler_installed:
+                raise ValueError("cprofile needs SIGUSR1 (not available on this platform), use sample")
+            if self.profiler.active:
+                return False
+            self._pending = ("start", mode, seconds)
+            signal.raise_signal(PROFILE_SIGNAL)
+            return True
+        if not self.profiler.start(mode):
+            return False
+        self._timer = threading.Timer(seconds, self.stop)
+        self._timer.name = "profiler-timer"
+        self._timer.daemon = True
+        self._timer.start()
+        return True
+
+    def stop(self) -> bool:
+        if not self.profiler.active:
+            return False
+        if self.profiler.mode == "cprofile" and threading.current_thread() is not threading.main_thread():
+            self._pending = ("stop",)
+            signal.raise_signal(PROFILE_SIGNAL)
+            return True
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        self.profiler.stop()
+        return True
+
+    def _on_signal(self, signum, frame) -> None:
+        pending, self._pending = self._pending, None
+        try:
+            if pending and pending[0] == "start":
+                self.start(*pending[1:])
+            elif pending or self.profiler.active:
+                self.stop()
+            else:
+                self.start()
+        except Exception as e:
+            self.log.error(f"Error handling profiler signal: {e}")
+
+    def _serve(self) -> None:
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        trigger = self
+
+        class AdminHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if urlparse(self.path).path != "/profile":
+                    return self._reply(404, {"error": "not found"})
+                self._reply(200, trigger.status())
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                try:
+                    if url.path == "/profile/start":
+                        seconds = float(query["seconds"]) if "seconds" in query else None
+                        accepted = trigger.start(query.get("mode"), seconds)
+                    elif url.path == "/profile/stop":
+                        accepted = trigger.stop()
+                    else:
+                        return self._reply(404, {"error": "not found"})
+                except ValueError as e:
+                    return self._reply(400, {"error": str(e)})
+                self._reply(202 if accepted else 409, trigger.status())
+
+            def _reply(self, status: int, body: Dict) -> None:
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                trigger.log.debug(f"Profiler admin: {format % args}")
+
+        try:
+            self.server = ThreadingHTTPServer(("127.0.0.1", self.admin_port), AdminHandler)
+        except OSError as e:
+            self.log.error(f"Profiler admin endpoint not started on port {self.admin_port}: {e}")
+            return
+        threading.Thread(target=self.server.serve_forever, name="profiler-admin", daemon=True).start()
+        self.log.info(f"Profiler admin endpoint on http://127.0.0.1:{self.admin_port}/profile")
@@ -0,0 +1,199 @@
+import json
+import mmap
+import os
+import struct
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from config.Logging import Logger
+from utils.AtomicFile import AtomicFile
+from utils.FileLock import FileLock
+from utils.FileNameSanitizer import FileNameSanitizer
+from utils.to_JSON import ToJSON
+
+ARCHIVE_DIR = Path(__file__).parent.parent / 'data' / 'punch_archive'
+EPOCH = datetime(1970, 1, 1)
+MAGIC = b'ZKPA'
+VERSION = 1
+HEADER = struct.Struct('<4sHH8x')
+USER_ID_BYTES = 24
+# timestamp (device local time as seconds since 1970-01-01), uid, user_id, status, punch
+RECORD = struct.Struct(f'<qI{USER_ID_BYTES}sBB2x')
+NUMPY_DTYPE = [
+    ('timestamp', '<i8'), ('uid', '<u4'), ('user_id', f'S{USER_ID_BYTES}'),
+    ('status', 'u1'), ('punch', 'u1'), ('pad', 'V2')
+]
+
+ArchivedPunch = namedtuple('ArchivedPunch', 'uid user_id timestamp status punch')
+
+
+class PunchArchive:
+    """
+    Append-only punch history of one device: a 16-byte header followed by fixed-size records in
+    timestamp order. The file is memory-mapped and binary-searched for time-range queries, and
+    `to_numpy` returns a zero-copy structured array over the same mapping.
+    """
+
+    def __init__(self, device: str, archive_dir: Path = ARCHIVE_DIR):
+        name = FileNameSanitizer.sanitize(device)
+        self.device = device
+        self.path = Path(archive_dir) / f"{name}.punches"
+        self.users_path = Path(archive_dir) / f"{name}.users.json"
+        self.log = Logger.get_logger()
+
+    @staticmethod
+    def _seconds(timestamp: datetime) -> int:
+        return int((timestamp - EPOCH).total_seconds())
+
+    @staticmethod
+    def _pack(attendance) -> bytes:
+        return RECORD.pack(
+            PunchArchive._seconds(attendance.timestamp),
+            int(getattr(attendance, 'uid', 0) or 0),
+            str(attendance.user_id).encode('utf-8')[:USER_ID_BYTES],
+            int(getattr(attendance, 'status', 0) or 0),
+            int(getattr(attendance, 'punch', 0) or 0)
+        )
+
+    @staticmethod
+    def _unpack(buffer, offset: int) -> ArchivedPunch:
+        seconds, uid, user_id, status, punch = RECORD.unpack_from(buffer, offset)
+        return ArchivedPunch(uid, user_id.rstrip(b'\0').decode('utf-8'), EPOCH + timedelta(seconds=seconds), status, punch)
+
+    def __len__(self) -> int:
+        try:
+            return max(0, (self.path.stat().st_size - HEADER.size) // RECORD.size)
+        except FileNotFoundError:
+            return 0
+
+    @contextmanager
+    def _mapped(self):
+        if len(self) == 0:
+            yield None
+            return
+        with open(self.path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                magic, version, record_size = HEADER.unpack_from(mapped, 0)
+                if magic != MAGIC or record_size != RECORD.size:
+                    raise ValueError(f"{self.path} is not a punch archive (version {version})")
+                yield mapped
+
+    @staticmethod
+    def _timestamp_at(mapped, index: int) -> int:
+        return struct.unpack_from('<q', mapped, HEADER.size + index * RECORD.size)[0]
+
+    @staticmethod
+    def _bisect(mapped, count: int, seconds: int, right: bool = False) -> int:
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            value = PunchArchive._timestamp_at(mapped, middle)
+            if value < seconds or (right and value == seconds):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _slice(self, mapped, start: Optional[datetime], end: Optional[datetime]) -> tuple:
+        count = (len(mapped) - HEADER.size) // RECORD.size
+        first = self._bisect(mapped, count, self._seconds(start)) if start else 0
+        last = self._bisect(mapped, count, self._seconds(end), right=True) if end else count
+        return first, max(first, last)
+
+    def records(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[ArchivedPunch]:
+        """Punches with `start <= timestamp <= end`, in timestamp order."""
+        with self._mapped() as mapped:
+            if mapped is None:
+                return []
+            first, last = self._slice(mapped, start, end)
+            return [self._unpack(mapped, HEADER.size + index * RECORD.size) for index in range(first, last)]
+
+    def span(self) -> Optional[tuple]:
+        """First and last archived timestamps, or None for an empty archive."""
+        with self._mapped() as mapped:
+            if mapped is None:
+                return None
+            count = (len(mapped) - HEADER.size) // RECORD.size
+            return tuple(EPOCH + timedelta(seconds=self._timestamp_at(mapped, index)) for index in (0, count - 1))
+
+    def to_numpy(self, start: Optional[datetime] = None, end: Optional[datetime] = None):
+        """Structured NumPy array over the mapped file, without copying the records."""
+        try:
+            import numpy as np
+        except ImportError as e:
+            raise ImportError("to_numpy requires numpy: pip install numpy") from e
+
+        dtype = np.dtype(NUMPY_DTYPE)
+        if len(self) == 0:
+            return np.empty(0, dtype=dtype)
+        with open(self.path, 'rb') as f:
+            # The array keeps the mapping alive after the file is closed
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        first, last = self._slice(mapped, start, end)
+        return np.frombuffer(mapped, dtype=dtype, count=last - first, offset=HEADER.size + first * RECORD.size)
+
+    def append(self, attendance: Iterable) -> int:
+        """Adds the punches that are not archived yet; returns how many were written."""
+        punches = sorted(attendance, key=lambda att: att.timestamp)
+        if not punches:
+            return 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with FileLock(self.path):
+            known = self._known_keys(self._seconds(punches[0].timestamp))
+            last = max((seconds for seconds, _ in known), default=None)
+            new = []
+            for att in punches:
+                key = (self._seconds(att.timestamp), str(att.user_id))
+                if key not in known:
+                    known.add(key)
+                    new.append(att)
+            if not new:
+                return 0
+
+            if last is not None and self._seconds(new[0].timestamp) < last:
+                # A punch older than the archive tail (device clock moved back): rewrite in order
+                self._rewrite(new)
+            else:
+                with open(self.path, 'ab') as f:
+                    if f.tell() == 0:
+                        f.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+                    f.write(b''.join(self._pack(att) for att in new))
+                    f.flush()
+                    os.fsync(f.fileno())
+        return len(new)
+
+    def _known_keys(self, since_seconds: int) -> set:
+        with self._mapped() as mapped:
+            if mapped is None:
+                return set()
+            count = (len(mapped) - HEADER.size) // RECORD.size
+            first = self._bisect(mapped, count, since_seconds)
+            keys = set()
+            for index in range(first, count):
+                seconds, _, user_id, _, _ = RECORD.unpack_from(mapped, HEADER.size + index * RECORD.size)
+                keys.add((seconds, user_id.rstrip(b'\0').decode('utf-8')))
+            if first == count and count:
+                # Nothing at or after the new punches: only the tail timestamp is needed for ordering
+                seconds, _, user_id, _, _ = RECORD.unpack_from(mapped, HEADER.size + (count - 1) * RECORD.size)
+                keys.add((seconds, user_id.rstrip(b'\0').decode('utf-8')))
+            return keys
+
+    def _rewrite(self, new: List) -> None:
+        records = sorted(self.records() + new, key=lambda att: att.timestamp)
+        payload = HEADER.pack(MAGIC, VERSION, RECORD.size) + b''.join(self._pack(att) for att in records)
+        AtomicFile.write(self.path, payload, checksum=False)
+        self.log.warning(f"Punch archive {self.path} rewritten to keep {len(new)} older punches in order")
+
+    def save_users(self, users_info: Dict) -> None:
+        """Keeps the user list next to the punches, so day files can be rebuilt without the terminal."""
+        payload = ToJSON.serialize(users_info)
+        if AtomicFile.read_verified(self.users_path) != payload:
+            self.users_path.parent.mkdir(parents=True, exist_ok=True)
+            AtomicFile.write(self.users_path, payload)
+
+    def load_users(self) -> Dict:
+        payload = AtomicFile.read_verified(self.users_path)
+        return json.loads(payload) if payload else {}
@@ -0,0 +1,30 @@
+import random
+from dataclasses import dataclass
+from typing import Optional
+from config.Settings import Settings
+
+
+@dataclass
+class RetryPolicy:
+    """Exponential backoff with full jitter and a bounded number of attempts per run."""
+    base_delay: float = 5.0
+    max_delay: float = 600.0
+    multiplier: float = 2.0
+    max_attempts: Optional[int] = 6
+
+    @classmethod
+    def from_settings(cls, settings: Optional[Settings] = None) -> 'RetryPolicy':
+        settings = settings or Settings.get()
+        return cls(
+            base_delay=settings.retry_base_delay,
+            max_delay=settings.retry_max_delay,
+            max_attempts=settings.retry_max_attempts or None
+        )
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait after failed attempt number `attempt` (1-based)."""
+        ceiling = min(self.max_delay, self.base_delay * self.multiplier ** max(0, attempt - 1))
+        return random.uniform(0, ceiling)
+
+    def exhausted(self, attempt: int) -> bool:
+        return self.max_attempts is not None and attempt >= self.max_attempts
@@ -0,0 +1,86 @@
+import hashlib
+import json
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+from config.Logging import Logger
+from utils.AtomicFile import AtomicFile
+from utils.FileLock import FileLock
+
+STATE_FILE = Path(__file__).parent.parent / 'data' / 'run_fingerprints.json'
+KEEP_DAYS = 7
+
+
+class RunFingerprints:
+    """
+    Fingerprints of what the last successful run of each device downloaded and uploaded.
+    The input fingerprint is the record count plus the last punch and a hash of the enrolled users
+    (punches of users enrolled later must be processed again); the output fingerprint is a hash
+    of a day's payload without its per-run "id", so a day that did not change is neither rewritten nor re-sent.
+    """
+
+    def __init__(self, state_file: Path = STATE_FILE):
+        self.state_file = Path(state_file)
+        self.log = Logger.get_logger()
+
+    @staticmethod
+    def input_fingerprint(attendance: List, users_info: Dict) -> Optional[str]:
+        if not attendance:
+            return None
+        last = max(attendance, key=lambda att: att.timestamp)
+        users = hashlib.sha256(json.dumps(
+            sorted([str(user_id), user.get("name", "")] for user_id, user in users_info.items()),
+            ensure_ascii=False, separators=(',', ':')
+        ).encode('utf-8')).hexdigest()[:16]
+        return f"{len(attendance)}:{getattr(last, 'uid', '')}:{last.user_id}:{last.timestamp.isoformat()}:{users}"
+
+    @staticmethod
+    def output_fingerprint(records: Dict) -> str:
+        content = {key: value for key, value in records.items() if key != "id"}
+        return hashlib.sha256(
+            json.dumps(content, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        ).hexdigest()
+
+    def input_unchanged(self, device: str, date_range: Optional[tuple], attendance: List, users_info: Dict) -> bool:
+        entry = self._load().get(device, {})
+        return bool(attendance) and entry.get("input") == [
+            self._range_key(date_range), self.input_fingerprint(attendance, users_info)
+        ]
+
+    def output_unchanged(self, device: str, day: date, fingerprint: str) -> bool:
+        return self._load().get(device, {}).get("days", {}).get(day.isoformat()) == fingerprint
+
+    def remember_input(self, device: str, date_range: Optional[tuple], attendance: List, users_info: Dict) -> None:
+        self._update(device, lambda entry: entry.update(
+            input=[self._range_key(date_range), self.input_fingerprint(attendance, users_info)]
+        ))
+
+    def remember_output(self, device: str, day: date, fingerprint: str) -> None:
+        def update(entry: Dict) -> None:
+            days = entry.setdefault("days", {})
+            days[day.isoformat()] = fingerprint
+            cutoff = (day - timedelta(days=KEEP_DAYS)).isoformat()
+            for key in [key for key in days if key < cutoff]:
+                del days[key]
+        self._update(device, update)
+
+    @staticmethod
+    def _range_key(date_range: Optional[tuple]) -> Optional[List[str]]:
+        return [bound.isoformat() for bound in date_range] if date_range else None
+
+    def _update(self, device: str, update) -> None:
+        try:
+            with FileLock(self.state_file):
+                state = self._load()
+                update(state.setdefault(device, {}))
+                self.state_file.parent.mkdir(parents=True, exist_ok=True)
+                AtomicFile.write(self.state_file, json.dumps(state, indent=4).encode('utf-8'))
+        except Exception as e:
+            self.log.error(f"Error saving run fingerprints: {e}")
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            payload = AtomicFile.read_verified(self.state_file)
+            return json.loads(payload) if payload else {}
+        except ValueError:
+            return {}
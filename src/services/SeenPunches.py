@@ -0,0 +1,82 @@
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, List
+from config.Logging import Logger
+from utils.AtomicFile import AtomicFile
+from utils.FileNameSanitizer import FileNameSanitizer
+
+SEEN_DIR = Path(__file__).parent.parent / 'data' / 'seen_punches'
+EPOCH = datetime(1970, 1, 1)
+
+
+class SeenPunches:
+    """
+    Punches of one device that were already stored and uploaded, kept as a sorted array of unsigned
+    64-bit keys (timestamp seconds in the high bits, crc32 of the user id in the low bits; unsigned so
+    timestamps after 2038 fit). pyzk's `uid` is the user's
+    slot on the terminal, not a record id, so a punch is identified by its user and timestamp instead.
+    """
+
+    def __init__(self, device: str, state_dir: Path = SEEN_DIR):
+        self.device = device
+        self.path = Path(state_dir) / f"{FileNameSanitizer.sanitize(device)}.bin"
+        self.log = Logger.get_logger()
+        self.keys = array('Q')
+        self._load()
+
+    @staticmethod
+    def key(user_id, timestamp: datetime) -> int:
+        seconds = int((timestamp - EPOCH).total_seconds())
+        return (seconds << 32) | zlib.crc32(str(user_id).encode('utf-8'))
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: int) -> bool:
+        index = bisect_left(self.keys, key)
+        return index < len(self.keys) and self.keys[index] == key
+
+    def unseen(self, attendance_list: Iterable) -> List:
+        """Punches not stored yet. New punches sort after every known key, so most lookups are a single compare."""
+        last = self.keys[-1] if self.keys else -1
+        return [
+            attendance for attendance in attendance_list
+            if (key := self.key(attendance.user_id, attendance.timestamp)) > last or key not in self
+        ]
+
+    def add(self, attendance_list: Iterable) -> int:
+        new_keys = sorted({self.key(att.user_id, att.timestamp) for att in attendance_list})
+        new_keys = [key for key in new_keys if key not in self]
+        if not new_keys:
+            return 0
+        if not self.keys or new_keys[0] > self.keys[-1]:
+            self.keys.extend(new_keys)
+        else:
+            self.keys = array('Q', sorted(self.keys.tolist() + new_keys))
+        self._save()
+        return len(new_keys)
+
+    def discard_through(self, timestamp: datetime) -> int:
+        """Forgets punches up to `timestamp`, once the device no longer holds them."""
+        cutoff = bisect_right(self.keys, (int((timestamp - EPOCH).total_seconds()) << 32) | 0xFFFFFFFF)
+        if cutoff:
+            del self.keys[:cutoff]
+            self._save()
+        return cutoff
+
+    def _load(self) -> None:
+        try:
+            payload = AtomicFile.read_verified(self.path)
+        except ValueError as e:
+            self.log.error(f"Discarding seen punches {self.path}: {e}")
+            AtomicFile.quarantine(self.path)
+            return
+        if payload:
+            self.keys.frombytes(payload)
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        AtomicFile.write(self.path, self.keys.tobytes())
@@ -0,0 +1,120 @@
+import hashlib
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Union
+
+
+class AtomicFile:
+    """Crash-safe file replacement with a sha256 sidecar used to detect torn or corrupted files."""
+
+    CHECKSUM_SUFFIX = '.sha256'
+    CORRUPT_SUFFIX = '.corrupt'
+
+    @staticmethod
+    def checksum(payload: bytes) -> str:
+        return hashlib.sha256(payload).hexdigest()
+
+    @classmethod
+    def checksum_path(cls, path: Union[str, Path]) -> Path:
+        path = Path(path)
+        return path.with_name(path.name + cls.CHECKSUM_SUFFIX)
+
+    @classmethod
+    def write(cls, path: Union[str, Path], payload: bytes, checksum: bool = True) -> int:
+        """Writes to a temp file in the same directory, fsyncs it and renames it over the target."""
+        path = Path(path)
+        if not checksum:
+            cls._replace(path, payload)
+            cls._fsync_directory(path.parent)
+            return len(payload)
+
+        checksum_file = cls.checksum_path(path)
+        new_checksum = cls.checksum(payload)
+
+        # While the data rename is pending, the sidecar accepts both the old and the new content
+        previous = cls._read_checksums(checksum_file)
+        if previous:
+            cls._replace(checksum_file, "\n".join([new_checksum] + previous[:1]).encode('ascii'))
+        cls._replace(path, payload)
+        cls._replace(checksum_file, new_checksum.encode('ascii'))
+        cls._fsync_directory(path.parent)
+        return len(payload)
+
+    @classmethod
+    def read_verified(cls, path: Union[str, Path]) -> Optional[bytes]:
+        """
+        Returns the file content, or None if it does not exist.
+        Raises ValueError if the content does not match its recorded checksum.
+        """
+        path = Path(path)
+        try:
+            with open(path, 'rb') as f:
+                payload = f.read()
+        except FileNotFoundError:
+            return None
+
+        expected = cls._read_checksums(cls.checksum_path(path))
+        if not expected:
+            # Files written before checksums existed are accepted as they are
+            return payload
+
+        if cls.checksum(payload) not in expected:
+            raise ValueError(f"Checksum mismatch for {path}")
+        return payload
+
+    @classmethod
+    def quarantine(cls, path: Union[str, Path]) -> Optional[Path]:
+        """
+        Moves a corrupted file aside so it is kept for inspection and not read again.
+        Each quarantine gets its own timestamped name, so a later corruption keeps the earlier evidence.
+        """
+        path = Path(path)
+        if not path.exists():
+            return None
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        target = path.with_name(f"{path.name}.{stamp}{cls.CORRUPT_SUFFIX}")
+        counter = 1
+        while target.exists():
+            target = path.with_name(f"{path.name}.{stamp}_{counter}{cls.CORRUPT_SUFFIX}")
+            counter += 1
+        os.replace(path, target)
+        checksum_file = cls.checksum_path(path)
+        if checksum_file.exists():
+            os.replace(checksum_file, target.with_name(target.name + cls.CHECKSUM_SUFFIX))
+        return target
+
+    @staticmethod
+    def _read_checksums(checksum_file: Path) -> List[str]:
+        try:
+            return checksum_file.read_text(encoding='ascii').split()
+        except FileNotFoundError:
+            return []
+
+    @staticmethod
+    def _replace(path: Path, payload: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    @staticmethod
+    def _fsync_directory(directory: Path) -> None:
+        # Directory fsync persists the rename itself; not available on Windows
+        if os.name != 'posix':
+            return
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
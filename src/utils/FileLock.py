@@ -0,0 +1,71 @@
+import os
+import time
+from pathlib import Path
+from typing import Union
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+
+class FileLock:
+    """
+    Exclusive lock on `<path>.lock`, held across a read-modify-write of `path` so concurrent
+    collectors (threads or processes) cannot overwrite each other's updates.
+    """
+
+    def __init__(self, path: Union[str, Path], timeout: float = 30.0, poll_interval: float = 0.05):
+        self.lock_path = Path(f"{path}.lock")
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.waited = 0.0
+        self._fd = None
+
+    def acquire(self) -> 'FileLock':
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        start = time.perf_counter()
+        while True:
+            try:
+                self._lock(fd)
+                break
+            except OSError:
+                if time.perf_counter() - start >= self.timeout:
+                    os.close(fd)
+                    raise TimeoutError(f"Could not lock {self.lock_path} within {self.timeout}s")
+                time.sleep(self.poll_interval)
+        self.waited = time.perf_counter() - start
+        self._fd = fd
+        return self
+
+    def release(self) -> None:
+        if self._fd is None:
+            return
+        try:
+            self._unlock(self._fd)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    @staticmethod
+    def _lock(fd: int) -> None:
+        if os.name == 'nt':
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    @staticmethod
+    def _unlock(fd: int) -> None:
+        if os.name == 'nt':
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def __enter__(self) -> 'FileLock':
+        return self.acquire()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.release()
@@ -0,0 +1,130 @@
+import cProfile
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+from config.Logging import Logger
+
+PROFILES_DIR = Path(__file__).parent.parent / 'data' / 'profiles'
+MODES = ("sample", "cprofile")
+
+
+class Profiler:
+    """
+    One profiling session at a time, written to data/profiles/ when it stops:
+      - sample: every thread's stack every `interval` seconds, as folded stacks
+        (`thread;outer;...;inner count`) for flamegraph.pl, speedscope or inferno.
+      - cprofile: deterministic profile of the thread that starts it, as a .pstats file
+        for snakeviz, flameprof or gprof2dot. Start and stop it on the same thread.
+    Both add a tracemalloc diff between the start and the end of the session.
+    """
+
+    def __init__(self, output_dir: Path = PROFILES_DIR, interval: float = 0.005):
+        self.output_dir = Path(output_dir)
+        self.interval = interval
+        self.log = Logger.get_logger()
+        self.mode: Optional[str] = None
+        self.started_at: Optional[datetime] = None
+        self._profile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[threading.Thread] = None
+        self._stacks: Counter = Counter()
+        self._stop_sampling = threading.Event()
+        self._snapshot = None
+        self._owns_tracemalloc = False
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        return self.mode is not None
+
+    def start(self, mode: str = "sample") -> bool:
+        if mode not in MODES:
+            raise ValueError(f"Unknown profiling mode {mode!r}, expected one of {', '.join(MODES)}")
+        with self._lock:
+            if self.active:
+                return False
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._owns_tracemalloc = True
+            self._snapshot = tracemalloc.take_snapshot()
+            self.mode = mode
+            self.started_at = datetime.now()
+            if mode == "cprofile":
+                self._profile = cProfile.Profile()
+                self._profile.enable()
+            else:
+                self._stacks = Counter()
+                self._stop_sampling.clear()
+                self._sampler = threading.Thread(target=self._sample, name="profiler-sampler", daemon=True)
+                self._sampler.start()
+        self.log.info(f"Profiling started ({mode})")
+        return True
+
+    def stop(self) -> List[Path]:
+        """Stops the session and returns the files written (empty when nothing was running)."""
+        with self._lock:
+            if not self.active:
+                return []
+            mode, self.mode = self.mode, None
+            if mode == "cprofile":
+                self._profile.disable()
+            else:
+                self._stop_sampling.set()
+                self._sampler.join()
+
+            paths = []
+            try:
+                self.output_dir.mkdir(parents=True, exist_ok=True)
+                prefix = self.output_dir / f"{self.started_at.strftime('%Y%m%d_%H%M%S')}_{mode}"
+                if mode == "cprofile":
+                    paths.append(prefix.with_suffix('.pstats'))
+                    self._profile.dump_stats(paths[-1])
+                else:
+                    paths.append(prefix.with_suffix('.folded'))
+                    paths[-1].write_text(
+                        ''.join(f"{stack} {count}\n" for stack, count in self._stacks.most_common()),
+                        encoding='utf-8'
+                    )
+                paths.append(prefix.with_name(f"{prefix.name}_tracemalloc.txt"))
+                self._write_allocations(paths[-1])
+            except Exception as e:
+                self.log.error(f"Error writing profile: {e}")
+            finally:
+                self._profile = None
+                self._snapshot = None
+                if self._owns_tracemalloc:
+                    tracemalloc.stop()
+                    self._owns_tracemalloc = False
+        self.log.info(f"Profiling stopped, written {', '.join(str(path) for path in paths)}")
+        return paths
+
+    def _sample(self) -> None:
+        own = threading.get_ident()
+        names = {}
+        labels = {}
+        while not self._stop_sampling.wait(self.interval):
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    label = labels.get(code)
+                    if label is None:
+                        label = labels[code] = f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+                    stack.append(label)
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self._stacks[';'.join(reversed(stack))] += 1
+
+    def _write_allocations(self, path: Path, limit: int = 50) -> None:
+        diff = tracemalloc.take_snapshot().compare_to(self._snapshot, 'lineno')
+        seconds = (datetime.now() - self.started_at).total_seconds()
+        lines = [f"tracemalloc diff over {seconds:.1f} s, top {limit} by size change"]
+        lines.extend(str(stat) for stat in diff[:limit])
+        path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
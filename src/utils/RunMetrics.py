@@ -0,0 +1,65 @@
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Optional
+from config.Settings import Settings
+
+
+class RunMetrics:
+    """Wall-clock and allocation measurements for a single collection run."""
+
+    def __init__(self, trace_allocations: Optional[bool] = None):
+        if trace_allocations is None:
+            trace_allocations = Settings.get().run_trace_allocations
+        self.trace_allocations = trace_allocations
+        self.stages: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.peak_allocated_bytes: Optional[int] = None
+        self._start = None
+        self._owns_tracemalloc = False
+
+    def start(self) -> 'RunMetrics':
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        if self.trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._owns_tracemalloc = True
+        if self.trace_allocations:
+            tracemalloc.reset_peak()
+        return self
+
+    def stop(self) -> 'RunMetrics':
+        if self._start is None:
+            return self
+        self.finished_at = time.time()
+        self.stages['total'] = time.perf_counter() - self._start
+        if self.trace_allocations and tracemalloc.is_tracing():
+            _, self.peak_allocated_bytes = tracemalloc.get_traced_memory()
+            if self._owns_tracemalloc:
+                tracemalloc.stop()
+                self._owns_tracemalloc = False
+        self._start = None
+        return self
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def add_duration(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def summary(self) -> str:
+        parts = [f"{name}={seconds * 1000:.1f}ms" for name, seconds in self.stages.items()]
+        parts.extend(f"{name}={value}" for name, value in self.counters.items())
+        if self.peak_allocated_bytes is not None:
+            parts.append(f"peak_alloc={self.peak_allocated_bytes / 1024:.1f}KiB")
+        return " ".join(parts)
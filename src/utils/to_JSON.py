@@ -1,10 +1,21 @@
 import json
 from config.Logging import Logger
+from utils.AtomicFile import AtomicFile
 
 class ToJSON:
     @staticmethod
-    def save_json_output(data, filename):
+    def serialize(data) -> bytes:
+        return json.dumps(data, ensure_ascii=False, indent=4).encode('utf-8')
+
+    @staticmethod
+    def write_bytes(payload: bytes, filename) -> int:
         log = Logger.get_logger()
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
-        log.debug(f"\nData saved in: {filename}")
\ No newline at end of file
+        AtomicFile.write(filename, payload)
+        log.debug(f"\nData saved in: {filename}")
+        return len(payload)
+
+    @staticmethod
+    def save_json_output(data, filename) -> bytes:
+        payload = ToJSON.serialize(data)
+        ToJSON.write_bytes(payload, filename)
+        return payload
@@ -0,0 +1,12 @@
+import logging
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / 'src'
+sys.path.insert(0, str(SRC))
+
+from config.Logging import ROOT_LOGGER_NAME  # noqa: E402
+
+# Logger.get_logger() only adds its console and sqlite handlers to a logger without handlers,
+# so test runs stay out of data/attendance_logs.db
+logging.getLogger(ROOT_LOGGER_NAME).addHandler(logging.NullHandler())
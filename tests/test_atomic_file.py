@@ -0,0 +1,19 @@
+import pytest
+
+from utils.AtomicFile import AtomicFile
+
+
+def test_repeated_quarantine_keeps_every_corrupted_copy(tmp_path):
+    path = tmp_path / "seen_punches.json"
+    targets = []
+    for payload in (b"first", b"second"):
+        AtomicFile.write(path, payload)
+        path.write_bytes(payload + b" torn")
+        with pytest.raises(ValueError):
+            AtomicFile.read_verified(path)
+        targets.append(AtomicFile.quarantine(path))
+
+    assert targets[0] != targets[1]
+    assert [target.read_bytes() for target in targets] == [b"first torn", b"second torn"]
+    assert all(AtomicFile.checksum_path(target).exists() for target in targets)
+    assert not path.exists()
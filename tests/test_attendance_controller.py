@@ -0,0 +1,291 @@
+from collections import namedtuple
+from datetime import date, datetime
+from types import SimpleNamespace
+from controllers.AttendanceController import AttendanceController
+
+Punch = namedtuple("Punch", ["user_id", "timestamp", "status", "punch", "uid"])
+
+
+def punch(user_id, timestamp):
+    return Punch(user_id, timestamp, 1, 0, 1)
+
+
+def test_stored_punches_only_returns_punches_written_to_a_day():
+    day = date(2025, 2, 24)
+    attendance = [
+        punch("1", datetime(2025, 2, 24, 7, 0)),
+        punch("1", datetime(2025, 2, 24, 17, 0)),
+        punch("2", datetime(2025, 2, 24, 8, 0)),
+        punch("3", datetime(2025, 2, 25, 2, 0)),
+    ]
+    records = {day: {"users": {
+        "1": {"records": [{"hour": "07:00:00"}, {"hour": "17:00:00"}]},
+        "3": {"records": [{"hour": "02:00:00", "day_offset": 1}]},
+    }}}
+
+    stored = AttendanceController._stored_punches(attendance, records)
+
+    assert stored == [attendance[0], attendance[1], attendance[3]]
+
+
+def test_stored_punches_of_a_failed_day_is_empty():
+    attendance = [punch("1", datetime(2025, 2, 24, 7, 0))]
+    assert AttendanceController._stored_punches(attendance, {date(2025, 2, 24): {}}) == []
+
+
+class UnreachableDevice:
+    device_key = "gate"
+
+    def connect(self):
+        raise ConnectionError("Connection refused")
+
+    def disconnect(self):
+        pass
+
+
+def controller_for(connector, tmp_path):
+    from config.RunLedger import RunLedger
+    from services.CircuitBreaker import CircuitBreaker
+    from services.RetryPolicy import RetryPolicy
+
+    controller = AttendanceController(connector)
+    controller.device_info = SimpleNamespace(description=SimpleNamespace(serial_number="SN1"))
+    controller.retry_policy = RetryPolicy(base_delay=0, max_attempts=6)
+    controller.circuit_breaker = CircuitBreaker(failure_threshold=3, state_file=tmp_path / "breaker.json")
+    controller.run_ledger = RunLedger(tmp_path / "runs.db")
+    return controller
+
+
+def test_breaker_counts_one_failure_per_exhausted_run(tmp_path):
+    controller = controller_for(UnreachableDevice(), tmp_path)
+
+    controller.process_attendance()
+    run, = controller.run_ledger.recent()
+    assert run["retries"] == 5
+    assert not controller.circuit_breaker.is_open("gate")
+
+    controller.process_attendance()
+    controller.process_attendance()
+    assert controller.circuit_breaker.is_open("gate")
+
+
+def test_failed_download_is_a_device_failure(tmp_path, monkeypatch):
+    from models.user.UserRepository import UserRepository
+
+    def broken(self, raise_errors=False):
+        if raise_errors:
+            raise OSError("timed out")
+        return {}
+
+    monkeypatch.setattr(UserRepository, "get_users_info", broken)
+    controller = controller_for(UnreachableDevice(), tmp_path)
+
+    try:
+        controller._get_attendance_data(None)
+    except ConnectionError as e:
+        assert "timed out" in str(e)
+    else:
+        raise AssertionError("a failed download must not look like an empty device")
+
+
+class AggregateRecorder:
+    def __init__(self):
+        self.calls = []
+
+    def update_day(self, payload, user_ids=None):
+        self.calls.append(None if user_ids is None else sorted(user_ids))
+
+
+def offline_controller(tmp_path, monkeypatch, send=lambda payload: True):
+    """A controller whose state files live in tmp_path and whose day files stay in memory."""
+    import controllers.AttendanceController as module
+    from benchmarks.PipelineBenchmark import PipelineBenchmark
+    from config.FilePathManager import FilePathManager
+    from controllers.DayState import DayState
+    from services.DeviceRetention import UploadWatermark
+    from services.RunFingerprints import RunFingerprints
+    from services.SeenPunches import SeenPunches
+
+    controller = controller_for(UnreachableDevice(), tmp_path)
+    controller.device_info = PipelineBenchmark.build_processor().device_info
+    serial = controller.device_info.description.serial_number
+    controller.shift_engine = None
+    controller.day_state = DayState()
+    controller.flush = lambda metrics=None: None
+    controller.upload_watermark = UploadWatermark(tmp_path / "watermarks.json")
+    controller.device_retention.watermark = controller.upload_watermark
+    controller.run_fingerprints = RunFingerprints(tmp_path / "fingerprints.json")
+    controller.seen_punches = SeenPunches(serial, tmp_path / "seen")
+    controller.api_client = SimpleNamespace(send_attendance_data=send)
+    controller.aggregates = AggregateRecorder()
+    controller._archive_punches = lambda *args: None
+    monkeypatch.setattr(module, "FilePathManager", lambda: FilePathManager(str(tmp_path)))
+    return controller
+
+
+def test_aggregates_only_refresh_recomputed_users(tmp_path, monkeypatch):
+    from benchmarks.PipelineBenchmark import PipelineBenchmark
+    from config.FilePathManager import FilePathManager
+    from controllers.FileHandler import AttendanceFileHandler
+    from utils.RunMetrics import RunMetrics
+
+    day = date(2025, 2, 24)
+    users = {uid: {"user_id": uid, "name": f"User {uid}", "privilege": "User"} for uid in ("1", "2")}
+    attendance = [punch(uid, datetime(2025, 2, 24, hour)) for uid in ("1", "2") for hour in (8, 17)]
+    controller = offline_controller(tmp_path, monkeypatch)
+
+    serial = controller.device_info.description.serial_number
+    handler = AttendanceFileHandler(FilePathManager(str(tmp_path)).get_json_filename(day, device=serial))
+    stored = PipelineBenchmark.build_processor().process_user_attendance(users, attendance[:2] + attendance[2:3], day)
+    controller.day_state.update(handler, serial, day, stored, b"")
+
+    controller._process_day(None, users, attendance, day, RunMetrics().start(), datetime(2025, 2, 24, 18),
+                            dirty_users={"2"})
+
+    assert controller.aggregates.calls == [["2"]]
+
+
+class ProbeRecorder:
+    def __init__(self, records):
+        self.records = records
+        self.collected = []
+
+    def probe(self, force=False):
+        return SimpleNamespace(reachable=True, needs_download=True, records=self.records, users=1, duration_ms=1.0)
+
+    def mark_collected(self, records, users=None):
+        self.collected.append(records)
+
+
+class ReachableDevice(UnreachableDevice):
+    def connect(self):
+        return self
+
+    def is_reachable(self):
+        return True
+
+
+def collect_today(controller, users, attendance):
+    controller.connector = ReachableDevice()
+    controller._get_attendance_data = lambda conn, date_range=None: (users, attendance)
+    return controller.process_attendance(max_attempts=1)
+
+
+def todays_punches(*user_ids):
+    today = datetime.combine(date.today(), datetime.min.time())
+    return [punch(uid, today.replace(hour=hour)) for uid in user_ids for hour in (0, 1)]
+
+
+USERS = {"1": {"user_id": "1", "name": "Ana", "privilege": "User"}}
+
+
+def test_failed_upload_leaves_the_probe_count_uncollected(tmp_path, monkeypatch):
+    controller = offline_controller(tmp_path, monkeypatch, send=lambda payload: False)
+    controller.device_probe, controller.probe_before_collect = ProbeRecorder(2), True
+
+    collect_today(controller, USERS, todays_punches("1"))
+
+    assert controller.device_probe.collected == []
+    assert controller.run_ledger.recent()[0]["outcome"] == "upload_failed"
+
+
+def test_stored_download_marks_the_probe_count_collected(tmp_path, monkeypatch):
+    controller = offline_controller(tmp_path, monkeypatch)
+    controller.device_probe, controller.probe_before_collect = ProbeRecorder(2), True
+
+    collect_today(controller, USERS, todays_punches("1"))
+
+    assert controller.device_probe.collected == [2]
+
+
+def test_download_is_processed_again_once_its_users_are_enrolled(tmp_path, monkeypatch):
+    controller = offline_controller(tmp_path, monkeypatch)
+    attendance = todays_punches("1", "2")
+    enrolled = {**USERS, "2": {"user_id": "2", "name": "Bea", "privilege": "User"}}
+
+    collect_today(controller, USERS, attendance)
+    collect_today(controller, enrolled, attendance)
+
+    assert [run["outcome"] for run in controller.run_ledger.recent()] == ["ok", "ok"]
+
+
+def test_retried_run_is_one_ledger_row_covering_every_attempt(tmp_path, monkeypatch):
+    from services.RetryPolicy import RetryPolicy
+
+    controller = offline_controller(tmp_path, monkeypatch)
+    controller.retry_policy = RetryPolicy(base_delay=0.05, multiplier=1, max_attempts=3)
+    monkeypatch.setattr(RetryPolicy, "delay", lambda self, attempt: 0.05)
+    controller.device_probe, controller.probe_before_collect = ProbeRecorder(2), True
+    downloads = iter([ConnectionError("timed out"), (USERS, todays_punches("1"))])
+
+    def download(conn, date_range=None):
+        result = next(downloads)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    controller.connector = ReachableDevice()
+    controller._get_attendance_data = download
+    controller.process_attendance()
+
+    run, = controller.run_ledger.recent()
+    stages = {row["stage"]: row["duration_ms"] for row in controller.run_ledger.conn.execute(
+        "SELECT stage, duration_ms FROM run_stages WHERE run_id = ?", (run["id"],))}
+    assert (run["outcome"], run["retries"], run["records_downloaded"]) == ("ok", 1, 2)
+    assert "probe" in stages and stages["backoff"] >= 50
+    assert run["duration_ms"] >= stages["backoff"]
+
+
+def test_backfill_gives_each_day_only_the_punches_its_shifts_can_reach(tmp_path, monkeypatch):
+    from models.attendance.ShiftEngine import ShiftEngine
+    from models.attendance.ShiftTemplate import ShiftTemplate
+
+    controller = offline_controller(tmp_path, monkeypatch)
+    controller.shift_engine = ShiftEngine({"day": ShiftTemplate.from_dict("day", {"start": "08:00", "end": "17:00"})}, "day")
+    attendance = [punch("1", datetime(2025, 2, day, hour)) for day in (26, 24, 25) for hour in (17, 8)]
+    controller._get_attendance_data = lambda conn, date_range=None: (USERS, attendance)
+    controller.connector = ReachableDevice()
+    seen = {}
+    process_day = controller._process_day
+
+    def record_slice(conn, users_info, day_attendance, day, *args, **kwargs):
+        seen[day] = [att.timestamp for att in day_attendance]
+        return process_day(conn, users_info, day_attendance, day, *args, **kwargs)
+
+    controller._process_day = record_slice
+    processed = controller.backfill(date(2025, 2, 24), date(2025, 2, 26))
+
+    assert processed == {date(2025, 2, 24): 1, date(2025, 2, 25): 1, date(2025, 2, 26): 1}
+    assert seen[date(2025, 2, 25)] == [datetime(2025, 2, 25, 8), datetime(2025, 2, 25, 17)]
+
+
+def test_merge_keeps_the_type_of_unscheduled_punches():
+    stored = {"users": {"1": {"records": [
+        {"hour": "04:00:00", "type": 2, "unscheduled": True},
+        {"hour": "08:00:00", "type": 1},
+    ]}}}
+    new = {"users": {"1": {"records": [{"hour": "17:00:00", "type": 1}], "total_hours": "9.00"}}}
+
+    records = AttendanceController._merge_records(stored, new)["users"]["1"]["records"]
+
+    assert [(r["hour"], int(r["type"])) for r in records] == [("04:00:00", 2), ("08:00:00", 1), ("17:00:00", 0)]
+
+
+def test_upload_day_skips_a_corrupted_partition(tmp_path, monkeypatch):
+    import controllers.AttendanceController as module
+    from config.FilePathManager import FilePathManager
+    from utils.AtomicFile import AtomicFile
+
+    day = date(2025, 2, 24)
+    paths = FilePathManager(str(tmp_path))
+    monkeypatch.setattr(module, "FilePathManager", lambda: paths)
+    for serial in ("SN1", "SN2"):
+        AtomicFile.write(paths.get_json_filename(day, device=serial), f'{{"serial_number": "{serial}"}}'.encode())
+    with open(paths.get_json_filename(day, device="SN1"), "ab") as f:
+        f.write(b" ")
+    sent = []
+    controller = controller_for(UnreachableDevice(), tmp_path)
+    controller.api_client = SimpleNamespace(send_attendance_data=lambda payload: sent.append(payload) or True)
+
+    assert controller.upload_day(day) is False
+    assert sent == [b'{"serial_number": "SN2"}']
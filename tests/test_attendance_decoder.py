@@ -0,0 +1,19 @@
+import struct
+from pathlib import Path
+import pytest
+from benchmarks.DecoderBenchmark import DecoderBenchmark, FixtureConnection
+from models.attendance.AttendanceDecoder import AttendanceDecoder
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+
+
+@pytest.mark.parametrize("record_size", [8, 16, 40])
+def test_bulk_decoder_matches_pyzk_output(record_size):
+    fixture = DecoderBenchmark.load(FIXTURES / f"attlog_{record_size}.json")
+    conn = FixtureConnection(fixture)
+    total_size = struct.unpack_from('<I', conn.buffer, 0)[0]
+    assert total_size / conn.records == record_size
+
+    decoded = AttendanceDecoder.decode(memoryview(conn.buffer)[4:], total_size / conn.records, conn.users)
+
+    assert [[a.user_id, a.timestamp.isoformat(), a.status, a.punch, a.uid] for a in decoded] == fixture["expected"]
@@ -0,0 +1,20 @@
+from models.device.DeviceInfo import DeviceInfo
+from controllers.FileHandler import DeviceFileManager
+from models.device.DeviceDescription import DeviceDescription
+
+
+def device(name, serial):
+    return DeviceInfo.create(device_name=name, description=DeviceDescription.create(
+        serial, "00:00:00:00:00:00", {'ip': '127.0.0.1', 'gateway': '127.0.0.1'}))
+
+
+def test_terminals_with_the_same_name_get_their_own_file(tmp_path):
+    manager = DeviceFileManager()
+    manager.device_dir = tmp_path
+
+    manager.save_device_info(device("Gate", "SN1"))
+    manager.save_device_info(device("Gate", "SN2"))
+
+    first, second = (manager.get_device_filepath(serial) for serial in ("SN1", "SN2"))
+    assert first != second
+    assert b"SN1" in first.read_bytes() and b"SN2" in second.read_bytes()
@@ -0,0 +1,55 @@
+from types import SimpleNamespace
+from services.DeviceProbe import DeviceProbe
+
+
+class CountingDevice:
+    device_key = "gate"
+
+    def __init__(self, records, users=1):
+        self.records = records
+        self.users = users
+
+    def is_reachable(self):
+        return True
+
+    def connect(self):
+        return SimpleNamespace(read_sizes=lambda: None, records=self.records, users=self.users)
+
+    def disconnect(self):
+        pass
+
+
+def test_probe_after_a_collection_sees_new_punches(tmp_path):
+    device = CountingDevice(records=10)
+    probe = DeviceProbe(device, ttl=60, cache_file=tmp_path / "probe.json")
+    probe.mark_collected(probe.probe().records)
+
+    device.records = 11
+    result = probe.probe()
+    assert not result.cached
+    assert result.needs_download
+
+
+def test_cached_probe_never_skips_a_download(tmp_path):
+    device = CountingDevice(records=10)
+    probe = DeviceProbe(device, ttl=60, cache_file=tmp_path / "probe.json")
+    probe.mark_collected(10, 1)
+    probe.probe()
+
+    device.records = 11
+    cached = probe.probe()
+    assert cached.cached and cached.needs_download
+    assert probe.probe(force=True).needs_download
+    device.records = 10
+    assert not probe.probe(force=True).needs_download
+
+
+def test_enrolling_a_user_needs_a_download(tmp_path):
+    device = CountingDevice(records=10)
+    probe = DeviceProbe(device, ttl=60, cache_file=tmp_path / "probe.json")
+    result = probe.probe()
+    probe.mark_collected(result.records, result.users)
+    assert not probe.probe(force=True).needs_download
+
+    device.users = 2
+    assert probe.probe(force=True).needs_download
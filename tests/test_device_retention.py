@@ -0,0 +1,89 @@
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from benchmarks.PipelineBenchmark import PipelineBenchmark
+from controllers.AttendanceController import AttendanceController
+from services.DeviceRetention import DeviceRetention, UploadWatermark
+
+Punch = namedtuple("Punch", ["user_id", "timestamp", "status", "punch", "uid"])
+USERS = {"1": {"user_id": "1", "name": "Ana", "privilege": "User"}}
+
+
+class FakeDevice:
+    def __init__(self, attendance):
+        self.attendance = list(attendance)
+        self.cleared = False
+
+    @contextmanager
+    def device_locked(self):
+        yield self
+
+    def get_attendance(self):
+        return list(self.attendance)
+
+    def clear_attendance(self):
+        self.attendance = []
+        self.cleared = True
+
+    def disconnect(self):
+        pass
+
+
+def retention(tmp_path, device):
+    watermark = UploadWatermark(tmp_path / "watermarks.json")
+    pruner = DeviceRetention(device, watermark, archive_dir=tmp_path / "archive")
+    pruner.enabled, pruner.min_records = True, 1
+    return pruner, watermark
+
+
+def test_prune_then_collect_keeps_the_full_day_summary(tmp_path):
+    today = datetime.combine(datetime.now().date(), time.min)
+    morning = Punch("1", today + timedelta(hours=7), 1, 0, 1)
+    device = FakeDevice([Punch("1", today - timedelta(hours=10), 1, 0, 1), morning])
+    pruner, watermark = retention(tmp_path, device)
+    # Everything on the device was uploaded by a mid-day run
+    watermark.acknowledge("SN1", today - timedelta(days=1), today + timedelta(hours=7, minutes=5))
+
+    assert not pruner.maybe_prune("SN1")
+    assert not device.cleared
+
+    processor = PipelineBenchmark.build_processor()
+    stored = processor.process_user_attendance(USERS, [morning], today.date())
+    evening = Punch("1", today + timedelta(hours=17), 1, 0, 1)
+    device.attendance.append(evening)
+    collected = [att for att in device.get_attendance() if att.timestamp >= today]
+    merged = AttendanceController._merge_records(stored, processor.process_user_attendance(USERS, collected, today.date()))
+
+    user = merged["users"]["1"]
+    assert [record["hour"] for record in user["records"]] == ["07:00:00", "17:00:00"]
+    assert user["total_hours"] == "10.00"
+
+
+def test_prunes_once_every_record_is_from_an_acknowledged_past_day(tmp_path):
+    today = datetime.combine(datetime.now().date(), time.min)
+    device = FakeDevice([Punch("1", today - timedelta(hours=h), 1, 0, 1) for h in (10, 16)])
+    pruner, watermark = retention(tmp_path, device)
+    watermark.acknowledge("SN1", today - timedelta(days=1), today + timedelta(hours=7))
+
+    assert pruner.maybe_prune("SN1")
+    assert device.cleared
+    assert len(list((tmp_path / "archive").rglob("*.json"))) == 1
+
+
+def test_open_night_shift_keeps_yesterdays_check_in(tmp_path):
+    from models.attendance.ShiftEngine import ShiftEngine
+    from models.attendance.ShiftTemplate import ShiftTemplate
+
+    engine = ShiftEngine({"night": ShiftTemplate.from_dict("night", {"start": "22:00", "end": "06:00"})}, "night")
+    pruner = DeviceRetention(FakeDevice([]), UploadWatermark(tmp_path / "w.json"), tmp_path, shift_engine=engine)
+    night_start = datetime(2025, 2, 24, 22, 0)
+
+    # At 02:00 the shift of the 24th is still running: its 20:00 window start is the cutoff
+    assert pruner._open_since(datetime(2025, 2, 25, 2, 0)) <= night_start
+    # Once its window closed (06:00 + 4 h), only the shift of the 25th is open
+    assert pruner._open_since(datetime(2025, 2, 25, 11, 0)) > night_start
+
+
+def test_without_shifts_days_close_at_midnight(tmp_path):
+    pruner = DeviceRetention(FakeDevice([]), UploadWatermark(tmp_path / "w.json"), tmp_path)
+    assert pruner._open_since(datetime(2025, 2, 25, 2, 0)) == datetime(2025, 2, 25)
@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+from config.RunLedger import RunLedger
+from utils.RunMetrics import RunMetrics
+
+
+def run_metrics(started: datetime, seconds: float) -> RunMetrics:
+    metrics = RunMetrics()
+    metrics.started_at = started.timestamp()
+    metrics.finished_at = metrics.started_at + seconds
+    metrics.stages['total'] = seconds
+    metrics.stages['download'] = seconds / 2
+    metrics.counters['punches_archived'] = 3
+    return metrics
+
+
+def test_trend_percentiles_only_cover_ok_runs(tmp_path):
+    ledger = RunLedger(tmp_path / "runs.db", retention_days=0)
+    started = datetime.now() - timedelta(hours=1)
+    for outcome, seconds in [("ok", 2.0), ("ok", 4.0), ("no_new_records", 0.01),
+                             ("circuit_open", 0.0), ("already_seen", 0.5), ("failed", 30.0)]:
+        ledger.record("gate", "SN1", outcome, run_metrics(started, seconds))
+
+    week, = ledger.trend(days=7)["gate"]
+
+    assert (week["runs"], week["ok"], week["failed"]) == (6, 2, 1)
+    assert week["p50_ms"] == 3000.0
+
+
+def test_prune_removes_old_runs_with_their_stages_and_counters(tmp_path):
+    ledger = RunLedger(tmp_path / "runs.db", retention_days=0)
+    ledger.record("gate", "SN1", "ok", run_metrics(datetime.now() - timedelta(days=100), 1.0))
+    ledger.record("gate", "SN1", "ok", run_metrics(datetime.now() - timedelta(hours=1), 1.0))
+
+    assert ledger.prune(90) == 1
+    assert len(ledger.recent()) == 1
+    for table in ("run_stages", "run_counters"):
+        assert ledger.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] == 1
+
+
+def test_recording_a_run_prunes_expired_runs(tmp_path):
+    ledger = RunLedger(tmp_path / "runs.db", retention_days=90)
+    ledger.record("gate", "SN1", "ok", run_metrics(datetime.now() - timedelta(days=100), 1.0))
+
+    assert ledger.recent() == []
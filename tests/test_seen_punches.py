@@ -0,0 +1,24 @@
+from collections import namedtuple
+from datetime import datetime
+from services.SeenPunches import SeenPunches
+
+Punch = namedtuple("Punch", ["user_id", "timestamp"])
+
+
+def test_punches_after_2038_are_stored_and_reloaded(tmp_path):
+    punches = [Punch("1", datetime(2037, 12, 31, 23, 59)), Punch("1", datetime(2040, 1, 1, 8, 0))]
+    seen = SeenPunches("CKJD123456", state_dir=tmp_path)
+
+    assert seen.add(punches) == 2
+
+    reloaded = SeenPunches("CKJD123456", state_dir=tmp_path)
+    assert reloaded.unseen(punches) == []
+    assert reloaded.unseen([Punch("2", datetime(2040, 1, 1, 8, 0))]) != []
+
+
+def test_discard_through_after_2038(tmp_path):
+    seen = SeenPunches("CKJD123456", state_dir=tmp_path)
+    seen.add([Punch("1", datetime(2039, 1, 1)), Punch("1", datetime(2041, 1, 1))])
+
+    assert seen.discard_through(datetime(2040, 1, 1)) == 1
+    assert len(seen) == 1
@@ -0,0 +1,51 @@
+import gzip
+import pickle
+import time
+from datetime import datetime
+from types import SimpleNamespace
+import pytest
+from config.ReplayConnector import ReplaySession
+from config.SessionRecorder import SessionRecorder
+
+
+def test_session_round_trips_through_json(tmp_path):
+    recorder = SessionRecorder("192.168.0.4:4370", tmp_path / "session.zks")
+    users = [SimpleNamespace(uid=1, user_id="1001", name="Ana", card=0)]
+    start = time.perf_counter()
+    recorder.record("get_users", start, users)
+    recorder.record("read_with_buffer", start, (bytearray(b"\x10\x00\xff"), 3))
+    recorder.record("get_time", start, datetime(2025, 2, 24, 8, 0, 12))
+    recorder.record("get_attendance", start, error=TimeoutError("timed out"))
+    recorder.save()
+
+    assert gzip.decompress((tmp_path / "session.zks").read_bytes()).startswith(b"{")
+    session = ReplaySession(tmp_path / "session.zks", time_scale=0)
+    assert session.respond("get_users") == users
+    assert session.respond("read_with_buffer") == (b"\x10\x00\xff", 3)
+    assert session.respond("get_time") == datetime(2025, 2, 24, 8, 0, 12)
+    with pytest.raises(TimeoutError):
+        session.respond("get_attendance")
+
+
+def test_pickled_sessions_are_never_loaded(tmp_path):
+    path = tmp_path / "old.zks"
+    path.write_bytes(gzip.compress(pickle.dumps({"version": 1, "device": "x", "recorded_at": "", "events": []})))
+
+    with pytest.raises(ValueError, match="record it again"):
+        ReplaySession(path)
+
+
+def test_next_session_starts_an_empty_file(tmp_path, monkeypatch):
+    import config.SessionRecorder as module
+    monkeypatch.setattr(module, "SESSIONS_DIR", tmp_path)
+    recorder = SessionRecorder("192.168.0.4:4370")
+    recorder.record("connect", time.perf_counter(), True)
+    first = recorder.path
+
+    recorder.next_session()
+    recorder.record("get_users", time.perf_counter(), [])
+    recorder.save()
+
+    assert recorder.path != first and len(recorder.events) == 1
+    assert list(ReplaySession(first, time_scale=0)._responses) == ["connect"]
+    assert list(ReplaySession(recorder.path, time_scale=0)._responses) == ["get_users"]
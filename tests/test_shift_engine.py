@@ -0,0 +1,47 @@
+from datetime import date, datetime
+from models.attendance.ShiftEngine import ShiftEngine
+from models.attendance.ShiftTemplate import ShiftTemplate
+
+DAY = date(2025, 2, 24)
+
+
+def engine():
+    templates = {
+        "day": ShiftTemplate.from_dict("day", {"start": "08:00", "end": "17:00", "window_before_minutes": 120,
+                                               "window_after_minutes": 240}),
+        "night": ShiftTemplate.from_dict("night", {"start": "22:00", "end": "06:00"}),
+    }
+    return ShiftEngine(templates, "day", {"2": "night"})
+
+
+def test_out_of_window_punches_stay_on_their_calendar_day():
+    times = [datetime(2025, 2, 24, 4, 0), datetime(2025, 2, 24, 8, 0),
+             datetime(2025, 2, 24, 17, 0), datetime(2025, 2, 24, 21, 30)]
+
+    user = engine().evaluate(times, DAY, "1", "Ana")
+
+    assert [(r["hour"], r.get("unscheduled", False)) for r in user["records"]] == [
+        ("04:00:00", True), ("08:00:00", False), ("17:00:00", False), ("21:30:00", True)
+    ]
+    assert user["total_hours"] == "9.00"
+    assert user["unscheduled_punches"] == 2
+
+
+def test_only_unscheduled_punches_still_produce_a_day():
+    user = engine().evaluate([datetime(2025, 2, 24, 4, 0)], DAY, "1", "Ana")
+
+    assert user["records"] == [{"hour": "04:00:00", "type": 2, "unscheduled": True}]
+    assert user["total_hours"] == "0.00"
+
+
+def test_night_shift_punches_are_not_unscheduled_on_the_next_day():
+    times = [datetime(2025, 2, 24, 22, 0), datetime(2025, 2, 25, 6, 0)]
+
+    assert engine().evaluate(times, date(2025, 2, 25), "2", "Bo") == {}
+    night = engine().evaluate(times, DAY, "2", "Bo")
+    assert [r.get("day_offset", 0) for r in night["records"]] == [0, 1]
+
+
+def test_collection_range_covers_the_calendar_days():
+    start, end = engine().collection_range(DAY, DAY)
+    assert start <= datetime(2025, 2, 24, 0, 0) and end >= datetime(2025, 2, 24, 23, 59, 59)